@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# 性能基准脚本，直接运行：python -m benchmarks.<脚本名>
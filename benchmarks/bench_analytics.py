@@ -0,0 +1,117 @@
+# benchmarks/bench_analytics.py
+"""跨任务分析：列式任务表 vs 逐行字典扫描
+
+随机生成若干次任务（地图、时长、敌人与掉落计数、生存轮次），分别用
+MissionTable 的向量化查询和“每次任务一个 dict、逐行扫描”的写法计算
+各节点掉落率、生存轮次中位时间和各地形集的敌人构成，核对结果并比较耗时。
+安装 NumPy 时走 NumPy 路径，否则为纯 Python 逐列循环。
+
+用法：python -m benchmarks.bench_analytics [任务数]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.synthetic_log import DROPS, ENEMIES, LEVELS
+from src import analytics
+from src.analytics import MissionTable, tileset_of
+
+
+def generate(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        cycles = rng.randint(0, 20)
+        rows.append({
+            "level": rng.choice(LEVELS),
+            "started": rng.uniform(0, 1e6),
+            "duration": rng.uniform(120, 3600),
+            "success": rng.random() < 0.9,
+            "enemies": {f"{name}Agent": rng.randint(0, 60) for name in rng.sample(ENEMIES, 6)},
+            "drops": {key: rng.randint(0, 30) for key in rng.sample(DROPS, 4)},
+            "rewards": {"credits": rng.randint(1, 10)},
+            "credits": rng.randint(1000, 200_000),
+            "cycles": cycles,
+            "cycle_time": rng.uniform(280, 320) if cycles > 1 else None,
+        })
+    return rows
+
+
+def build_table(rows) -> MissionTable:
+    table = MissionTable()
+    for row in rows:
+        table.append(**row)
+    return table
+
+
+# === 逐行字典扫描（对照组）===
+def rows_drop_rate(rows):
+    drops, seconds = Counter(), Counter()
+    for row in rows:
+        drops[row["level"]] += sum(row["drops"].values())
+        seconds[row["level"]] += row["duration"]
+    return {level: drops[level] * 60 / seconds[level] for level in seconds}
+
+
+def rows_median_cycle(rows, level):
+    values = [row["cycle_time"] for row in rows if row["level"] == level and row["cycle_time"] is not None]
+    return statistics.median(values) if values else None
+
+
+def rows_composition(rows):
+    totals = defaultdict(Counter)
+    for row in rows:
+        totals[tileset_of(row["level"])].update(row["enemies"])
+    return {name: {npc: n / sum(c.values()) for npc, n in c.items()} for name, c in totals.items()}
+
+
+def timed(fn, *args, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def close(a, b) -> bool:
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(close(a[k], b[k]) for k in a)
+    return abs(a - b) <= 1e-6 * max(1.0, abs(a))
+
+
+def main(count: int):
+    rows = generate(count)
+    start = time.perf_counter()
+    table = build_table(rows)
+    print(f"{count:,} 次任务，建表 {(time.perf_counter() - start) * 1000:.0f} ms，"
+          f"后端 {'NumPy' if analytics.np is not None else '纯 Python'}")
+
+    level = LEVELS[0]
+    cases = [
+        ("掉落率/节点", (table.drop_rate_per_node,), (rows_drop_rate, rows)),
+        ("生存轮次中位", (table.median_cycle_time, level), (rows_median_cycle, rows, level)),
+        ("敌人构成/地形集", (table.enemy_composition,), (rows_composition, rows)),
+    ]
+    print(f"{'查询':<12} {'列式':>9} {'逐行':>9} {'加速':>6}")
+    for name, columnar, baseline in cases:
+        col_ms, col_result = timed(*columnar)
+        row_ms, row_result = timed(*baseline)
+        assert close(col_result, row_result), f"{name} 结果不一致"
+        print(f"{name:<12} {col_ms:>7.1f}ms {row_ms:>7.1f}ms {row_ms / col_ms:>5.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "missions.col")
+        table.save(path)
+        size = os.path.getsize(path)
+        load_ms, loaded = timed(MissionTable.load, path, repeat=1)
+        assert close(loaded.drop_rate_per_node(), table.drop_rate_per_node())
+    print(f"存盘 {size / 1e6:.1f} MB，读取 {load_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,47 @@
+# benchmarks/bench_bus.py
+"""事件总线：慢消费者对解析吞吐的影响，同步分发 vs 线程池分发
+
+慢消费者用 time.sleep 模拟（网络、磁盘等 I/O 型处理，会释放 GIL）。
+同步分发时吞吐随消费者变慢而下降；线程池分发时吞吐基本不变，代价是该订阅者的积压/丢弃与延迟。
+
+用法：python -m benchmarks.bench_bus [行数]
+"""
+import sys
+import time
+
+from benchmarks.synthetic_log import SCENARIOS, generate_lines
+from src.bus import AGENT, POOL, REWARD, SYNC
+from src.log_parser import LogMonitor
+
+
+def run(lines, delay=None, mode=SYNC):
+    monitor = LogMonitor()
+    subscription = None
+    if delay is not None:
+        subscription = monitor.subscribe(lambda event: time.sleep(delay), kinds=(AGENT, REWARD),
+                                         mode=mode, maxsize=1000, name="slow")
+    process = monitor.process_line
+    start = time.perf_counter()
+    for line in lines:
+        process(line)
+    rate = len(lines) / (time.perf_counter() - start)
+    if subscription:
+        monitor.event_bus.close()
+    return rate, subscription
+
+
+def main(count: int):
+    lines = generate_lines(count, SCENARIOS["mixed"])
+    base, _ = run(lines)
+    print(f"无订阅者: {base:,.0f} 行/秒")
+    print(f"{'分发':<6} {'处理耗时':>8} {'行/秒':>12} {'相对':>6} {'投递':>7} {'丢弃':>7} {'lag p95':>10}")
+    for delay in (0.0001, 0.001):
+        for mode in (SYNC, POOL):
+            rate, sub = run(lines, delay, mode)
+            lag = sub.lag.to_dict()
+            print(f"{mode:<6} {delay * 1000:>6.1f}ms {rate:>12,.0f} {rate / base:>6.2f} "
+                  f"{sub.delivered:>7} {sub.dropped:>7} {lag['p95_ms']:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
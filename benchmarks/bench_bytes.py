@@ -0,0 +1,101 @@
+# benchmarks/bench_bytes.py
+"""bytes 解析路径：bytes 上预筛、只解码命中的行 vs 整份日志解码为 str
+
+合成日志中混入 CRLF、单独的 \\r、非法 UTF-8、非 ASCII 奖励名和 \\x1c 等边界情况，
+分别用文本路径与 bytes 路径做离线导入、模拟尾随（LogTailer 逐块读取）和并行导入，
+核对解析状态完全一致，并比较吞吐与实际解码的字节数。
+
+用法：python -m benchmarks.bench_bytes [行数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_log import SCENARIOS, SyntheticLog
+from src.log_parser import LogMonitor
+from src.parallel import parse_files_parallel
+from src.tailer import LogTailer, split_lines
+
+# 边界情况：按固定间隔插入
+ODD_LINES = [
+    "{ts} Script [Info]: GiveInventoryItem.lua: Giving 奖励·Orokin 电池 to player\n",
+    "{ts} Sys [Info]: 玩家 Tenno™ joined the squad\n",
+    "{ts} Script [Info]: CreditsReward.lua: Awarding 1500 credits\r\n",
+    "{ts} Net [Info]: corrupted \xff\xfe bytes\r{ts} Sys [Info]: lone carriage return\n",
+    "{ts} Script [Info]: Affinity.lua: Awarding\x1c42 affinity\n",
+]
+
+
+def write_log(path: str, count: int, scenario: str) -> int:
+    rng = random.Random(1)
+    with open(path, "wb") as f:
+        log = SyntheticLog(SCENARIOS[scenario])
+        for n, line in enumerate(log.lines(count)):
+            f.write(line.encode("utf-8") + b"\n")
+            if n % 500 == 0:
+                odd = rng.choice(ODD_LINES).replace("{ts}", f"{log.ts:.3f}")
+                f.write(odd.encode("utf-8").replace("\xff\xfe".encode("utf-8"), b"\xff\xfe"))  # 非法 UTF-8
+        return f.tell()
+
+
+def state(monitor: LogMonitor) -> dict:
+    snapshot = monitor.snapshot_state()
+    snapshot.pop("clock_anchor")
+    return snapshot
+
+
+def offline(path: str, parse_bytes: bool):
+    monitor = LogMonitor(parse_bytes=parse_bytes)
+    stats = monitor.ingest_file(path)
+    return monitor, stats["lines_per_sec"]
+
+
+def tail(path: str, parse_bytes: bool):
+    monitor = LogMonitor(parse_bytes=parse_bytes)
+    process = monitor.process_bytes if parse_bytes else monitor.process_line
+    tailer = LogTailer(path, from_end=False, use_inotify=False, block_size=4096, decode=not parse_bytes)
+    start = time.perf_counter()
+    count = 0
+    while True:
+        lines = tailer.read_lines()
+        if not lines:
+            break
+        for line in lines:
+            process(line)
+        count += len(lines)
+    tailer.close()
+    return monitor, count / (time.perf_counter() - start)
+
+
+def decoded_bytes(monitor: LogMonitor, path: str) -> int:
+    """bytes 路径实际解码的字节数：非 ASCII 行与命中预筛的行"""
+    prefilter = monitor.scanner.bytes_prefilter
+    with open(path, "rb") as f:
+        return sum(len(line) for line in split_lines(f.read())
+                   if not line.isascii() or prefilter.search(line))
+
+
+def main(count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'场景':<7} {'模式':<5} {'文本 行/秒':>12} {'bytes 行/秒':>12} {'加速':>6}")
+        for scenario in ("noise", "mixed", "storm"):
+            path = os.path.join(tmp, f"{scenario}.log")
+            size = write_log(path, count, scenario)
+            for mode, run in (("离线", offline), ("尾随", tail)):
+                text_monitor, text_rate = run(path, False)
+                bytes_monitor, bytes_rate = run(path, True)
+                assert state(text_monitor) == state(bytes_monitor), f"{scenario}/{mode}: bytes 路径结果与文本路径不一致"
+                print(f"{scenario:<7} {mode:<5} {text_rate:>12,.0f} {bytes_rate:>12,.0f} {bytes_rate / text_rate:>5.2f}x")
+            decoded = decoded_bytes(bytes_monitor, path)
+            print(f"{'':<7} 解码 {decoded / 1e6:.2f} MB / {size / 1e6:.2f} MB（{decoded / size:.1%}）")
+
+            parallel = LogMonitor()
+            parse_files_parallel(parallel, [path], workers=2, chunk_bytes=max(size // 4, 1))
+            assert state(parallel) == state(text_monitor), f"{scenario}: 并行导入结果不一致"
+        print("三种模式下 bytes 路径与文本路径的解析状态完全一致")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
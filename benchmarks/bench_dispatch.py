@@ -0,0 +1,113 @@
+# benchmarks/bench_dispatch.py
+"""对比分桶分发与旧版逐条 search 的 process_line 吞吐量；先核对几类日志行的正则提取结果
+
+用法：python -m benchmarks.bench_dispatch [行数]
+"""
+import re
+import sys
+import time
+
+from benchmarks.synthetic_log import SCENARIOS, generate_lines
+from src import log_parser as lp
+from src.log_parser import LogMonitor
+
+# (正则, 日志行, 期望的分组)；期望为 None 表示不应匹配
+SAMPLES = (
+    (lp.TELEPORT_PATTERN,
+     "512.301 Script [Info]: TeleportAndFade.lua: Teleporting DefaultModPickup from Vector(12.5, -3, 40) "
+     "-> Vector(18.25, -4.5, 41)", ("DefaultModPickup", "18.25, -4.5, 41")),
+    (lp.TELEPORT_PATTERN,
+     "512.301 Script [Info]: TeleportAndFade.lua: AlloyPlate from Vector(1, 2, 3) -> Vector(4, 5, 6)",
+     ("AlloyPlate", "4, 5, 6")),
+    (lp.TELEPORT_PATTERN,
+     "512.301 Script [Info]: TeleportAndFade.lua: Teleporting /Lotus/Types/Pickups/Ferrite from Vector(1,2,3) "
+     "-> Vector(7,8,9)", ("Ferrite", "7,8,9")),
+    (lp.TELEPORT_PATTERN, "512.301 Script [Info]: TeleportAndFade.lua: fade finished", None),
+    (lp.CONSERVATION_ENCOUNTER_PATTERN,
+     "733.012 AI [Info]: ENCMGR: Encounter /Lotus/Types/Gameplay/Conservation/OrokinKubrow/OrokinKubrowEncounter "
+     "started at 733.0 at pos (-120.5, 88, 3.25)", ("OrokinKubrow", "-120.5, 88, 3.25")),
+)
+
+
+def check_samples():
+    for pattern, line, expected in SAMPLES:
+        match = pattern.search(line)
+        assert (match and match.groups()) == expected, f"正则提取结果不符: {line!r} → {match and match.groups()}"
+
+
+class LegacyLogMonitor(LogMonitor):
+    """旧版 process_line：每行依次对所有正则执行 search（仅用于对比）"""
+
+    def process_line(self, line: str):
+        ts_match = re.match(r'^(\d+\.\d+)', line)
+        if not ts_match:
+            return
+        current_ts = float(ts_match.group(1))
+        if self.last_timestamp > 0 and current_ts - self.last_timestamp > 5000:
+            self.reset_mission()
+        self.last_timestamp = current_ts
+        for pattern, handler in ((lp.LEVEL_LOADED, self._handle_level_loaded),
+                                 (lp.MISSION_INFO, self._handle_mission_info),
+                                 (lp.NODE_LOADED, self._handle_node_loaded),
+                                 (lp.PLANET_INFO, self._handle_planet_info)):
+            m = pattern.search(line)
+            if m:
+                handler(m, current_ts)
+        if not self.mission_active:
+            self.detect_mission_start_by_activity(current_ts)
+            if not self.mission_active:
+                return
+        checks = (
+            (lp.AGENT_PATTERN, self._handle_agent),
+            (lp.TELEPORT_PATTERN, self._handle_teleport),
+            (lp.CONSERVATION_ENCOUNTER_PATTERN, self._handle_conservation_encounter),
+            (lp.CONSERVATION_AGENT_PATTERN, self._handle_conservation_agent),
+            (lp.SURVIVAL_REWARD_CYCLE, None),
+            (lp.MISSION_SUCCESS, None),
+            (lp.SYNDICATE_XP_BASE, self._handle_syndicate_xp_base),
+            (lp.SYNDICATE_XP_FINAL, self._handle_syndicate_xp_final),
+            (lp.MISSION_SUCCESS, self._handle_mission_success),
+            (lp.MISSION_FAILED, self._handle_mission_failed),
+            (lp.SURVIVAL_REWARD_CYCLE, self._handle_survival_cycle),
+            (lp.REWARD_ITEM, self._handle_reward_item),
+            (lp.EXTRA_REWARD, self._handle_extra_reward),
+            (lp.CREDITS_REWARD, self._handle_credits),
+            (lp.AFFINITY_REWARD, self._handle_affinity),
+            (lp.ENDLESS_EXTRACT_REWARD, self._handle_extract_reward),
+        )
+        for pattern, handler in checks:
+            m = pattern.search(line)
+            if m and handler:
+                handler(m, current_ts)
+
+
+def run(monitor_cls, lines: list) -> tuple:
+    events = []
+    monitor = monitor_cls(
+        on_new_agent=lambda npc: events.append(('agent', npc)),
+        on_level_loaded=lambda lvl: events.append(('level', lvl)),
+        on_reward_received=lambda r: events.append(('reward', r['type'], r['amount'])),
+    )
+    start = time.perf_counter()
+    for line in lines:
+        monitor.process_line(line)
+    elapsed = time.perf_counter() - start
+    return elapsed, events, dict(monitor.enemies)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    check_samples()
+    for scenario, mix in SCENARIOS.items():
+        lines = generate_lines(count, mix)
+        legacy_time, legacy_events, legacy_enemies = run(LegacyLogMonitor, lines)
+        new_time, new_events, new_enemies = run(LogMonitor, lines)
+        assert legacy_events == new_events and legacy_enemies == new_enemies, "分发结果与旧版不一致"
+        print(f"{scenario:>6}: "
+              f"旧版 {count / legacy_time:>10,.0f} 行/秒 | "
+              f"分桶 {count / new_time:>10,.0f} 行/秒 | "
+              f"加速 {legacy_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_export.py
+"""会话导出：各格式的磁盘占用、导出开销与读取速度，对比重新解析 EE.log
+
+1. 离线导入合成日志，分别挂上 JSONL / CSV（含 gzip）/ 二进制导出器，记录导出文件大小与导入耗时的增加
+2. 读取导出文件取回全部事件（二进制用 EventReader mmap 迭代，文本逐行解析），
+   与重新解析原始日志取回同样事件的耗时比较
+3. 核对二进制文件读回的事件与解析时发布的事件完全一致（分两次追加写入，中间截断半条记录）
+
+用法：python -m benchmarks.bench_export [行数]
+"""
+import csv
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_log import SyntheticLog
+from src.export import EventExporter, EventReader, event_to_dict
+from src.log_parser import LogMonitor
+
+FORMATS = ("session.jsonl", "session.jsonl.gz", "session.csv", "session.csv.gz", "session.wfev")
+
+
+def write_log(path: str, count: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in SyntheticLog().lines(count):
+            f.write(line + "\n")
+
+
+def reparse(log_path: str, exporter=None):
+    """重新解析日志并取回全部事件，返回 (事件列表, 秒)"""
+    events = []
+    monitor = LogMonitor()
+    monitor.subscribe(events.append)
+    if exporter:
+        exporter.attach(monitor)
+    start = time.perf_counter()
+    monitor.ingest_file(log_path)
+    if exporter:
+        exporter.close()
+    return events, time.perf_counter() - start
+
+
+def read_wfev(path: str) -> int:
+    with EventReader(path) as reader:
+        return sum(1 for _ in reader)
+
+
+def read_jsonl(path: str) -> int:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return sum(1 for line in f if json.loads(line))
+
+
+def read_csv(path: str) -> int:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+READERS = {".wfev": read_wfev, ".jsonl": read_jsonl, ".csv": read_csv}
+
+
+def reader_for(name: str):
+    return READERS[os.path.splitext(name[:-3] if name.endswith(".gz") else name)[1]]
+
+
+def check_roundtrip(tmp: str, events: list):
+    """二进制文件分两次追加（中间有写了一半的记录）后，读回的事件与原事件一致"""
+    path = os.path.join(tmp, "append.wfev")
+    half = len(events) // 2
+    for part in (events[:half], events[half:]):
+        exporter = EventExporter(path)
+        for event in part:
+            exporter.write(event)
+        exporter.close()
+        if part is not events[half:]:
+            with open(path, "ab") as f:
+                f.write(b"\x40\x00\x02\x00\x00")  # 模拟写到一半被中断
+    with EventReader(path) as reader:
+        assert [event_to_dict(e) for e in reader] == [event_to_dict(e) for e in events], "二进制读回的事件不一致"
+
+
+def main(count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "EE.log")
+        write_log(log_path, count)
+        log_size = os.path.getsize(log_path)
+        events, parse_seconds = reparse(log_path)
+        total = len(events)
+        print(f"EE.log {count:,} 行 / {log_size / 1e6:.1f} MB，{total:,} 个事件；重新解析 {parse_seconds:.2f}s "
+              f"（{total / parse_seconds:,.0f} 事件/秒）")
+        print(f"{'格式':<18} {'大小':>9} {'占日志':>7} {'导出开销':>8} {'读取':>7} {'事件/秒':>11} {'比重新解析':>9}")
+        for name in FORMATS:
+            path = os.path.join(tmp, name)
+            _, export_seconds = reparse(log_path, EventExporter(path))
+            size = os.path.getsize(path)
+            read = reader_for(name)
+            start = time.perf_counter()
+            assert read(path) == total, f"{name}: 读回的事件数不一致"
+            read_seconds = time.perf_counter() - start
+            print(f"{name:<18} {size / 1e6:>7.2f}MB {size / log_size:>7.1%} {export_seconds - parse_seconds:>+7.2f}s "
+                  f"{read_seconds:>6.2f}s {total / read_seconds:>11,.0f} {parse_seconds / read_seconds:>8.1f}x")
+        check_roundtrip(tmp, events)
+        print("二进制文件读回的事件与解析时发布的事件完全一致（含追加与截断恢复）")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
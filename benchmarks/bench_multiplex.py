@@ -0,0 +1,181 @@
+# benchmarks/bench_multiplex.py
+"""多日志监控：每份日志一个 start_monitoring 线程 vs 单线程多路复用（src/multiplex.py）
+
+N 份日志各在自己的目录（与多个账号的情形相同），分别测：
+1. 空闲：不写入时每秒占用的 CPU
+2. 负载：每份日志以固定速率追加，扣除写入线程自身的 CPU 后，每份日志每秒的解析 CPU
+最后在继续写入的同时从另一线程不断调用 aggregate()（不计入上面的 CPU），
+再核对每个日志源的解析状态与离线导入同一文件一致，且带 source 的奖励事件数与各自的奖励记录数相同。
+
+用法：python -m benchmarks.bench_multiplex [最大日志数]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.synthetic_log import SCENARIOS, SyntheticLog
+from src.bus import REWARD
+from src.log_parser import LogMonitor
+from src.multiplex import LogMultiplexer
+
+PHASE_SECONDS = 2.0
+TICK = 0.01             # 写入间隔（秒）
+LINES_PER_TICK = 2      # 每份日志每次写入的行数，即每份 200 行/秒
+
+
+def make_logs(tmp: str, count: int) -> list:
+    paths = []
+    for n in range(count):
+        os.makedirs(os.path.join(tmp, f"account{n}"))
+        path = os.path.join(tmp, f"account{n}", "EE.log")
+        open(path, "wb").close()
+        paths.append(path)
+    return paths
+
+
+def write_phase(paths: list, seconds: float) -> float:
+    """按固定速率向每份日志追加，返回写入线程自身占用的 CPU 秒数"""
+    logs = [SyntheticLog(SCENARIOS["mixed"], seed=n) for n in range(len(paths))]
+    streams = [log.lines(10 ** 9) for log in logs]
+    files = [open(path, "ab") for path in paths]
+    cpu = time.thread_time()
+    deadline = time.perf_counter() + seconds
+    next_tick = time.perf_counter()
+    while next_tick < deadline:
+        for f, lines in zip(files, streams):
+            f.write(b"".join(next(lines).encode("utf-8") + b"\n" for _ in range(LINES_PER_TICK)))
+            f.flush()
+        next_tick += TICK
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+    for f in files:
+        f.close()
+    return time.thread_time() - cpu
+
+
+def wait_consumed(monitors: list, paths: list, timeout: float = 30.0):
+    """等到每个 monitor 解析到对应日志的最后一个时间戳"""
+    finals = []
+    for path in paths:
+        with open(path, "rb") as f:
+            f.seek(-200, os.SEEK_END)
+            finals.append(float(f.read().rsplit(b"\n", 2)[-2].split(b" ", 1)[0]))
+    deadline = time.monotonic() + timeout
+    while any(m.last_timestamp != ts for m, ts in zip(monitors, finals)):
+        assert time.monotonic() < deadline, "解析没有追上写入"
+        time.sleep(0.01)
+
+
+def state(monitor: LogMonitor) -> dict:
+    snapshot = monitor.snapshot_state()
+    snapshot.pop("clock_anchor")
+    return snapshot
+
+
+def measure(paths: list, start, stop, monitors: list) -> dict:
+    start()
+    time.sleep(0.3)  # 等所有尾随器打开文件并定位到末尾
+    cpu = time.process_time()
+    time.sleep(PHASE_SECONDS)
+    idle = (time.process_time() - cpu) / PHASE_SECONDS
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    writer = write_phase(paths, PHASE_SECONDS)
+    wait_consumed(monitors, paths)
+    busy = (time.process_time() - cpu - writer) / (time.perf_counter() - wall)
+    stop()
+    return {"idle_ms": idle * 1000, "busy_ms_per_file": busy * 1000 / len(paths)}
+
+
+def run_threads(paths: list) -> dict:
+    monitors = [LogMonitor(log_path=path) for path in paths]
+    threads = [threading.Thread(target=m.start_monitoring, daemon=True) for m in monitors]
+
+    def start():
+        for thread in threads:
+            thread.start()
+
+    def stop():
+        for m in monitors:
+            m.stop_monitoring()
+        for thread in threads:
+            thread.join()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = measure(paths, start, stop, monitors)
+    return {**result, "threads": len(threads)}
+
+
+def check_concurrent_aggregate(mux: LogMultiplexer, paths: list, monitors: list):
+    """解析线程运行期间，另一线程读取汇总视图不应出错"""
+    thread = threading.Thread(target=mux.run, daemon=True)
+    errors, calls = [], 0
+
+    def poll():
+        nonlocal calls
+        while thread.is_alive():
+            try:
+                mux.aggregate()
+            except Exception as e:
+                errors.append(e)
+            calls += 1
+
+    thread.start()
+    reader = threading.Thread(target=poll, daemon=True)
+    reader.start()
+    write_phase(paths, 0.5)
+    wait_consumed(monitors, paths)
+    mux.stop()
+    thread.join()
+    reader.join()
+    assert calls and not errors, f"并发读取 aggregate() 出错: {errors[:1]!r}"
+
+
+def run_multiplexer(paths: list) -> dict:
+    mux = LogMultiplexer()
+    monitors = [mux.add(path, name=f"account{n}") for n, path in enumerate(paths)]
+    rewards = Counter()
+    mux.subscribe(lambda event: rewards.update((event.source,)), kinds=(REWARD,))
+    thread = threading.Thread(target=mux.run, daemon=True)
+
+    def start():
+        thread.start()
+
+    def stop():
+        mux.stop()
+        thread.join()
+
+    result = measure(paths, start, stop, monitors)
+    check_concurrent_aggregate(mux, paths, monitors)
+
+    for name, monitor in mux.monitors.items():
+        offline = LogMonitor()
+        offline.ingest_file(monitor.log_path)
+        assert state(offline) == state(monitor), f"{name}: 多路复用的解析结果与离线导入不一致"
+        assert rewards[name] == monitor.rewards.total, f"{name}: 带 source 的奖励事件数不一致"
+    total_rewards = mux.aggregate()["rewards"]
+    assert sum(total_rewards.values()) == sum(sum(m.rewards.amounts["type"].values()) for m in monitors)
+    mux.close()
+    return {**result, "threads": 1}
+
+
+def main(max_logs: int):
+    counts = [n for n in (1, 4, 16, 64) if n <= max_logs]
+    print(f"{'日志数':>6} {'方式':<8} {'线程':>5} {'空闲 CPU ms/s':>14} {'负载 CPU ms/s/份':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            for label, run in (("每份一线程", run_threads), ("多路复用", run_multiplexer)):
+                paths = make_logs(os.path.join(tmp, f"{label}-{count}"), count)
+                result = run(paths)
+                print(f"{count:>6} {label:<8} {result['threads']:>5} {result['idle_ms']:>14.2f} "
+                      f"{result['busy_ms_per_file']:>17.2f}")
+    print("多路复用下各日志源的解析状态与离线导入一致，奖励事件按 source 正确归属，并发 aggregate() 无误")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
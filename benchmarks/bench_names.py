@@ -0,0 +1,124 @@
+# benchmarks/bench_names.py
+"""名称解析：旧版逐条规则匹配与预建索引 + 有界缓存对比
+
+同时校验两者在各类键（精确、带数字后缀、去后缀、关键字、未知）上的结果一致。
+
+用法：python -m benchmarks.bench_names [调用次数]
+"""
+import random
+import re
+import sys
+import time
+
+from src import utils
+from src.utils import (
+    CONSERVATION_NAME_MAP, DROP_NAME_MAP, ENEMY_NAME_MAP,
+    get_chinese_conservation_name, get_chinese_drop_name, get_chinese_enemy_name,
+)
+
+
+def legacy_drop_name(key):
+    if key in DROP_NAME_MAP:
+        return DROP_NAME_MAP[key]
+    if "AyatanSculpture" in key:
+        return "Ayatan 雕像"
+    if "ModPickup" in key:
+        return "Mod"
+    if "EnergyIncrease" in key:
+        return "能量球"
+    if "HealthIncrease" in key:
+        return "生命球"
+    if "Credits" in key:
+        return "现金"
+    if "Ammo" in key:
+        return "弹药"
+    if any(r in key for r in
+           ["Alloy", "Ferrite", "Nano", "Polymer", "Salvage", "Orokin", "Fieldron", "Detonite", "Mutagen", "Neural",
+            "Argon"]):
+        return "资源"
+    return f"未知物品 ({key})"
+
+
+def legacy_enemy_name(raw_key):
+    clean_key = re.sub(r'\d+$', '', raw_key)
+    if clean_key in ENEMY_NAME_MAP:
+        return ENEMY_NAME_MAP[clean_key]
+    base_name = clean_key
+    for suffix in ["Agent", "Spaceman", "Biped", "Quad"]:
+        if base_name.endswith(suffix):
+            base_name = base_name[:-len(suffix)]
+            if base_name in ENEMY_NAME_MAP:
+                return ENEMY_NAME_MAP[base_name]
+    return f"未知敌人 ({raw_key})"
+
+
+def legacy_conservation_name(key):
+    if key in CONSERVATION_NAME_MAP:
+        return CONSERVATION_NAME_MAP[key]
+    base_name = key
+    for suffix in ["Pup", "Alpha"]:
+        if base_name.endswith(suffix):
+            base_name = base_name[:-len(suffix)]
+            if base_name in CONSERVATION_NAME_MAP:
+                return CONSERVATION_NAME_MAP[base_name]
+    return f"未知动物 ({key})"
+
+
+def enemy_keys():
+    keys = []
+    for base in ENEMY_NAME_MAP:
+        for suffix in ("", "Agent", "SpacemanAgent", "QuadAgent", "BipedSpaceman"):
+            keys.append(base + suffix)
+            keys.append(f"{base}{suffix}{random.randint(1, 40)}")
+    keys += ["UnknownThingAgent3", "AgentAgent", "Foo", "12", "SpacemanSpaceman"]
+    return keys
+
+
+def drop_keys():
+    keys = list(DROP_NAME_MAP)
+    keys += [key + "Pickup" for key in DROP_NAME_MAP]
+    keys += ["RifleAmmoPickup", "ShotgunAmmo", "OrokinCellCredits", "NanoAmmoSpores", "WeirdLoot",
+             "HealthIncreaseAmmo", "AyatanSculptureCredits", "FerriteAlloy"]
+    return keys
+
+
+def conservation_keys():
+    keys = []
+    for base in CONSERVATION_NAME_MAP:
+        for suffix in ("", "Pup", "Alpha", "AlphaPup", "PupAlpha"):
+            keys.append(base + suffix)
+    keys += ["Stranger", "Pup", "Alpha"]
+    return keys
+
+
+CASES = [
+    ("drop", drop_keys, legacy_drop_name, get_chinese_drop_name),
+    ("enemy", enemy_keys, legacy_enemy_name, get_chinese_enemy_name),
+    ("conservation", conservation_keys, legacy_conservation_name, get_chinese_conservation_name),
+]
+
+
+def run(func, keys):
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main(count: int):
+    random.seed(7)
+    utils.rebuild_name_indexes()
+    print(f"{'类别':<14} {'旧版 次/秒':>14} {'索引 次/秒':>14} {'加速':>7}")
+    for label, make_keys, legacy, current in CASES:
+        distinct = make_keys()
+        for key in distinct:
+            assert legacy(key) == current(key), key
+        # 模拟实际调用：少数键反复出现
+        keys = [random.choice(distinct) for _ in range(count)]
+        old = run(legacy, keys)
+        new = run(current, keys)
+        print(f"{label:<14} {old:>14,.0f} {new:>14,.0f} {new / old:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
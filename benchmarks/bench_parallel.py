@@ -0,0 +1,51 @@
+# benchmarks/bench_parallel.py
+"""并行解析的扩展曲线：单线程 ingest_file 与不同进程数的 parse_files_parallel 对比
+
+用法：python -m benchmarks.bench_parallel [行数]
+合成日志里每次结算后时间戳跳变 >5000，用来覆盖分块边界上的任务切换。
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.synthetic_log import write_log
+from src.log_parser import LogMonitor
+from src.parallel import parse_files_parallel
+
+
+def recording_monitor():
+    events = []
+    monitor = LogMonitor(
+        on_new_agent=lambda npc: events.append(('agent', npc)),
+        on_mission_start=lambda: events.append(('start',)),
+        on_level_loaded=lambda lvl: events.append(('level', lvl)),
+        on_reward_received=lambda r: events.append(('reward', r.type, r.amount, r.timestamp)),
+        on_reward_cycle=lambda c: events.append(('cycle', c)),
+    )
+    return monitor, events
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "EE.log")
+        write_log(path, count, crlf=True)
+
+        baseline, base_events = recording_monitor()
+        stats = baseline.ingest_file(path)
+        print(f"单线程: {stats['lines_per_sec']:>10,.0f} 行/秒 ({stats['seconds']:.2f}s)")
+
+        chunk_bytes = max(stats['bytes'] // 32, 1)
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            monitor, events = recording_monitor()
+            result = parse_files_parallel(monitor, [path], workers=workers, chunk_bytes=chunk_bytes)
+            assert events == base_events, "并行结果与单线程不一致"
+            assert dict(monitor.enemies) == dict(baseline.enemies)
+            assert monitor.last_timestamp == baseline.last_timestamp
+            print(f"{workers:>2} 进程: {result['lines_per_sec']:>10,.0f} 行/秒 "
+                  f"({result['seconds']:.2f}s, {result['chunks']} 块, 回退 {result['fallbacks']}) "
+                  f"加速 {stats['seconds'] / result['seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
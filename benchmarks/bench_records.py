@@ -0,0 +1,100 @@
+# benchmarks/bench_records.py
+"""事件记录的内存与分配速度：旧版 dict + strftime 与 __slots__ 记录对比
+
+开始前先核对按字典读取回调参数的旧代码（[]、get、in）在新记录上得到与旧版 dict 相同的结果。
+
+用法：python -m benchmarks.bench_records [事件数]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.records import DropRecord, RewardRecord
+from src.utils import get_chinese_drop_name
+
+KEYS = ["AlloyPlatePickup", "FerritePickup", "NanoSporesPickup", "DefaultModPickup", "RifleAmmoPickup"]
+
+
+def legacy_drop(i):
+    raw_key = KEYS[i % 5] + ""  # 模拟正则每次产生新字符串
+    return {
+        'raw_key': raw_key,
+        'chinese_name': get_chinese_drop_name(raw_key),
+        'position': (1.0 * i, 2.0, 3.0),
+        'timestamp': 100.0 + i,
+    }
+
+
+def legacy_reward(i):
+    return {
+        'type': 'credits',
+        'name': '现金',
+        'amount': 100 + i,
+        'timestamp': 100.0 + i,
+        'time': datetime.now().strftime("%H:%M:%S"),
+    }
+
+
+def slotted_drop(i):
+    return DropRecord(sys.intern(KEYS[i % 5] + ""), (1.0 * i, 2.0, 3.0), 100.0 + i)
+
+
+def slotted_reward(i, anchor=time.time() - 100.0):
+    return RewardRecord('credits', sys.intern('现金'), 100 + i, 100.0 + i, None, anchor + 100.0 + i)
+
+
+def legacy_access(record) -> tuple:
+    """旧版回调按 dict 读取事件的写法"""
+    return (
+        record['raw_key'] if 'raw_key' in record else record['name'],
+        record.get('position'),
+        record.get('missing', '默认'),
+        'missing' in record,
+        sorted(key for key in ('raw_key', 'chinese_name', 'type', 'time', 'timestamp') if key in record),
+    )
+
+
+def check_dict_access():
+    for legacy, slotted in ((legacy_drop, slotted_drop), (legacy_reward, slotted_reward)):
+        old, new = legacy(7), slotted(7)
+        assert legacy_access(old) == legacy_access(new), f"{type(new).__name__}: 字典式读取与旧版不一致"
+        assert set(old) <= set(new.to_dict()), f"{type(new).__name__}: to_dict 缺少旧版的键"
+        try:
+            new['missing']
+        except KeyError:
+            pass
+        else:
+            raise AssertionError("缺失的键应抛出 KeyError")
+
+
+def measure(factory, count: int) -> tuple:
+    """返回 (每事件保留字节, 每秒创建事件数)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [factory(i) for i in range(count)]
+    per_event = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    del kept
+
+    start = time.perf_counter()
+    for i in range(count):
+        factory(i)
+    rate = count / (time.perf_counter() - start)
+    return per_event, rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    check_dict_access()
+    for label, legacy, slotted in (("掉落", legacy_drop, slotted_drop), ("奖励", legacy_reward, slotted_reward)):
+        old_bytes, old_rate = measure(legacy, count)
+        new_bytes, new_rate = measure(slotted, count)
+        print(f"{label}: dict {old_bytes:6.0f} B/事件 {old_rate:>10,.0f} 个/秒 | "
+              f"slots {new_bytes:6.0f} B/事件 {new_rate:>10,.0f} 个/秒 | "
+              f"内存 -{1 - new_bytes / old_bytes:.0%} 速度 {new_rate / old_rate:.2f}x")
+    print("旧版按字典读取（[]、get、in）的结果与 dict 一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_rules.py
+"""规则文件：编译耗时（冷启动 vs 磁盘缓存）、与内置规则的一致性、热重载不丢行
+
+1. 内置规则与 200 条合成规则分别编译：无缓存 vs 命中缓存（直接由字节码构造正则）
+2. 去掉 literal、全部由正则推导字面量的规则文件，解析结果与内置规则一致，吞吐相当
+3. 分批解析期间改写规则文件（新增一条 event 规则），核对切换前后每一行都按当时的规则处理
+
+用法：python -m benchmarks.bench_rules [行数]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_log import DEFAULT_MIX, generate_lines
+from src.log_parser import DEFAULT_RULES, LogMonitor
+from src.rules import compile_rules
+
+# pre_gate：进图前也处理，每一行都应产生事件
+HITCH_RULE = {"name": "HITCH", "pattern": r"Hitch detected: ([\d.]+)ms in frame (\d+)",
+              "event": "hitch", "pre_gate": True,
+              "fields": {"ms": {"group": 1, "type": "float"}, "frame": {"group": 2, "type": "int"}}}
+PING_RULE = {"name": "PING", "pattern": r"NRS ping (\d+)ms", "event": "ping", "pre_gate": True,
+             "fields": {"ms": {"group": 1, "type": "int"}}}
+
+
+def synthetic_rules(count: int):
+    return [{"name": f"CUSTOM_{n}", "pattern": rf"Custom{n}\.lua: value (\d+) at Vector\(([^)]*)\)",
+             "event": f"custom_{n}", "fields": {"value": {"group": 1, "type": "int"},
+                                                 "pos": {"group": 2, "type": "vector"}}}
+            for n in range(count)]
+
+
+def timed_compile(specs, cache_dir):
+    start = time.perf_counter()
+    compile_rules(specs, cache_dir)
+    return (time.perf_counter() - start) * 1000
+
+
+def write_rules(path, rules, include_defaults=True):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"include_defaults": include_defaults, "rules": rules}, f)
+
+
+def parse(monitor, lines):
+    start = time.perf_counter()
+    for line in lines:
+        monitor.process_line(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def state(monitor):
+    return (monitor.enemy_total, monitor.items.total, monitor.rewards.total,
+            monitor.conservation_animals.total, monitor.current_level)
+
+
+def main(count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        print(f"{'规则集':<14} {'冷编译':>9} {'命中缓存':>9}")
+        for name, specs in (("内置 18 条", list(DEFAULT_RULES)), ("合成 200 条", synthetic_rules(200))):
+            cold = timed_compile(specs, cache_dir)
+            warm = min(timed_compile(specs, cache_dir) for _ in range(5))
+            print(f"{name:<14} {cold:>7.2f}ms {warm:>7.2f}ms")
+
+        lines = generate_lines(count, DEFAULT_MIX)
+        rules_path = os.path.join(tmp, "rules.json")
+        write_rules(rules_path, [{k: v for k, v in spec.items() if k != "literal"} for spec in DEFAULT_RULES],
+                    include_defaults=False)
+        builtin, derived = LogMonitor(), LogMonitor(rules_path=rules_path)
+        builtin_rate, derived_rate = parse(builtin, lines), parse(derived, lines)
+        assert state(builtin) == state(derived), "推导字面量的规则与内置规则结果不一致"
+        print(f"推导字面量 {len(derived.scanner.literals)} 个（内置 {len(builtin.scanner.literals)} 个），结果一致；"
+              f"吞吐 {derived_rate:,.0f} vs 内置 {builtin_rate:,.0f} 行/秒")
+
+        # 热重载：与 start_monitoring 相同，在批次之间检测并切换
+        write_rules(rules_path, [HITCH_RULE])
+        events = []
+        monitor = LogMonitor(on_rule_event=events.append, rules_path=rules_path)
+        batches = [lines[i:i + 1000] for i in range(0, len(lines), 1000)]
+        switch = len(batches) // 2
+        reload_ms = 0.0
+        for n, batch in enumerate(batches):
+            if n == switch:
+                write_rules(rules_path, [HITCH_RULE, PING_RULE])
+                start = time.perf_counter()
+                assert monitor.reload_rules(), "规则文件修改后应重新加载"
+                reload_ms = (time.perf_counter() - start) * 1000
+            for line in batch:
+                monitor.process_line(line)
+
+        after = [line for batch in batches[switch:] for line in batch]
+        counted = {kind: sum(1 for e in events if e.event == kind) for kind in ("hitch", "ping")}
+        expected = {"hitch": sum("Hitch detected" in line for line in lines),
+                    "ping": sum("NRS ping" in line for line in after)}
+        assert counted == expected, f"热重载丢行或重复: {counted} != {expected}"
+        assert state(monitor) == state(builtin), "热重载前后内置规则的结果应不变"
+        print(f"热重载 {reload_ms:.2f}ms；hitch 事件 {counted['hitch']:,}（全程），"
+              f"ping 事件 {counted['ping']:,}（重载后），与日志行数一致")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
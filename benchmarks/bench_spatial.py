@@ -0,0 +1,108 @@
+# benchmarks/bench_spatial.py
+"""掉落空间索引：网格查询 vs 线性扫描，聚类耗时
+
+在与合成日志相同的坐标范围内随机撒点（部分点集中在若干热点附近），
+比较“半径 R 内的掉落”查询的单次耗时并核对结果，再测聚类与热力图累计；
+界面取副本聚类时持有解析锁的时间（snapshot），以及 LogMonitor.drop_index 只含本次任务的掉落。
+
+用法：python -m benchmarks.bench_spatial [点数]
+"""
+import random
+import sys
+import time
+
+from benchmarks.synthetic_log import SCENARIOS, generate_lines
+from src.bus import ITEM, MISSION_START
+from src.log_parser import LogMonitor
+from src.spatial import GridIndex, Heatmap
+
+
+def generate(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    hot_spots = [(rng.uniform(-500, 500), rng.uniform(-500, 500), rng.uniform(-50, 50)) for _ in range(20)]
+    points = []
+    for n in range(count):
+        if n % 3 == 0:  # 三分之一的掉落聚在热点附近
+            cx, cy, cz = rng.choice(hot_spots)
+            points.append((cx + rng.gauss(0, 3), cy + rng.gauss(0, 3), cz + rng.gauss(0, 1)))
+        else:
+            points.append((rng.uniform(-500, 500), rng.uniform(-500, 500), rng.uniform(-50, 50)))
+    return points
+
+
+def linear_within(points, point, radius):
+    x, y, z = point
+    r2 = radius * radius
+    return [n for n, (px, py, pz) in enumerate(points)
+            if (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2 <= r2]
+
+
+def check_monitor_index(count: int = 200_000):
+    """解析合成日志后，monitor.drop_index 恰好是最后一次任务开始以来的掉落"""
+    monitor = LogMonitor()
+    drops = []
+
+    def on_event(event):
+        if event.kind == MISSION_START:
+            drops.clear()
+        else:
+            drops.append(event.record.position)
+
+    monitor.subscribe(on_event, kinds=(MISSION_START, ITEM))
+    for line in generate_lines(count, SCENARIOS["storm"]):
+        monitor.process_line(line)
+    index = monitor.drop_index
+    assert [index.point(n) for n in range(len(index))] == drops, "drop_index 与本次任务的掉落不一致"
+    return len(index)
+
+
+def main(count: int):
+    points = generate(count)
+    index = GridIndex()
+    start = time.perf_counter()
+    for n, point in enumerate(points):
+        index.add(point, f"Drop{n % 9}")
+    print(f"{count:,} 个点，建索引 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(1)
+    queries = [rng.choice(points) for _ in range(200)]
+    print(f"{'半径':>6} {'网格/次':>10} {'线性/次':>10} {'平均命中':>8}")
+    for radius in (5.0, 10.0, 25.0):
+        start = time.perf_counter()
+        hits = [index.within(q, radius) for q in queries]
+        grid_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        start = time.perf_counter()
+        expected = [linear_within(points, q, radius) for q in queries[:10]]
+        linear_ms = (time.perf_counter() - start) * 1000 / 10
+        assert all(sorted(h) == e for h, e in zip(hits, expected)), "网格查询结果与线性扫描不一致"
+        print(f"{radius:>6.0f} {grid_ms:>8.3f}ms {linear_ms:>8.2f}ms {sum(map(len, hits)) / len(hits):>8.1f}")
+
+    for size in (5_000, count):
+        subset = GridIndex()
+        for point in points[:size]:
+            subset.add(point)
+        start = time.perf_counter()
+        clusters = subset.clusters()
+        print(f"聚类 {size:>7,} 个点: {(time.perf_counter() - start) * 1000:>7.1f} ms，"
+              f"{len(clusters)} 簇，最大 {clusters[0]['size'] if clusters else 0}")
+
+    start = time.perf_counter()
+    snapshot = index.snapshot()
+    snapshot_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    copy = GridIndex.from_snapshot(snapshot)
+    rebuild_ms = (time.perf_counter() - start) * 1000
+    assert sorted(copy.within(queries[0], 25.0)) == sorted(index.within(queries[0], 25.0)), "副本查询结果不一致"
+    print(f"副本 {count:,} 个点: 复制（持锁） {snapshot_ms:.2f} ms，重建 {rebuild_ms:.0f} ms（后台线程）")
+
+    heatmap = Heatmap()
+    start = time.perf_counter()
+    for point in points:
+        heatmap.add("bench", point)
+    print(f"热力图累计 {count:,} 个点: {(time.perf_counter() - start) * 1000:.0f} ms，"
+          f"{len(heatmap.levels['bench'])} 个格子")
+    print(f"LogMonitor.drop_index 与最后一次任务的 {check_monitor_index():,} 个掉落一致")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
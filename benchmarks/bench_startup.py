@@ -0,0 +1,103 @@
+# benchmarks/bench_startup.py
+"""冷启动耗时：无界面版（python -m src）、界面版（main.py）与 PyInstaller onedir 打包版
+
+每个目标在新进程中启动多次取中位数（含解释器启动），并用 -X importtime 列出最慢的导入，
+同时检查无界面版没有导入 tkinter。结果可与 benchmarks/baselines.json 对比。
+
+界面版不能无窗口地运行 main.py，改为在新进程中完成 main.py 的全部导入（GUI_IMPORTS）后退出；
+打包版以 --headless --help 启动，计入引导程序解包与解释器初始化，界面模块的导入耗时由 gui 一项反映。
+
+用法：python -m benchmarks.bench_startup [--runs 5] [--update] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.suite import BASELINE_PATH, compare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXE_NAME = "WarframeMonitor.exe" if sys.platform == "win32" else "WarframeMonitor"
+ONEDIR_EXE = os.path.join(ROOT, "dist", "WarframeMonitor", EXE_NAME)
+
+# 与 main.py 界面模式的导入相同，不创建窗口
+GUI_IMPORTS = "import tkinter; from src.gui_app import WarframeMonitorGUI"
+
+TARGETS = {
+    "headless": [sys.executable, "-m", "src", "--help"],
+    "gui": [sys.executable, "-c", GUI_IMPORTS],
+    "onedir": [ONEDIR_EXE, "--headless", "--help"],
+}
+
+
+def time_command(cmd, runs: int) -> float:
+    """启动到退出的中位耗时（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def import_profile(cmd) -> list:
+    """-X importtime 输出解析为 [(累计微秒, 模块名)]，按耗时降序"""
+    result = subprocess.run([cmd[0], "-X", "importtime", *cmd[1:]], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="冷启动耗时基准")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="把本次结果写入基线")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对波动")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, cmd in TARGETS.items():
+        if name == "onedir" and not os.path.exists(ONEDIR_EXE):
+            print(f"{name:<9} 跳过：未找到 {ONEDIR_EXE}（先运行 pyinstaller WarframeMonitor.spec）")
+            continue
+        results[f"startup.{name}.latency_ms"] = elapsed = time_command(cmd, args.runs)
+        print(f"{name:<9} {elapsed:>8.1f} ms")
+        if name == "onedir":
+            continue  # 冻结程序不支持 -X importtime
+        profile = import_profile(cmd)
+        for cumulative, module in profile[:5]:
+            print(f"    {cumulative / 1000:>7.1f} ms  {module}")
+        if name == "headless" and any(module.split(".")[0] in ("tkinter", "_tkinter") for _, module in profile):
+            print("    错误：无界面版导入了 tkinter")
+            sys.exit(1)
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baselines = json.load(f)
+    if args.update:
+        baselines.update(results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"基线已更新: {BASELINE_PATH}")
+        return
+
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print("\n启动耗时回退：")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
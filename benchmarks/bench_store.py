@@ -0,0 +1,141 @@
+# benchmarks/bench_store.py
+"""会话存储对解析速度的影响：不挂存储 vs 挂 SessionStore（写后台批量提交）
+
+刷怪风暴下大量行都会产生事件；解析线程只入队，不等待磁盘。
+单核机器上写线程与解析线程共享 CPU，比值会低于多核机器。
+结束后等待写线程提交完毕，并核对库中的计数与内存中的一致。
+最后模拟断点续读：断点之后已入库的事件在重放时跳过，库中的结果与一次解析完全相同；
+":memory:" 库（读写共用一个连接）在写线程提交期间从另一线程查询不出错。
+
+用法：python -m benchmarks.bench_store [行数]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic_log import SCENARIOS, generate_lines
+from src.log_parser import LogMonitor
+from src.store import SessionStore
+from src.tailer import LogTailer
+
+
+def run(lines, store=None):
+    counts = {"agent": 0, "item": 0}
+
+    def count(kind):
+        def callback(*args):
+            counts[kind] += 1
+        return callback
+
+    monitor = LogMonitor(on_new_agent=count("agent"), on_new_item=count("item"))
+    if store:
+        store.attach(monitor)
+    process = monitor.process_line
+    start = time.perf_counter()
+    for line in lines:
+        process(line)
+    return monitor, counts, len(lines) / (time.perf_counter() - start)
+
+
+def tail_session(log_path: str, db_path: str, checkpoint_path: str, save_at: int, stop_at: int):
+    """尾随日志写入会话库：读到 save_at 行后保存一次断点，读到 stop_at 行后不再保存断点就退出（模拟崩溃）"""
+    monitor = LogMonitor(log_path=log_path, checkpoint_path=checkpoint_path)
+    store = SessionStore(db_path)
+    store.attach(monitor)
+    offset = monitor._resume_from_checkpoint()
+    tailer = LogTailer(log_path, from_end=False, use_inotify=False, block_size=4096, start_offset=offset,
+                       decode=not monitor._uses_bytes())
+    process = monitor.process_bytes if monitor._uses_bytes() else monitor.process_line
+    done = 0
+    while done < stop_at:
+        lines = tailer.read_lines()
+        if not lines:
+            break
+        for line in lines:
+            process(line)
+        done += len(lines)
+        if save_at and done >= save_at:
+            monitor._save_checkpoint(tailer)
+            save_at = 0
+    tailer.close()
+    store.close()  # 断点之后的事件也已入库
+
+
+def store_summary(db_path: str) -> tuple:
+    store = SessionStore(db_path)
+    summary = ([(m["level"], m["success"], m["ended"] is None) for m in store.missions()],
+               store.enemy_counts(), store.drop_counts(), store.reward_totals(), store.conservation_counts())
+    store.close()
+    return summary
+
+
+def check_resume(lines: list, tmp: str):
+    log_path = os.path.join(tmp, "EE.log")
+    text = "\n".join(lines) + "\n"
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    total = text.count("\n")  # 个别事件跨多行
+    third = total // 3
+    once = os.path.join(tmp, "once.db")
+    tail_session(log_path, once, os.path.join(tmp, "once.json"), 0, total)
+    resumed, checkpoint = os.path.join(tmp, "resumed.db"), os.path.join(tmp, "resumed.json")
+    tail_session(log_path, resumed, checkpoint, third, 2 * third)  # 断点在 1/3 处，入库到 2/3 处
+    tail_session(log_path, resumed, checkpoint, 0, total)          # 从 1/3 处重放到结尾
+    assert store_summary(resumed) == store_summary(once), "断点续读后会话库与一次解析不一致"
+
+
+def check_memory_queries(lines: list):
+    """":memory:" 库：解析（写线程批量提交）期间另一线程不断查询，不应出错，最终计数一致"""
+    store = SessionStore(":memory:", batch_size=64)
+    errors, done = [], threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                store.enemy_counts()
+                store.missions()
+            except Exception as e:
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    _, counts, _ = run(lines, store)
+    store.flush()
+    done.set()
+    reader.join()
+    assert not errors, f"并发查询 :memory: 库出错: {errors[0]!r}"
+    assert sum(store.enemy_counts().values()) == counts["agent"]
+    store.close()
+
+
+def main(count: int):
+    print(f"{'场景':<8} {'无存储 行/秒':>14} {'有存储 行/秒':>14} {'比值':>6} {'落盘耗时':>9} {'事务数':>7}")
+    for scenario in ("mixed", "storm"):
+        lines = generate_lines(count, SCENARIOS[scenario])
+        _, _, plain = run(lines)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SessionStore(os.path.join(tmp, "sessions.db"))
+            monitor, counts, stored = run(lines, store)
+            start = time.perf_counter()
+            store.flush()
+            drain = time.perf_counter() - start
+
+            assert sum(store.enemy_counts().values()) == counts["agent"]
+            assert sum(store.drop_counts().values()) == counts["item"]
+            assert sum(store.reward_totals().values()) == monitor.rewards.amount_total
+            print(f"{scenario:<8} {plain:>14,.0f} {stored:>14,.0f} {stored / plain:>6.2f} "
+                  f"{drain:>8.2f}s {store.batches:>7}")
+            store.close()
+            with contextlib.redirect_stdout(io.StringIO()):
+                check_resume(lines, tmp)
+    check_memory_queries(lines)
+    print("断点续读重放的事件没有重复入库；:memory: 库并发查询无误")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,226 @@
+# benchmarks/server_client.py
+"""本机事件服务的测试客户端：多个 WebSocket 客户端 + /snapshot 检查，并对比解析吞吐
+
+1. 在 port=0 上启动 EventServer，连接 N 个原始 socket 实现的 WebSocket 客户端
+2. 请求 /snapshot，并用 If-None-Match 确认未变化时返回 304
+3. 喂入合成日志，检查每个客户端收到的敌人增量之和等于解析出的敌人事件数
+4. 用 ?since= 从第一个客户端连上之前的版本续传，补发的敌人增量同样一致；超长帧被以 1009 关闭；
+   端口已被占用时 start() 抛出 OSError 而不是卡住
+5. 对比 无服务 / 有服务无客户端 / N 个客户端 三种情况下的解析吞吐
+
+客户端在子进程中运行，避免与解析线程争用同一个 GIL，吞吐对比更接近真实使用。
+
+用法：python -m benchmarks.server_client [--clients 40] [--lines 50000]
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.synthetic_log import SCENARIOS, generate_lines
+from src.bus import AGENT
+from src.log_parser import LogMonitor
+from src.server import EventServer, websocket_accept
+
+
+class Client(threading.Thread):
+    """最小 WebSocket 客户端：只收文本帧，累计敌人增量"""
+
+    def __init__(self, port: int, since=None):
+        super().__init__(daemon=True)
+        self.sock = socket.create_connection(("127.0.0.1", port))
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = "/events" if since is None else f"/events?since={since}"
+        self.sock.sendall((
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode("latin-1"))
+        self.file = self.sock.makefile("rb")
+        response = b""
+        while not response.endswith(b"\r\n\r\n"):
+            response += self.file.readline()
+        if websocket_accept(key).encode() not in response:
+            raise RuntimeError(f"握手失败: {response!r}")
+        # 续传时不发快照，直接从 since 之后的增量开始
+        self.snapshot = json.loads(self._read_frame()) if since is None else {"version": since, "enemies": {}}
+        self.version = self.snapshot["version"]
+        self.enemies = sum(self.snapshot["enemies"].values())
+        self.frames = 0
+
+    def _read_frame(self) -> bytes:
+        first, second = self.file.read(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self.file.read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.file.read(8))[0]
+        payload = self.file.read(length)
+        if first & 0x0F == 0x8:
+            self.close_code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else None
+            raise EOFError
+        return payload
+
+    def send_oversized(self, length: int):
+        """发一个声明载荷为 length 的帧头（只发帧头），服务端应以 1009 关闭"""
+        self.sock.sendall(struct.pack("!BBQ", 0x81, 0x80 | 127, length) + os.urandom(4))
+
+    def run(self):
+        try:
+            while True:
+                message = json.loads(self._read_frame())
+                self.enemies += sum(message.get("enemies", {}).values())
+                self.version = message["version"]
+                self.frames += 1
+        except (EOFError, OSError, ValueError):
+            pass
+
+    def close(self):
+        # 客户端发出的帧必须带掩码；close 帧载荷为空
+        self.sock.sendall(struct.pack("!BB", 0x88, 0x80) + os.urandom(4))
+        self.sock.close()
+
+
+def fetch_snapshot(port: int, etag=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", "/snapshot", headers={"If-None-Match": etag} if etag else {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response.status, response.getheader("ETag"), body
+
+
+def run_clients(port: int, count: int):
+    """子进程入口：连接客户端后输出 ready；从 stdin 读到目标版本后等待追平，输出各客户端的敌人增量"""
+    clients = [Client(port) for _ in range(count)]
+    for client in clients:
+        client.start()
+    print("ready", flush=True)
+    target = int(sys.stdin.readline())
+    deadline = time.time() + 10
+    while time.time() < deadline and any(c.version < target for c in clients):
+        time.sleep(0.05)
+    result = [{"enemies": c.enemies - sum(c.snapshot["enemies"].values()), "frames": c.frames,
+               "version": c.version} for c in clients]
+    for client in clients:
+        client.close()
+    print(json.dumps(result), flush=True)
+
+
+def expected_agents(lines, rounds: int = 1) -> int:
+    """同样喂三轮时，最后 rounds 轮的敌人事件数"""
+    monitor = LogMonitor()
+    for line in lines * (3 - rounds):
+        monitor.process_line(line)
+    agents = []
+    monitor.subscribe(agents.append, kinds=(AGENT,), name="counter")
+    for line in lines * rounds:
+        monitor.process_line(line)
+    return len(agents)
+
+
+def check_resume(port: int, since: int, target: int, expected: int):
+    """从 since 续传：不发快照，补发的敌人增量与期望一致；之后发超长帧，服务端以 1009 关闭"""
+    client = Client(port, since=since)
+    client.start()
+    deadline = time.time() + 10
+    while time.time() < deadline and client.version < target:
+        time.sleep(0.05)
+    assert client.enemies == expected, f"续传的敌人增量 {client.enemies}，期望 {expected}"
+    client.send_oversized(1 << 40)
+    client.join(5)
+    assert getattr(client, "close_code", None) == 1009, "超长帧应以 1009 关闭"
+    client.sock.close()
+
+
+def check_port_in_use(port: int):
+    """在已被监听的端口上启动第二个服务：start() 应立即抛出 OSError 并退订"""
+    monitor = LogMonitor()
+    second = EventServer(monitor, port=port)
+    try:
+        second.start()
+    except OSError:
+        pass
+    else:
+        second.stop()
+        raise AssertionError("端口被占用时 start() 应抛出 OSError")
+    assert not monitor.event_bus.subscriptions, "启动失败后应取消订阅"
+
+
+def parse_rate(monitor, lines) -> float:
+    process = monitor.process_line
+    start = time.perf_counter()
+    for line in lines:
+        process(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="事件服务测试客户端")
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--connect", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.connect:
+        run_clients(args.connect, args.clients)
+        return
+
+    lines = generate_lines(args.lines, SCENARIOS["mixed"])
+    base = parse_rate(LogMonitor(), lines)
+
+    monitor = LogMonitor()
+    server = EventServer(monitor, port=0)
+    server.start()
+    idle_since = server.version
+    idle = parse_rate(monitor, lines)  # 此时还没有客户端，事件也要进入历史
+
+    status, etag, body = fetch_snapshot(server.port)
+    assert status == 200, status
+    status, _, _ = fetch_snapshot(server.port, etag)
+    assert status == 304, f"状态未变时应返回 304，实际 {status}"
+    print(f"/snapshot: {len(body)} 字节，ETag {etag}，重复请求 304")
+
+    child = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.server_client", "--connect", str(server.port),
+         "--clients", str(args.clients)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    assert child.stdout.readline().strip() == "ready"
+    busy = parse_rate(monitor, lines)
+    child.stdin.write(f"{server.version}\n")
+    child.stdin.flush()
+    clients = json.loads(child.stdout.readline())
+    child.wait()
+    check_resume(server.port, idle_since, server.version, expected_agents(lines, rounds=2))
+    print(f"?since={idle_since} 续传补发了没有客户端时的事件，增量一致；超长帧以 1009 关闭")
+    check_port_in_use(server.port)
+    print("端口被占用时 start() 立即抛出 OSError")
+    server.stop()
+
+    # 客户端连上时的快照里已有上一轮的敌人，增量只应覆盖本轮；
+    # 另用一个不计时的 monitor 重放同样的三轮得到期望值，不给计时的 monitor 多挂订阅者
+    expected = expected_agents(lines)
+    wrong = [c for c in clients if c["enemies"] != expected]
+    frames = sum(c["frames"] for c in clients) / len(clients)
+    print(f"{args.clients} 个客户端：每个平均 {frames:.0f} 帧，敌人增量 {expected}，不一致 {len(wrong)} 个，"
+          f"断开 {server.clients_dropped} 个")
+    print(f"CPU 核数 {os.cpu_count()}（单核时客户端进程与解析线程争用 CPU）")
+    print(f"{'场景':<14} {'行/秒':>12} {'相对':>6}")
+    for name, rate in (("无服务", base), ("服务无客户端", idle), (f"{args.clients} 个客户端", busy)):
+        print(f"{name:<14} {rate:>12,.0f} {rate / base:>6.2f}")
+    if wrong:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
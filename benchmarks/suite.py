@@ -0,0 +1,171 @@
+# benchmarks/suite.py
+"""解析器基准套件（无需 Tk 与游戏，可在 Linux 无头环境运行）
+
+测量：
+- process_line 吞吐量（噪声 / 混合 / 刷怪风暴三种场景）
+- 尾随器从写入一行到回调触发的延迟
+- 每百万行保留的内存
+
+结果与 benchmarks/baselines.json 对比，超出容差视为回退并以非零状态退出。
+
+用法：python -m benchmarks.suite [--quick] [--update] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.synthetic_log import SCENARIOS, generate_lines
+from src.log_parser import LogMonitor
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# 指标方向：True 表示越大越好
+HIGHER_IS_BETTER = {
+    "lines_per_sec": True,
+    "latency_ms": False,
+    "bytes_per_million_lines": False,
+}
+# 绝对容差：亚毫秒级延迟的相对波动很大（max 受调度抖动影响），差值小于此值不算回退
+ABSOLUTE_SLACK = {
+    "latency_ms": 5.0,
+}
+
+
+def bench_throughput(count: int) -> dict:
+    """各场景下 process_line 的行/秒"""
+    results = {}
+    for scenario, mix in SCENARIOS.items():
+        lines = generate_lines(count, mix)
+        monitor = LogMonitor()
+        process = monitor.process_line
+        start = time.perf_counter()
+        for line in lines:
+            process(line)
+        results[f"process_line.{scenario}.lines_per_sec"] = count / (time.perf_counter() - start)
+    return results
+
+
+def bench_tailer_latency(samples: int) -> dict:
+    """从追加写入一行到 LogMonitor 回调触发的延迟（含空闲退避）"""
+    received = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "EE.log")
+        open(path, "w").close()
+        monitor = LogMonitor(
+            log_path=path,
+            on_reward_received=lambda r: received.setdefault(r.amount, time.perf_counter()),
+        )
+        thread = threading.Thread(target=monitor.start_monitoring, daemon=True)
+        thread.start()
+        time.sleep(0.2)
+
+        latencies = []
+        with open(path, "a", encoding="utf-8") as f:
+            # 先写几行让监控进入任务状态
+            for i in range(3):
+                f.write(f"{1.0 + i * 0.1:.3f} Sys [Info]: warmup\n")
+            f.flush()
+            time.sleep(0.1)
+            for seq in range(1, samples + 1):
+                # 间隔不等，覆盖退避的不同阶段
+                time.sleep(0.005 + (seq % 7) * 0.01)
+                written = time.perf_counter()
+                f.write(f"{2.0 + seq * 0.01:.3f} Script [Info]: CreditsReward.lua: Awarding {seq} credits\n")
+                f.flush()
+                deadline = written + 1.0
+                while seq not in received and time.perf_counter() < deadline:
+                    time.sleep(0.0005)
+                if seq in received:
+                    latencies.append((received[seq] - written) * 1000)
+        monitor.stop_monitoring()
+        thread.join(timeout=1.0)
+
+    latencies.sort()
+    return {
+        "tailer.p50.latency_ms": statistics.median(latencies),
+        "tailer.p95.latency_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "tailer.max.latency_ms": latencies[-1],
+    }
+
+
+def bench_memory(count: int) -> dict:
+    """处理 count 行后 LogMonitor 保留的内存，折算为每百万行"""
+    results = {}
+    for scenario in ("mixed", "storm"):
+        lines = generate_lines(count, SCENARIOS[scenario])
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        monitor = LogMonitor()
+        for line in lines:
+            monitor.process_line(line)
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results[f"memory.{scenario}.bytes_per_million_lines"] = retained * 1_000_000 / count
+        del monitor
+    return results
+
+
+def compare(results: dict, baselines: dict, tolerance: float) -> list:
+    """返回超出容差的指标说明列表"""
+    regressions = []
+    for name, value in results.items():
+        base = baselines.get(name)
+        if not base:
+            continue
+        unit = name.rsplit(".", 1)[1]
+        higher = HIGHER_IS_BETTER[unit]
+        if abs(value - base) <= ABSOLUTE_SLACK.get(unit, 0.0):
+            continue
+        change = (value - base) / base
+        if (higher and change < -tolerance) or (not higher and change > tolerance):
+            regressions.append(f"{name}: {value:,.2f} (基线 {base:,.2f}, {change:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LogMonitor 基准套件")
+    parser.add_argument("--quick", action="store_true", help="缩小规模，快速检查")
+    parser.add_argument("--update", action="store_true", help="把本次结果写为新基线")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对波动")
+    args = parser.parse_args(argv)
+
+    scale = 0.2 if args.quick else 1.0
+    results = {}
+    results.update(bench_throughput(int(200_000 * scale)))
+    results.update(bench_tailer_latency(int(100 * scale) or 10))
+    # 内存含固定开销，行数不随 --quick 缩放，保证与基线可比
+    results.update(bench_memory(200_000))
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baselines = json.load(f)
+    for name, value in results.items():
+        base = baselines.get(name)
+        note = f"  (基线 {base:,.2f})" if base else ""
+        print(f"{name:<45} {value:>16,.2f}{note}")
+
+    if args.update:
+        baselines.update(results)  # 保留其他基准（如启动耗时）写入的条目
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"基线已更新: {BASELINE_PATH}")
+        return
+
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print("\n性能回退：")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
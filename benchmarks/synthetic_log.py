@@ -0,0 +1,185 @@
+# benchmarks/synthetic_log.py
+"""合成 EE.log 生成器
+
+按可配置的事件配比生成日志：刷怪风暴、掉落传送、保育遭遇、生存轮次奖励、
+结算行以及大量无关噪声。只依赖标准库，可在没有游戏和 Tk 的 Linux 上运行。
+
+用法：python -m benchmarks.synthetic_log out.log --lines 1000000 --mix agent_storm=0.3,noise=0.6
+"""
+import argparse
+import random
+from typing import Dict, Iterator, List, Optional
+
+# 各类事件的默认权重（按“事件”计，一次刷怪风暴会产出多行）
+DEFAULT_MIX: Dict[str, float] = {
+    "noise": 0.90,
+    "agent_storm": 0.03,
+    "teleport": 0.03,
+    "conservation": 0.005,
+    "survival_cycle": 0.005,
+    "reward": 0.02,
+    "level": 0.005,
+    "end_of_match": 0.005,
+}
+
+# 预设场景，供基准套件复用
+SCENARIOS: Dict[str, Dict[str, float]] = {
+    "noise": {"noise": 1.0},
+    "mixed": DEFAULT_MIX,
+    "storm": {"noise": 0.5, "agent_storm": 0.4, "teleport": 0.08, "reward": 0.02},
+}
+
+NOISE_LINES = [
+    "Sys [Info]: GameRulesImpl - changing state from SS_WAITING_FOR_PLAYERS to SS_STARTED",
+    "Net [Info]: Replication count by type: 1234 objects, 56 bytes",
+    "Game [Info]: /Lotus/Levels/Proc/Grineer/GrineerGalleonDefense.level loaded 1.23ms",
+    "Sys [Info]: Streaming: 12 pending, 3 in-flight, budget 512MB",
+    "Gfx [Info]: Texture pool grow to 1024MB",
+    "Script [Info]: HudRedux.lua: Updating objective marker for player 0",
+    "AI [Info]: Navmesh tile 12,34 rebuilt in 0.45ms",
+    "Sys [Warning]: Hitch detected: 34.5ms in frame 123456",
+    "Script [Info]: Background load of /Lotus/Objects/Guild/Props/DojoCrate.fbx finished",
+    "Net [Info]: NRS ping 45ms, packet loss 0.0%",
+]
+
+ENEMIES = [
+    "Lancer", "HeavyGunner", "Butcher", "EliteLancer", "Scorpion", "Ballista", "Napalm",
+    "Runner", "Charger", "Mutalist", "Ancient", "Crawler", "Detron", "Osprey", "ArachnoidCoolant",
+]
+DROPS = [
+    "AlloyPlatePickup", "FerritePickup", "NanoSporesPickup", "DefaultModPickup", "CreditsPickup",
+    "EnergyIncreaseSmall", "HealthIncreaseSmall", "RifleAmmoPickup", "ShotgunAmmoPickup",
+]
+ANIMALS = ["OrokinKubrow", "LegendaryKubrow", "SnowRodent", "Kubrodon", "Condroc"]
+LEVELS = [
+    "/Lotus/Levels/Proc/Orokin/OrokinTowerSurvival.level",
+    "/Lotus/Levels/Proc/Grineer/GrineerGalleonDefense.level",
+    "/Lotus/Levels/Proc/PlainsOfEidolon/PlainsOfEidolon.level",
+]
+
+
+class SyntheticLog:
+    """按配比随机生成带递增时间戳的日志行"""
+
+    def __init__(self, mix: Optional[Dict[str, float]] = None, seed: int = 0, start_ts: float = 100.0):
+        mix = dict(mix or DEFAULT_MIX)
+        self.kinds = [kind for kind, weight in mix.items() if weight > 0]
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.rng = random.Random(seed)
+        self.ts = start_ts
+        self._cycle = 0
+
+    def _tick(self) -> str:
+        self.ts += self.rng.random() * 0.01
+        return f"{self.ts:.3f}"
+
+    def _vector(self) -> str:
+        r = self.rng
+        return f"{r.uniform(-500, 500):.3f}, {r.uniform(-500, 500):.3f}, {r.uniform(-50, 50):.3f}"
+
+    def _event(self, kind: str) -> List[str]:
+        r = self.rng
+        if kind == "noise":
+            return [f"{self._tick()} {r.choice(NOISE_LINES)}"]
+        if kind == "agent_storm":
+            return [
+                f"{self._tick()} AI [Info]: OnAgentCreated /Npc/{r.choice(ENEMIES)}Agent{r.randint(1, 99)} "
+                f"Live {r.randint(1, 80)} Spawned {r.randint(1, 500)} Ticking {r.randint(1, 80)}"
+                for _ in range(r.randint(5, 40))
+            ]
+        if kind == "teleport":
+            return [
+                f"{self._tick()} Script [Info]: TeleportAndFade.lua: Teleporting {r.choice(DROPS)} "
+                f"from Vector({self._vector()}) -> Vector({self._vector()})"
+            ]
+        if kind == "conservation":
+            animal = r.choice(ANIMALS)
+            gender = r.choice(["", "Female", "Male"])
+            return [
+                f"{self._tick()} AI [Info]: ENCMGR: Encounter /Lotus/Types/Gameplay/Conservation/{animal}/"
+                f"{animal}Encounter started at {self.ts:.1f} at pos ({self._vector()})",
+                f"{self._tick()} AI [Info]: OnAgentCreated /Npc/Common{gender}{animal}Agent{r.randint(1, 99)} "
+                f"Live 3 Spawned 3 Ticking 3",
+            ]
+        if kind == "survival_cycle":
+            self._cycle += 1
+            return [
+                f"{self._tick()} Script [Info]: SurvivalMission.lua: Survival: Host reward {self._cycle}",
+                f"{self._tick()} Script [Info]: GiveInventoryItem.lua: Giving /Lotus/StoreItems/Types/Items/MiscItems/OrokinCell to player",
+            ]
+        if kind == "reward":
+            return [r.choice([
+                f"{self._tick()} Script [Info]: CreditsReward.lua: Awarding {r.randint(100, 5000)} credits",
+                f"{self._tick()} Script [Info]: Affinity.lua: Awarding {r.randint(10, 900)} affinity",
+                f"{self._tick()} Script [Info]: LotusGameRules.lua: Extra reward: /Lotus/Types/Items/Gems/Argon",
+                f"{self._tick()} Script [Info]: EndlessMission.lua: Extract reward: /Lotus/Types/Items/Fish/Common",
+                f"{self._tick()} Script [Info]: SyndicateXP base for mission: {r.randint(100, 2000)}",
+                f"{self._tick()} Script [Info]: SyndicateXP post multiplier: {r.randint(100, 4000)}",
+            ])]
+        if kind == "level":
+            level = r.choice(LEVELS)
+            return [
+                f"{self._tick()} Sys [Info]: Loading level {level}",
+                f"{self._tick()} Sys [Info]: Level loaded: {level}",
+            ]
+        if kind == "end_of_match":
+            lines = [f"{self._tick()} Script [Info]: EndOfMatch.lua: Mission {r.choice(['Succeeded', 'Failed'])}"]
+            # 结算后回到飞船，时间戳大幅跳变即下一次任务
+            self.ts += 6000
+            self._cycle = 0
+            return lines
+        raise ValueError(f"未知事件类型: {kind}")
+
+    def lines(self, count: int) -> Iterator[str]:
+        """生成恰好 count 行（不含换行符）"""
+        produced = 0
+        while produced < count:
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            for line in self._event(kind):
+                yield line
+                produced += 1
+                if produced >= count:
+                    return
+
+
+def generate_lines(count: int, mix: Optional[Dict[str, float]] = None, seed: int = 0) -> List[str]:
+    """生成 count 行日志（带换行符），便于直接喂给 process_line 或写文件"""
+    return [line + "\n" for line in SyntheticLog(mix, seed).lines(count)]
+
+
+def write_log(path: str, count: int, mix: Optional[Dict[str, float]] = None, seed: int = 0,
+              crlf: bool = False) -> int:
+    """把 count 行合成日志写入 path，返回写入字节数"""
+    newline = "\r\n" if crlf else "\n"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for line in SyntheticLog(mix, seed).lines(count):
+            f.write(line + newline)
+        return f.tell()
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """解析形如 agent_storm=0.3,noise=0.6 的配比参数"""
+    mix = {}
+    for part in filter(None, text.split(",")):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成 EE.log")
+    parser.add_argument("path", help="输出文件路径")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="行数")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="事件配比，如 agent_storm=0.3,noise=0.6")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), help="使用预设配比")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--crlf", action="store_true", help="使用 Windows 换行")
+    args = parser.parse_args(argv)
+
+    mix = args.mix or SCENARIOS.get(args.scenario)
+    size = write_log(args.path, args.lines, mix, args.seed, args.crlf)
+    print(f"已生成 {args.lines:,} 行 / {size / 1e6:.1f} MB -> {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,36 @@
 # main.py
-from src.gui_app import WarframeMonitorGUI
-import tkinter as tk
+import sys
 
 if __name__ == "__main__":
+    if "--headless" in sys.argv:
+        # 无界面模式，不导入 tkinter（等同于 python -m src）
+        from src.__main__ import main
+        main([arg for arg in sys.argv[1:] if arg != "--headless"])
+        sys.exit()
+
+    import tkinter as tk
+    from src.gui_app import WarframeMonitorGUI
+
     root = tk.Tk()
-    app = WarframeMonitorGUI(root, debug=True)
-    # app = WarframeMonitorGUI(root, debug=False)
-    root.mainloop()
\ No newline at end of file
+    # --instrument 打开性能埋点与统计页；--store 把任务记录写入本地 SQLite；
+    # --serve 启动本机 HTTP/WebSocket 事件服务；--debug 打印原始日志
+    store = None
+    if "--store" in sys.argv:
+        from src.store import SessionStore
+        store = SessionStore()
+    app = WarframeMonitorGUI(root, debug="--debug" in sys.argv, instrument="--instrument" in sys.argv, store=store)
+    server = None
+    if "--serve" in sys.argv:
+        from src.server import EventServer
+        server = EventServer(app.monitor)
+        try:
+            server.start()
+        except OSError as e:  # 端口被占用（如已有一个实例在运行）时只关闭事件服务，界面照常使用
+            print(f"事件服务启动失败: {e}")
+            app.status_var.set(f"⚠️ 事件服务启动失败: {e}")
+            server = None
+    root.mainloop()
+    if server:
+        server.stop()
+    if store:
+        store.close()
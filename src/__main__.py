@@ -0,0 +1,200 @@
+# src/__main__.py
+"""无界面模式：python -m src [--log PATH] [--format text|jsonl] [--output FILE] ...
+
+不导入 tkinter，可作为后台进程运行。日志路径按
+--log > 环境变量 WARFRAME_LOG > 配置文件 log_path > 自动探测 的顺序确定。
+--log 可重复指定多份日志（[名称=]路径），由 src/multiplex.py 在一个线程里同时监控，事件带日志源名称。
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+
+from .bus import AGENT, CONSERVATION, EVENT_KINDS, ITEM, LEVEL, MISSION_COMPLETE, MISSION_START, REWARD, RULE
+from .checkpoint import HEADLESS_CHECKPOINT_PATH
+from .config import SERVER_PORT, configured_log_path, configured_rules_path, load_config
+from .export import EventExporter, event_to_dict, guess_format
+from .log_parser import LogMonitor
+from .utils import get_chinese_conservation_name, get_chinese_enemy_name
+
+
+def format_text(event) -> str:
+    """一行可读文本"""
+    record, kind = event.record, event.kind
+    if kind == AGENT:
+        text = f"敌人 {get_chinese_enemy_name(record.npc_type)} ({record.raw_npc})"
+    elif kind == ITEM:
+        text = f"掉落 {record.chinese_name} @ {record.position}"
+    elif kind == REWARD:
+        text = f"奖励 {record.name} x{record.amount}"
+    elif kind == CONSERVATION:
+        text = f"保育 {get_chinese_conservation_name(record.type)}" + (f" @ {record.position}" if record.position else "")
+    elif kind == MISSION_START:
+        text = f"任务开始 {record.level or ''}"
+    elif kind == MISSION_COMPLETE:
+        text = "任务成功" if record.success else "任务失败"
+    elif kind == LEVEL:
+        text = f"地图 {record.level}"
+    elif kind == RULE:
+        text = " ".join([record.event] + [f"{name}={value}" for name, value in record.fields.items()])
+    else:
+        text = kind
+    source = f"{event.source}: " if event.source is not None else ""
+    return f"[{record.timestamp:.3f}] {source}{text}"
+
+
+def format_jsonl(event) -> str:
+    """一行 JSON：kind（多日志时加 source）与记录字段"""
+    return json.dumps(event_to_dict(event), ensure_ascii=False)
+
+
+FORMATTERS = {"text": format_text, "jsonl": format_jsonl}
+SAFE_NAME = re.compile(r'[^\w.-]+')  # 日志源名称中不适合做文件名的字符
+
+
+def parse_log_spec(spec: str) -> tuple:
+    """[名称=]路径 → (名称, 路径)；没有名称时用路径"""
+    name, sep, path = spec.partition("=")
+    return (name, path) if sep and name and path else (spec, spec)
+
+
+def parse_kinds(value: str) -> list:
+    """--kinds 的取值：逗号分隔的事件类型，未知类型在参数解析阶段报错"""
+    kinds = [kind.strip() for kind in value.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in EVENT_KINDS]
+    if unknown or not kinds:
+        problem = f"未知的事件类型 {','.join(unknown)}" if unknown else "未指定事件类型"
+        raise argparse.ArgumentTypeError(f"{problem}（可选：{','.join(EVENT_KINDS)}）")
+    return kinds
+
+
+def source_checkpoint(checkpoint: str, name: str) -> str:
+    """每个日志源单独的断点文件：checkpoint-headless.json → checkpoint-headless-<名称>.json"""
+    root, ext = os.path.splitext(checkpoint)
+    return f"{root}-{SAFE_NAME.sub('_', name).strip('_')}{ext}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src", description="Warframe 日志监控（无界面）")
+    parser.add_argument("--log", action="append",
+                        help="EE.log 路径（默认读取配置或自动探测）；可重复指定多份，写作 [名称=]路径")
+    parser.add_argument("--config", help="配置文件路径（默认 ~/.warframe-better/config.json）")
+    parser.add_argument("--format", choices=sorted(FORMATTERS), default="text", help="事件输出格式")
+    parser.add_argument("--output", help="把事件追加写入文件（默认输出到终端）")
+    parser.add_argument("--kinds", type=parse_kinds, help=f"只输出这些事件类型，逗号分隔：{','.join(EVENT_KINDS)}")
+    parser.add_argument("--rules", help="日志规则文件（默认读取配置或 ~/.warframe-better/rules.json），修改后自动重新加载")
+    parser.add_argument("--checkpoint", default=HEADLESS_CHECKPOINT_PATH, help="断点文件路径（默认与界面版分开）")
+    parser.add_argument("--no-checkpoint", action="store_true", help="不使用断点，从文件末尾开始")
+    parser.add_argument("--store", metavar="DB", help="同时写入 SQLite 会话库")
+    parser.add_argument("--export", metavar="FILE",
+                        help="把事件（受 --kinds 过滤）追加导出到文件，格式按扩展名：.jsonl / .csv（可加 .gz）/ .wfev（二进制，见 src.export）")
+    parser.add_argument("--serve", nargs="?", type=int, const=SERVER_PORT, metavar="PORT",
+                        help=f"启动本机 HTTP/WebSocket 事件服务（默认端口 {SERVER_PORT}）")
+    parser.add_argument("--debug", action="store_true", help="打印原始日志行")
+    args = parser.parse_args(argv)
+    if args.export:
+        try:
+            guess_format(args.export)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.log and len(args.log) > 1:
+        if args.store or args.serve is not None:
+            parser.error("--store 与 --serve 目前只支持单个日志")
+        return main_multi(args)
+
+    config = load_config(args.config)
+    monitor = LogMonitor(
+        log_path=configured_log_path(parse_log_spec(args.log[0])[1] if args.log else None, config),
+        debug=args.debug,
+        checkpoint_path=None if args.no_checkpoint else args.checkpoint,
+        rules_path=configured_rules_path(args.rules, config),
+    )
+    store = None
+    if args.store:
+        from .store import SessionStore
+
+        store = SessionStore(args.store)
+        store.attach(monitor)
+
+    server = None
+    if args.serve is not None:
+        from .server import EventServer
+
+        server = EventServer(monitor, port=args.serve)
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                server.start()
+        except OSError as e:  # 端口被占用等
+            print(f"事件服务启动失败: {e}", file=sys.stderr)
+            if store:
+                store.close()
+            sys.exit(1)
+
+    out = open(args.output, "a", encoding="utf-8", buffering=1) if args.output else sys.stdout
+    formatter = FORMATTERS[args.format]
+    kinds = args.kinds
+    monitor.subscribe(lambda event: print(formatter(event), file=out), kinds=kinds, name="output")
+    exporter = EventExporter(args.export) if args.export else None
+    if exporter:
+        exporter.attach(monitor, kinds=kinds)
+
+    try:
+        # 状态信息改走 stderr，stdout 只有事件，便于管道给其他程序
+        with contextlib.redirect_stdout(sys.stderr):
+            monitor.start_monitoring()
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if server:
+            server.stop()
+        if store:
+            store.close()
+        if exporter:
+            exporter.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+def main_multi(args):
+    """多份日志：单线程多路复用，每份日志独立的解析状态与断点"""
+    from .multiplex import LogMultiplexer
+
+    config = load_config(args.config)
+    rules_path = configured_rules_path(args.rules, config)
+    mux = LogMultiplexer()
+    try:
+        for name, path in map(parse_log_spec, args.log):
+            mux.add(path, name=name, debug=args.debug, rules_path=rules_path,
+                    checkpoint_path=None if args.no_checkpoint else source_checkpoint(args.checkpoint, name))
+            print(f"[LogMultiplexer] 开始监控日志 {name}: {path}", file=sys.stderr)
+    except (FileNotFoundError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    out = open(args.output, "a", encoding="utf-8", buffering=1) if args.output else sys.stdout
+    formatter = FORMATTERS[args.format]
+    kinds = args.kinds
+    mux.subscribe(lambda event: print(formatter(event), file=out), kinds=kinds, name="output")
+    exporter = EventExporter(args.export) if args.export else None
+    if exporter:
+        exporter.attach(mux, kinds=kinds)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            mux.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mux.close()
+        if exporter:
+            exporter.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
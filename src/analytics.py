@@ -0,0 +1,308 @@
+# src/analytics.py
+"""跨任务分析：按列存储每一次结算的任务，向量化查询各节点的掉落率、生存轮次时间与敌人构成
+
+每列是一个定长类型的 array（地图名按字典编码为整数），几万条任务也只占几 MB，
+查询按列整体计算而不是逐行扫描字典。安装了 NumPy 时用 bincount / nanmedian，
+否则退回纯 Python 的逐列循环，结果一致。
+
+用法：
+    python -m src.ingest *.log --analytics missions.col   # 从归档日志建表（追加）
+    python -m src.analytics missions.col                  # 输出各节点报告
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Dict, List, Optional
+
+from .bus import MISSION_COMPLETE, MISSION_START, REWARD, SYNC, Subscription
+from .config import CONFIG_DIR
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖
+    np = None
+
+DEFAULT_TABLE_PATH = os.path.join(CONFIG_DIR, "missions.col")
+
+# 固定列：名称 → array 类型码
+COLUMNS = {
+    "level": "i",        # 地图字典编码
+    "started": "d",      # 本机时间（秒）
+    "duration": "d",     # 任务时长（日志时间，秒）
+    "success": "b",      # 1 成功 / 0 失败
+    "credits": "q",
+    "affinity": "q",
+    "cycles": "i",       # 生存轮次数
+    "cycle_time": "d",   # 生存轮次平均间隔（秒），不足两轮为 NaN
+}
+COUNT_TYPECODE = "i"     # 敌人 / 掉落 / 奖励计数列
+_DTYPES = {"b": "int8", "i": "int32", "q": "int64", "d": "float64"}  # array 类型码 → NumPy dtype
+NAN = float("nan")
+
+
+def tileset_of(level: Optional[str]) -> str:
+    """地图路径 → 地形集，如 /Lotus/Levels/Proc/Grineer/GrineerGalleonDefense.level → Grineer"""
+    if not level:
+        return "未知"
+    parent = level.rsplit("/", 2)
+    return parent[-2] if len(parent) == 3 and parent[-2] else level
+
+
+class MissionTable:
+    """列式任务表：固定列 + 按类型动态增加的计数列（敌人、掉落、奖励）"""
+
+    def __init__(self):
+        self.levels: List[str] = []           # 地图字典：编码 → 名称
+        self._level_codes: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {name: array(code) for name, code in COLUMNS.items()}
+        # 计数列：组 → {类型: array}；新类型出现时为之前的行补零
+        self.counts: Dict[str, Dict[str, array]] = {"enemies": {}, "drops": {}, "rewards": {}}
+        self._mask_cache: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns["level"])
+
+    def _level_code(self, level: Optional[str]) -> int:
+        level = level or "未知"
+        code = self._level_codes.get(level)
+        if code is None:
+            code = self._level_codes[level] = len(self.levels)
+            self.levels.append(level)
+        return code
+
+    def append(self, level: Optional[str], started: float, duration: float, success: bool,
+               enemies: Dict[str, int], drops: Dict[str, int], rewards: Dict[str, int],
+               credits: int = 0, affinity: int = 0, cycles: int = 0,
+               cycle_time: Optional[float] = None):
+        """追加一行"""
+        row = len(self)
+        values = {
+            "level": self._level_code(level), "started": started, "duration": duration,
+            "success": 1 if success else 0, "credits": credits, "affinity": affinity,
+            "cycles": cycles, "cycle_time": NAN if cycle_time is None else cycle_time,
+        }
+        for name, column in self.columns.items():
+            column.append(values[name])
+        for group, data in (("enemies", enemies), ("drops", drops), ("rewards", rewards)):
+            group_columns = self.counts[group]
+            for key, count in data.items():
+                column = group_columns.get(key)
+                if column is None:
+                    column = group_columns[key] = array(COUNT_TYPECODE, bytes(row * array(COUNT_TYPECODE).itemsize))
+                column.append(count)
+            for column in group_columns.values():
+                if len(column) == row:
+                    column.append(0)
+
+    # === 向量化查询 ===
+    def _masks(self, name: str, codes, groups: int) -> List[bytearray]:
+        """纯 Python 路径：每个分组一个 0/1 选择掩码，表长不变时复用"""
+        cached = self._mask_cache.get(name)
+        if cached and cached[0] == len(self):
+            return cached[1]
+        masks = [bytearray(len(codes)) for _ in range(groups)]
+        for i, code in enumerate(codes):
+            masks[code][i] = 1
+        self._mask_cache[name] = (len(self), masks)
+        return masks
+
+    def _group_sum(self, name: str, codes, values, groups: int) -> List[float]:
+        """按编码分组求和（values 为 array 或 array 列表，列表时各列累加）"""
+        columns = values if isinstance(values, list) else [values]
+        if np is not None:
+            keys = np.frombuffer(codes, dtype=np.int32)
+            totals = np.zeros(groups)
+            for column in columns:
+                totals += np.bincount(keys, weights=np.frombuffer(column, dtype=_DTYPES[column.typecode]),
+                                      minlength=groups)
+            return totals.tolist()
+        # compress + sum 都在 C 层循环，每组每列只过一遍
+        masks = self._masks(name, codes, groups)
+        return [float(sum(sum(compress(column, mask)) for column in columns)) for mask in masks]
+
+    def _per_node(self, numerator, per: float) -> Dict[str, float]:
+        """各地图 numerator 之和 / 时长之和 × per"""
+        groups = len(self.levels)
+        codes = self.columns["level"]
+        amounts = self._group_sum("level", codes, numerator, groups)
+        seconds = self._group_sum("level", codes, self.columns["duration"], groups)
+        return {level: amounts[i] * per / seconds[i] for i, level in enumerate(self.levels) if seconds[i] > 0}
+
+    def drop_rate_per_node(self, raw_key: Optional[str] = None) -> Dict[str, float]:
+        """各地图每分钟掉落数；raw_key 为空表示全部掉落"""
+        drops = self.counts["drops"]
+        if raw_key is None:
+            columns = list(drops.values())
+        elif raw_key in drops:
+            columns = [drops[raw_key]]
+        else:
+            return {}
+        return self._per_node(columns, 60.0) if columns else {}
+
+    def reward_rate_per_node(self, reward_type: str = "credits") -> Dict[str, float]:
+        """各地图每小时某类奖励（credits / affinity 或奖励计数列中的类型）"""
+        column = self.columns.get(reward_type) if reward_type in ("credits", "affinity") \
+            else self.counts["rewards"].get(reward_type)
+        return self._per_node(column, 3600.0) if column is not None else {}
+
+    def median_cycle_time(self, level: Optional[str] = None) -> Optional[float]:
+        """生存轮次平均间隔的中位数（秒）；level 为空表示全部地图"""
+        code = self._level_codes.get(level) if level is not None else None
+        if level is not None and code is None:
+            return None
+        times, codes = self.columns["cycle_time"], self.columns["level"]
+        if np is not None:
+            values = np.frombuffer(times, dtype=np.float64)
+            if code is not None:
+                values = values[np.frombuffer(codes, dtype=np.int32) == code]
+            values = values[~np.isnan(values)]
+            return float(np.median(values)) if values.size else None
+        if code is not None:
+            times = compress(times, self._masks("level", codes, len(self.levels))[code])
+        values = [t for t in times if not math.isnan(t)]
+        return statistics.median(values) if values else None
+
+    def enemy_composition(self) -> Dict[str, Dict[str, float]]:
+        """各地形集的敌人构成（占比）"""
+        tilesets = sorted({tileset_of(level) for level in self.levels})
+        tileset_index = {name: i for i, name in enumerate(tilesets)}
+        mapping = [tileset_index[tileset_of(level)] for level in self.levels]
+        if np is not None:
+            codes = np.asarray(mapping, dtype=np.int32)[np.frombuffer(self.columns["level"], dtype=np.int32)]
+        else:
+            codes = array("i", (mapping[c] for c in self.columns["level"]))
+        totals: Dict[str, Counter] = {name: Counter() for name in tilesets}
+        for npc, column in self.counts["enemies"].items():
+            for i, amount in enumerate(self._group_sum("tileset", codes, column, len(tilesets))):
+                if amount:
+                    totals[tilesets[i]][npc] += amount
+        result = {}
+        for name, counter in totals.items():
+            total = sum(counter.values())
+            if total:
+                result[name] = {npc: n / total for npc, n in counter.most_common()}
+        return result
+
+    def success_rate_per_node(self) -> Dict[str, float]:
+        """各地图的成功率"""
+        groups = len(self.levels)
+        codes = self.columns["level"]
+        successes = self._group_sum("level", codes, self.columns["success"], groups)
+        runs = Counter(codes)
+        return {level: successes[i] / runs[i] for i, level in enumerate(self.levels) if runs[i]}
+
+    # === 持久化 ===
+    def save(self, path: str = DEFAULT_TABLE_PATH):
+        """写入单个文件：一行 JSON 头（地图字典与列目录）+ 各列原始字节"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        entries = [("column", name, column) for name, column in self.columns.items()]
+        entries += [(group, key, column) for group, columns in self.counts.items() for key, column in columns.items()]
+        header = {
+            "rows": len(self),
+            "levels": self.levels,
+            "columns": [[group, key, column.typecode] for group, key, column in entries],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            for _, _, column in entries:
+                column.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABLE_PATH) -> "MissionTable":
+        table = cls()
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            rows = header["rows"]
+            table.levels = header["levels"]
+            table._level_codes = {level: i for i, level in enumerate(table.levels)}
+            for group, key, typecode in header["columns"]:
+                column = array(typecode)
+                column.fromfile(f, rows)
+                if group == "column":
+                    table.columns[key] = column
+                else:
+                    table.counts[group][key] = column
+        return table
+
+
+class MissionRecorder:
+    """在任务结算时把 LogMonitor 的当前状态写成 MissionTable 的一行"""
+
+    def __init__(self, table: Optional[MissionTable] = None):
+        self.table = table if table is not None else MissionTable()
+        self._rewards = Counter()   # 本次任务各奖励类型的次数
+        self._recorded = True       # 本次任务是否已写入（避免重复结算）
+
+    def attach(self, monitor) -> Subscription:
+        """通过事件总线订阅任务开始、奖励与任务完成（同步分发，与解析状态一致），返回订阅"""
+        def on_event(event):
+            if event.kind == REWARD:
+                self._rewards[event.record.type] += 1
+            elif event.kind == MISSION_START:
+                self._rewards.clear()
+                self._recorded = False
+            elif not self._recorded and monitor.mission_active:
+                self._record(monitor, event.record.success)
+
+        if monitor.mission_active:
+            self._recorded = False
+        return monitor.subscribe(on_event, kinds=(MISSION_START, REWARD, MISSION_COMPLETE), mode=SYNC,
+                                 name="MissionRecorder")
+
+    def _record(self, monitor, success: bool):
+        economy = monitor.economy
+        start = economy.mission_start if economy.mission_start is not None else monitor.last_timestamp
+        self.table.append(
+            level=monitor.current_level,
+            started=monitor._wall_clock(start),
+            duration=monitor.last_timestamp - start,
+            success=success,
+            enemies=monitor.enemies,
+            drops=monitor.items.counts["raw_key"],
+            rewards=self._rewards,
+            credits=economy.mission_credits,
+            affinity=economy.mission_affinity,
+            cycles=economy.mission_cycles,
+            cycle_time=economy.cycle_interval_avg,
+        )
+        self._recorded = True
+
+
+def report(table: MissionTable, top: int = 5) -> str:
+    """各节点报告：任务数、成功率、现金/小时、掉落/分钟、生存轮次中位间隔"""
+    runs = Counter(table.columns["level"])
+    credits = table.reward_rate_per_node("credits")
+    drops = table.drop_rate_per_node()
+    success = table.success_rate_per_node()
+    lines = [f"{len(table)} 次任务，{len(table.levels)} 个地图（{'NumPy' if np is not None else '纯 Python'}）"]
+    for code, count in runs.most_common():
+        level = table.levels[code]
+        cycle = table.median_cycle_time(level)
+        lines.append(
+            f"{level}\n    {count} 次, 成功 {success.get(level, 0):.0%}, "
+            f"现金 {credits.get(level, 0):,.0f}/小时, 掉落 {drops.get(level, 0):.1f}/分钟"
+            + (f", 生存轮次中位 {cycle:.0f}s" if cycle is not None else "")
+        )
+    for tileset, composition in table.enemy_composition().items():
+        head = ", ".join(f"{npc} {share:.0%}" for npc, share in list(composition.items())[:top])
+        lines.append(f"[{tileset}] {head}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="跨任务分析报告")
+    parser.add_argument("path", nargs="?", default=DEFAULT_TABLE_PATH, help="任务表文件")
+    parser.add_argument("--top", type=int, default=5, help="每个地形集显示的敌人类型数")
+    args = parser.parse_args(argv)
+    print(report(MissionTable.load(args.path), args.top))
+
+
+if __name__ == "__main__":
+    main()
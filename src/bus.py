@@ -0,0 +1,252 @@
+# src/bus.py
+"""事件总线：LogMonitor 的回调转为带类型的事件，分发给任意多个订阅者
+
+每个订阅者可按事件类型与谓词过滤，并选择：
+- 同步分发（SYNC）：在解析线程内直接调用，适合只做入队/计数的轻量处理
+- 线程池分发（POOL）：事件进入订阅者自己的有界队列，由共享线程池按顺序处理；
+  慢消费者只会让自己的队列积压（满了丢最旧），不会拖慢解析
+
+每个订阅者记录从发布到开始处理的延迟（lag）、处理耗时、积压与丢弃数。
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .instrumentation import LatencyHistogram
+from .log_parser import TRAILING_DIGITS
+from .records import AgentRecord, MissionRecord
+
+# 事件类型
+AGENT = "agent"
+ITEM = "item"
+REWARD = "reward"
+CONSERVATION = "conservation"
+MISSION_START = "mission_start"
+MISSION_COMPLETE = "mission_complete"
+MISSION_END = "mission_end"
+LEVEL = "level"
+RULE = "rule"  # 规则文件中 event 规则产生的事件，record 为 RuleEvent
+EVENT_KINDS = (AGENT, ITEM, REWARD, CONSERVATION, MISSION_START, MISSION_COMPLETE, MISSION_END, LEVEL, RULE)
+
+# 分发方式
+SYNC = "sync"
+POOL = "pool"
+
+POOL_WORKERS = 2
+SUBSCRIBER_QUEUE_SIZE = 10000
+
+
+class Event:
+    """一条事件：kind 为事件类型，record 为对应的记录对象，count 为被合并的次数，
+    source 为日志源名称（多日志监控时，见 src/multiplex.py；单个日志为 None）"""
+
+    __slots__ = ("kind", "record", "count", "source")
+
+    def __init__(self, kind: str, record, count: int = 1, source: Optional[str] = None):
+        self.kind = kind
+        self.record = record
+        self.count = count
+        self.source = source
+
+    def __repr__(self):
+        source = f", source={self.source!r}" if self.source is not None else ""
+        return f"Event({self.kind!r}, {self.record!r}, count={self.count}{source})"
+
+
+class Subscription:
+    """一个订阅者：过滤条件、分发方式与统计"""
+
+    def __init__(self, bus: "EventBus", kinds: tuple, handler: Callable[[Event], Any],
+                 predicate: Optional[Callable[[Event], bool]], mode: str, maxsize: int, name: str):
+        if mode not in (SYNC, POOL):
+            raise ValueError(f"未知的分发方式: {mode}")
+        self.bus = bus
+        self.kinds = kinds
+        self.handler = handler
+        self.predicate = predicate
+        self.mode = mode
+        self.maxsize = maxsize
+        self.name = name
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.lag = LatencyHistogram()       # 发布 → 开始处理
+        self.handling = LatencyHistogram()  # 处理耗时
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    def deliver(self, event: Event, published: float):
+        if self.predicate is not None and not self.predicate(event):
+            return
+        if self.mode == SYNC:
+            self._handle(event, published)
+            return
+        with self._lock:
+            if len(self._queue) >= self.maxsize:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append((event, published))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.bus._submit(self._drain)
+
+    def _drain(self):
+        """在线程池中按顺序处理积压；同一订阅者同时只占一个工作线程"""
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._scheduled = False
+                    return
+                event, published = self._queue.popleft()
+            self._handle(event, published)
+
+    def _handle(self, event: Event, published: float):
+        start = time.perf_counter()
+        self.lag.observe(start - published)
+        try:
+            self.handler(event)
+        except Exception as e:
+            self.errors += 1
+            print(f"[EventBus] 订阅者 {self.name} 处理 {event.kind} 出错: {e}")
+        self.handling.observe(time.perf_counter() - start)
+        self.delivered += 1
+
+    def unsubscribe(self):
+        self.bus.unsubscribe(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "kinds": list(self.kinds),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "backlog": self.backlog,
+            "lag": self.lag.to_dict(),
+            "handling": self.handling.to_dict(),
+        }
+
+
+class EventBus:
+    """按事件类型路由到订阅者；没有订阅者的事件类型不创建记录对象"""
+
+    def __init__(self, workers: int = POOL_WORKERS):
+        self.workers = workers
+        self.subscriptions = []
+        self.routes: Dict[str, tuple] = {kind: () for kind in EVENT_KINDS}
+        self._pool = None  # 首个线程池订阅者出现时创建
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Callable[[Event], Any], kinds: Optional[Iterable[str]] = None,
+                  predicate: Optional[Callable[[Event], bool]] = None, mode: str = SYNC,
+                  maxsize: int = SUBSCRIBER_QUEUE_SIZE, name: Optional[str] = None) -> Subscription:
+        """订阅事件；kinds 为 None 表示全部类型"""
+        kinds = tuple(kinds) if kinds is not None else EVENT_KINDS
+        unknown = set(kinds) - set(EVENT_KINDS)
+        if unknown:
+            raise ValueError(f"未知的事件类型: {sorted(unknown)}")
+        subscription = Subscription(self, kinds, handler, predicate, mode, maxsize,
+                                    name or getattr(handler, "__qualname__", repr(handler)))
+        with self._lock:
+            self.subscriptions.append(subscription)
+            self._rebuild_routes()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+                self._rebuild_routes()
+
+    def _rebuild_routes(self):
+        # 整体替换为新的元组，发布方无需加锁
+        self.routes = {
+            kind: tuple(s for s in self.subscriptions if kind in s.kinds) for kind in EVENT_KINDS
+        }
+
+    def publish(self, kind: str, record, source: Optional[str] = None):
+        subscribers = self.routes[kind]
+        if not subscribers:
+            return
+        event = Event(kind, record, 1, source)
+        published = time.perf_counter()
+        for subscription in subscribers:
+            subscription.deliver(event, published)
+
+    def _submit(self, task: Callable[[], None]):
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="EventBus")
+        self._pool.submit(task)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各订阅者的投递、丢弃、积压与延迟统计"""
+        return {s.name: s.to_dict() for s in self.subscriptions}
+
+    def close(self, wait: bool = True):
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def attach(self, monitor, source: Optional[str] = None):
+        """包装 monitor 的回调，把事件发布到总线；没有订阅者时只多一次查表
+
+        source 非空时事件带上日志源名称，多个 monitor 可挂到同一条总线上。
+        """
+        if source is None:
+            publish = self.publish
+        else:
+            def publish(kind, record, _publish=self.publish):
+                _publish(kind, record, source)
+
+        def on_new_agent(raw_npc, callback=monitor.on_new_agent):
+            if self.routes[AGENT]:
+                npc_type = TRAILING_DIGITS.sub('', raw_npc)
+                publish(AGENT, AgentRecord(raw_npc, npc_type, monitor.last_timestamp))
+            callback(raw_npc)
+
+        def on_new_item(record, callback=monitor.on_new_item):
+            publish(ITEM, record)
+            callback(record)
+
+        def on_reward_received(record, callback=monitor.on_reward_received):
+            publish(REWARD, record)
+            callback(record)
+
+        def on_conservation_refresh(animal_type, position, callback=monitor.on_conservation_refresh):
+            if self.routes[CONSERVATION]:
+                publish(CONSERVATION, monitor.conservation_animals[-1])  # 回调前记录已追加
+            callback(animal_type, position)
+
+        def on_rule_event(record, callback=monitor.on_rule_event):
+            publish(RULE, record)
+            callback(record)
+
+        def mission_callback(kind, callback):
+            def wrapper(*args):
+                if self.routes[kind]:
+                    success = args[0] if kind == MISSION_COMPLETE else None
+                    level = args[0] if kind == LEVEL else monitor.current_level
+                    publish(kind, MissionRecord(level, success, monitor.last_timestamp))
+                callback(*args)
+            return wrapper
+
+        monitor.on_new_agent = on_new_agent
+        monitor.on_new_item = on_new_item
+        monitor.on_reward_received = on_reward_received
+        monitor.on_conservation_refresh = on_conservation_refresh
+        monitor.on_rule_event = on_rule_event
+        monitor.on_mission_start = mission_callback(MISSION_START, monitor.on_mission_start)
+        monitor.on_mission_complete = mission_callback(MISSION_COMPLETE, monitor.on_mission_complete)
+        monitor.on_mission_end = mission_callback(MISSION_END, monitor.on_mission_end)
+        monitor.on_level_loaded = mission_callback(LEVEL, monitor.on_level_loaded)
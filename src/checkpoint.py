@@ -0,0 +1,78 @@
+# src/checkpoint.py
+"""断点续读：定期保存日志文件身份、已消费的字节偏移与解析状态
+
+重启监控时若仍是同一份日志（inode 相同、大小不小于偏移、开头内容一致），
+就恢复状态并从偏移处继续读，停机期间写入的事件不会丢失，也不必重读整份日志。
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from .config import CONFIG_DIR
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(CONFIG_DIR, "checkpoint.json")
+# 无界面模式单独的断点文件，与界面同时运行时互不覆盖
+HEADLESS_CHECKPOINT_PATH = os.path.join(CONFIG_DIR, "checkpoint-headless.json")
+CHECKPOINT_INTERVAL = 5.0  # 两次保存之间的最短间隔（秒）
+HEAD_BYTES = 4096          # 用日志开头的这些字节区分 inode 被复用的新文件
+VERSION = 1
+
+
+def _head_digest(path: str, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+class Checkpoint:
+    """单个日志文件的断点，保存为 JSON（先写临时文件再替换，避免写到一半）"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(self, monitor, tailer):
+        offset = tailer.offset
+        data = {
+            "version": VERSION,
+            "log_path": os.path.abspath(monitor.log_path),
+            "dev": tailer.identity[0],
+            "inode": tailer.identity[1],
+            "size": tailer.size,
+            "offset": offset,
+            "head": _head_digest(monitor.log_path, min(offset, HEAD_BYTES)),
+            "state": monitor.snapshot_state(),
+        }
+        tmp = self.path + ".tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get("version") == VERSION else None
+
+    def for_log(self, log_path: str) -> Optional[Dict[str, Any]]:
+        """断点仍适用于 log_path 时返回断点数据，否则返回 None"""
+        data = self.load()
+        if not data or data["log_path"] != os.path.abspath(log_path):
+            return None
+        try:
+            st = os.stat(log_path)
+            if (st.st_dev, st.st_ino) != (data["dev"], data["inode"]) or st.st_size < data["offset"]:
+                return None  # 游戏重启后日志被重建或截断
+            if _head_digest(log_path, min(data["offset"], HEAD_BYTES)) != data["head"]:
+                return None
+        except OSError:
+            return None
+        return data
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,42 @@
+# src/config.py
+"""本地配置：~/.warframe-better/config.json
+
+目前支持的键：
+- log_path：EE.log 路径（命令行 --log 与环境变量 WARFRAME_LOG 优先）
+- rules_path：日志规则文件（见 src/rules.py；命令行 --rules 优先，默认 ~/.warframe-better/rules.json）
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".warframe-better")
+CONFIG_PATH = os.path.join(CONFIG_DIR, "config.json")
+RULES_PATH = os.path.join(CONFIG_DIR, "rules.json")
+LOG_PATH_ENV = "WARFRAME_LOG"
+SERVER_PORT = 8765  # 本机事件服务默认端口
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """读取配置文件；文件不存在时返回空配置"""
+    path = path or CONFIG_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"[Config] 配置文件格式错误，已忽略: {path} ({e})")
+        return {}
+
+
+def configured_log_path(cli_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """按 命令行 > 环境变量 > 配置文件 的顺序取日志路径，都没有时返回 None（由 LogMonitor 自动探测）"""
+    return cli_path or os.environ.get(LOG_PATH_ENV) or (config or {}).get("log_path") or None
+
+
+def configured_rules_path(cli_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """按 命令行 > 配置文件 > 默认位置（存在时）的顺序取规则文件路径，都没有时返回 None（只用内置规则）"""
+    path = cli_path or (config or {}).get("rules_path")
+    if path:
+        return path
+    return RULES_PATH if os.path.exists(RULES_PATH) else None
@@ -0,0 +1,61 @@
+# src/conservation.py
+"""保育动物：把 Agent 创建与之前的遭遇（带位置）按时间窗口关联
+
+日志里先出现 ENCMGR 遭遇行（含位置），随后才创建动物 Agent（不含位置）。
+每种动物一个定长 deque，保存窗口内的遭遇；Agent 创建时取同类最近一次遭遇的位置，O(1)。
+过期的遭遇在下一次访问该类型时丢弃，长时间刷平原/奥布山谷内存也不增长。
+"""
+from collections import deque
+from typing import Dict, Optional
+
+CORRELATION_WINDOW = 30.0   # 遭遇到 Agent 创建的最长间隔（日志时间，秒）
+MAX_PENDING_PER_TYPE = 8    # 每种动物最多保留的未过期遭遇数
+
+
+class ConservationCorrelator:
+    """按动物类型的时间窗口关联器"""
+
+    def __init__(self, window: float = CORRELATION_WINDOW, max_pending: int = MAX_PENDING_PER_TYPE):
+        self.window = window
+        self.max_pending = max_pending
+        self._pending: Dict[str, deque] = {}  # 动物类型 → deque([时间, 位置, 是否已关联])
+        self.matched = 0     # 关联到位置的 Agent 数
+        self.unmatched = 0   # 窗口内没有遭遇的 Agent 数
+        self.expired = 0     # 过期时仍未被任何 Agent 关联的遭遇数
+
+    def _expire(self, pending: deque, ts: float):
+        horizon = ts - self.window
+        while pending and pending[0][0] < horizon:
+            if not pending.popleft()[2]:
+                self.expired += 1
+
+    def add_encounter(self, animal_type: str, ts: float, position: tuple):
+        pending = self._pending.get(animal_type)
+        if pending is None:
+            pending = self._pending[animal_type] = deque(maxlen=self.max_pending)
+        self._expire(pending, ts)
+        if len(pending) == self.max_pending and not pending[0][2]:
+            self.expired += 1  # 即将被挤出
+        pending.append([ts, position, False])
+
+    def match_agent(self, animal_type: str, ts: float) -> Optional[tuple]:
+        """Agent 创建：返回同类最近一次未过期遭遇的位置，没有时返回 None"""
+        pending = self._pending.get(animal_type)
+        if pending:
+            self._expire(pending, ts)
+            if pending:
+                entry = pending[-1]
+                entry[2] = True
+                self.matched += 1
+                return entry[1]
+        self.unmatched += 1
+        return None
+
+    @property
+    def pending(self) -> int:
+        """窗口内等待关联的遭遇数"""
+        return sum(len(pending) for pending in self._pending.values())
+
+    def clear(self):
+        """任务切换或日志重建时丢弃全部遭遇（时间戳不再可比）"""
+        self._pending.clear()
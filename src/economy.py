@@ -0,0 +1,172 @@
+# src/economy.py
+"""收益速率：现金/小时、经验/分钟、各类掉落/分钟、生存轮次间隔
+
+每个事件只做 O(1) 的累加，界面按需读取预先算好的数字，不再扫描奖励列表。
+时间一律使用日志时间戳（秒），与解析器的 last_timestamp 一致。
+"""
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from .utils import get_chinese_drop_name
+
+WINDOW_SECONDS = 300   # 滑动窗口长度
+BUCKET_SECONDS = 5     # 窗口分桶粒度，读数在该粒度上滑动
+
+
+class SlidingWindow:
+    """按时间分桶的滑动窗口求和
+
+    写入只改一个桶；读取只遍历固定数量的桶、不修改任何状态，
+    因此解析线程写、界面线程读时无需加锁（读到的最多是上一刻的值）。
+    """
+    __slots__ = ("span", "resolution", "_size", "_ids", "_sums", "first_ts")
+
+    def __init__(self, span: float = WINDOW_SECONDS, resolution: float = BUCKET_SECONDS):
+        self.span = span
+        self.resolution = resolution
+        self._size = max(1, int(span // resolution))
+        self._ids = [-1] * self._size
+        self._sums = [0] * self._size
+        self.first_ts: Optional[float] = None
+
+    def add(self, ts: float, amount: int = 1):
+        bucket = int(ts // self.resolution)
+        index = bucket % self._size
+        if self._ids[index] != bucket:
+            self._ids[index] = bucket
+            self._sums[index] = 0
+        self._sums[index] += amount
+        if self.first_ts is None:
+            self.first_ts = ts
+
+    def total(self, now: float) -> int:
+        """窗口 (now - span, now] 内的累计值（按桶对齐）"""
+        newest = int(now // self.resolution)
+        oldest = newest - self._size
+        return sum(s for bucket, s in zip(self._ids, self._sums) if oldest < bucket <= newest)
+
+    def rate(self, now: float, per: float = 60.0) -> float:
+        """每 per 秒的速率；刚开始记录时按实际经过的时间计算"""
+        if self.first_ts is None:
+            return 0.0
+        elapsed = min(self.span, max(self.resolution, now - self.first_ts))
+        return self.total(now) * per / elapsed
+
+    def reset(self):
+        self._ids = [-1] * self._size
+        self._sums = [0] * self._size
+        self.first_ts = None
+
+
+class EconomyTracker:
+    """滑动窗口速率 + 本次任务累计，由 LogMonitor 的处理器喂入
+
+    写入不加锁，由调用方在持有 lock 时进行（LogMonitor 解析每批行时持有 state_lock）；
+    rates() 在锁内读取，界面等其他线程可直接调用。
+    """
+
+    def __init__(self, span: float = WINDOW_SECONDS, resolution: float = BUCKET_SECONDS,
+                 lock: Optional[threading.RLock] = None):
+        self.span = span
+        self.resolution = resolution
+        self.lock = lock or threading.RLock()
+        self.credits = SlidingWindow(span, resolution)
+        self.affinity = SlidingWindow(span, resolution)
+        self.drops: Dict[str, SlidingWindow] = {}  # 原始物品 key → 窗口
+        self.cycles = SlidingWindow(span, resolution)
+        # 本次任务累计
+        self.mission_start: Optional[float] = None
+        self.mission_credits = 0
+        self.mission_affinity = 0
+        self.mission_drops = Counter()
+        self.mission_cycles = 0
+        self.last_cycle_ts: Optional[float] = None
+        self.last_cycle_interval: Optional[float] = None
+        self._cycle_interval_total = 0.0
+
+    def start_mission(self, ts: float):
+        """任务开始：清零任务累计，滑动窗口跨任务保留"""
+        self.mission_start = ts
+        self.mission_credits = 0
+        self.mission_affinity = 0
+        self.mission_drops.clear()
+        self.mission_cycles = 0
+        self.last_cycle_ts = None
+        self.last_cycle_interval = None
+        self._cycle_interval_total = 0.0
+
+    def add_credits(self, ts: float, amount: int):
+        self.credits.add(ts, amount)
+        self.mission_credits += amount
+
+    def add_affinity(self, ts: float, amount: int):
+        self.affinity.add(ts, amount)
+        self.mission_affinity += amount
+
+    def add_drop(self, ts: float, raw_key: str):
+        window = self.drops.get(raw_key)
+        if window is None:
+            window = self.drops[raw_key] = SlidingWindow(self.span, self.resolution)
+        window.add(ts)
+        self.mission_drops[raw_key] += 1
+
+    def add_survival_cycle(self, ts: float):
+        self.cycles.add(ts)
+        self.mission_cycles += 1
+        if self.last_cycle_ts is not None:
+            self.last_cycle_interval = ts - self.last_cycle_ts
+            self._cycle_interval_total += self.last_cycle_interval
+        self.last_cycle_ts = ts
+
+    @property
+    def cycle_interval_avg(self) -> Optional[float]:
+        """本次任务生存轮次的平均间隔（秒），不足两轮时为 None"""
+        intervals = self.mission_cycles - 1
+        return self._cycle_interval_total / intervals if intervals > 0 else None
+
+    def rates(self, now: float) -> Dict[str, Any]:
+        """当前速率与本次任务累计；持有 lock 读取，写入方正在处理的一批行不会读到一半"""
+        with self.lock:
+            elapsed = now - self.mission_start if self.mission_start is not None else 0.0
+            drops_per_min = Counter()
+            for raw_key, window in self.drops.items():
+                rate = window.rate(now)
+                if rate:
+                    drops_per_min[get_chinese_drop_name(raw_key)] += rate  # 同一中文名的 key 合并
+            return {
+                "credits_per_hour": self.credits.rate(now, 3600),
+                "affinity_per_min": self.affinity.rate(now),
+                "drops_per_min": dict(drops_per_min),
+                "mission_seconds": elapsed,
+                "mission_credits": self.mission_credits,
+                "mission_affinity": self.mission_affinity,
+                "mission_credits_per_hour": self.mission_credits * 3600 / elapsed if elapsed > 0 else 0.0,
+                "mission_drops": sum(self.mission_drops.values()),
+                "survival_cycles": self.mission_cycles,
+                "cycle_interval": self.last_cycle_interval,
+                "cycle_interval_avg": self.cycle_interval_avg,
+            }
+
+    def summary(self) -> Dict[str, Any]:
+        """本次任务累计的快照（断点用）；滑动窗口不保存，重启后重新积累"""
+        return {
+            "mission_start": self.mission_start,
+            "mission_credits": self.mission_credits,
+            "mission_affinity": self.mission_affinity,
+            "mission_drops": dict(self.mission_drops),
+            "mission_cycles": self.mission_cycles,
+            "last_cycle_ts": self.last_cycle_ts,
+            "last_cycle_interval": self.last_cycle_interval,
+            "cycle_interval_total": self._cycle_interval_total,
+        }
+
+    def restore_summary(self, data: Dict[str, Any]):
+        self.start_mission(data["mission_start"])
+        self.mission_credits = data["mission_credits"]
+        self.mission_affinity = data["mission_affinity"]
+        self.mission_drops.update(data["mission_drops"])
+        self.mission_cycles = data["mission_cycles"]
+        self.last_cycle_ts = data["last_cycle_ts"]
+        self.last_cycle_interval = data["last_cycle_interval"]
+        self._cycle_interval_total = data["cycle_interval_total"]
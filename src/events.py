@@ -0,0 +1,173 @@
+# src/events.py
+"""asyncio 事件流：async for event in monitor.events()
+
+尾随器直接在事件循环上运行（inotify 描述符注册到循环，否则异步退避），不需要额外线程。
+同一个 LogMonitor 可以有多个订阅者（悬浮窗、机器人、导出器），共用一次解析；
+每个订阅者有自己的有界队列，消费跟不上时按策略丢弃最旧事件或合并同类事件。
+"""
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Hashable, Optional
+
+from .bus import AGENT, CONSERVATION, ITEM, SYNC, Event
+from .log_parser import RULES_CHECK_INTERVAL
+from .tailer import LogTailer
+
+# 队列满时的策略
+DROP_OLDEST = "drop_oldest"  # 丢掉最旧的事件
+COALESCE = "coalesce"        # 同类事件在队列中只保留最新一条（计数累加），队列满时再丢最旧
+
+EVENT_QUEUE_SIZE = 1000
+YIELD_EVERY = 1000  # 每解析这么多行让出一次事件循环
+
+# 可合并事件的键：同一敌人类型 / 掉落物 / 保育动物
+_COALESCE_KEY = {
+    AGENT: lambda record: record.npc_type,
+    ITEM: lambda record: record.raw_key,
+    CONSERVATION: lambda record: record.type,
+}
+
+
+def coalesce_key(event: Event) -> Optional[Hashable]:
+    key = _COALESCE_KEY.get(event.kind)
+    return (event.kind, key(event.record)) if key else None
+
+
+class _Subscriber:
+    """单个订阅者的有界队列"""
+
+    def __init__(self, maxsize: int, policy: str):
+        if policy not in (DROP_OLDEST, COALESCE):
+            raise ValueError(f"未知的队列策略: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue = deque()
+        self.pending: Dict[Hashable, Event] = {}  # 合并键 → 队列中最新的同类事件
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self.error: Optional[BaseException] = None  # 尾随任务出错时，队列取完后抛给消费者
+        self._waiter: Optional[asyncio.Future] = None
+
+    def put(self, kind: str, record):
+        event = Event(kind, record)
+        key = coalesce_key(event) if self.policy == COALESCE else None
+        if key:
+            queued = self.pending.get(key)
+            if queued is not None:
+                queued.record = record
+                queued.count += 1
+                self.coalesced += 1
+                return
+        if len(self.queue) >= self.maxsize:
+            self._popleft()
+            self.dropped += 1
+        self.queue.append(event)
+        if key:
+            self.pending[key] = event
+        self._wake()
+
+    def _popleft(self) -> Event:
+        event = self.queue.popleft()
+        if self.pending:
+            key = coalesce_key(event)
+            if key and self.pending.get(key) is event:
+                del self.pending[key]
+        return event
+
+    def close(self, error: Optional[BaseException] = None):
+        self.closed = True
+        self.error = error
+        self._wake()
+
+    def _wake(self):
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self) -> Optional[Event]:
+        """取下一条事件；流结束时返回 None，尾随出错时（已入队的事件取完后）抛出该异常"""
+        while not self.queue:
+            if self.closed:
+                if self.error is not None:
+                    raise self.error
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+        return self._popleft()
+
+
+class EventStream:
+    """把事件总线上的事件分发给各 async 订阅者；首个订阅者出现时启动尾随任务"""
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.subscribers = set()
+        self._task: Optional[asyncio.Task] = None
+        # 尾随与分发在同一事件循环线程内，同步订阅即可
+        monitor.event_bus.subscribe(self._publish, mode=SYNC, name="EventStream")
+
+    def _publish(self, event: Event):
+        for subscriber in self.subscribers:
+            subscriber.put(event.kind, event.record)
+
+    async def subscribe(self, maxsize: int = EVENT_QUEUE_SIZE, policy: str = DROP_OLDEST) -> AsyncIterator[Event]:
+        """订阅事件；跳出 async for 即取消订阅，最后一个订阅者离开时尾随任务结束
+
+        日志无法打开或解析出错时，async for 在取完已有事件后抛出该异常（而不是正常结束）。
+        """
+        subscriber = _Subscriber(maxsize, policy)
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._pump())
+        try:
+            while True:
+                event = await subscriber.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            self.subscribers.discard(subscriber)
+
+    async def _pump(self):
+        """尾随任务：出错时把异常交给各订阅者，不留在任务上无人取回"""
+        error = None
+        try:
+            await self._follow()
+        except Exception as e:
+            error = e
+        finally:
+            for subscriber in self.subscribers:
+                subscriber.close(error)
+
+    async def _follow(self):
+        """在事件循环上尾随日志：每批行解析完后让出一次，让订阅者消费"""
+        monitor = self.monitor
+        start_offset = monitor._resume_from_checkpoint()
+        use_bytes = monitor._uses_bytes()
+        tailer = LogTailer(monitor.log_path, on_rotate=monitor._on_log_rotated, start_offset=start_offset,
+                           decode=not use_bytes)
+        instrumentation = monitor.instrumentation
+        next_save = time.monotonic() + monitor.checkpoint_interval
+        next_rules_check = time.monotonic() + RULES_CHECK_INTERVAL
+        try:
+            async for lines in tailer.follow_async(lambda: monitor._running and bool(self.subscribers)):
+                if instrumentation:
+                    instrumentation.mark_read()
+                if monitor.rules_file and time.monotonic() >= next_rules_check:
+                    monitor.reload_rules()
+                    next_rules_check = time.monotonic() + RULES_CHECK_INTERVAL
+                process = monitor.process_bytes if use_bytes else monitor.process_line
+                # 积压较多（如断点续读）时分段让出，订阅者不必等整批解析完
+                for start in range(0, len(lines), YIELD_EVERY):
+                    with monitor.state_lock:
+                        for line in lines[start:start + YIELD_EVERY]:
+                            process(line)
+                    await asyncio.sleep(0)
+                if monitor.checkpoint and time.monotonic() >= next_save:
+                    monitor._save_checkpoint(tailer)
+                    next_save = time.monotonic() + monitor.checkpoint_interval
+        finally:
+            if monitor.checkpoint:
+                monitor._save_checkpoint(tailer)
+            tailer.close()
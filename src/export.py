@@ -0,0 +1,404 @@
+# src/export.py
+"""会话导出：把 LogMonitor 的事件流式追加到 JSONL / CSV（可 gzip）或紧凑的二进制事件文件
+
+事件逐条写入带缓冲的文件，不在内存中积累；同一文件可多次追加（CSV 只在新文件写表头）。
+
+二进制格式（.wfev）：
+- 文件头 b"WFEV" + 版本号（uint16）
+- 之后每条记录为 <uint16 载荷长度><uint8 类型><载荷>，小端序
+- 类型 0 为字符串定义：载荷是 UTF-8 文本，按出现顺序编号；NPC、物品、地图、奖励名等
+  在其他记录中只存 uint32 编号，同一字符串只写一次
+- 类型最高位表示载荷开头带 uint32 日志源编号（多日志监控，见 src/multiplex.py）
+- rule 事件的 fields 以 JSON 存储，vector 字段读回为列表
+读取时 mmap 整个文件顺序解码，不需要索引；写到一半中断的尾部记录在读取与续写时被忽略。
+
+用法：
+    python -m src --export session.wfev            # 监控时导出（也可 .jsonl / .csv / .jsonl.gz / .csv.gz）
+    python -m src.ingest EE.log --export out.csv.gz
+    python -m src.export session.wfev [--jsonl]    # 各类事件数，或转换为 JSON Lines 输出
+"""
+import argparse
+import csv
+import gzip
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .bus import (AGENT, CONSERVATION, EVENT_KINDS, ITEM, LEVEL, MISSION_COMPLETE, MISSION_END,
+                  MISSION_START, REWARD, RULE, SYNC, Event)
+from .records import AgentRecord, ConservationRecord, DropRecord, MissionRecord, RewardRecord, RuleEvent
+from .utils import get_chinese_conservation_name, get_chinese_enemy_name
+
+FLUSH_INTERVAL = 1.0        # 监控时至少每隔这么久把缓冲写到磁盘（秒）
+WRITE_BUFFER = 256 * 1024
+
+MAGIC = b"WFEV"
+VERSION = 1
+_FILE_HEADER = struct.Struct("<4sH")
+_HEADER = struct.Struct("<HB")      # 载荷长度, 类型
+_SOURCE = struct.Struct("<I")
+HAS_SOURCE = 0x80
+NONE = 0xFFFFFFFF                   # 字符串编号为空
+NAN = float("nan")
+STRING = 0
+# 事件类型 → 记录类型码（只能在末尾追加，已写出的文件依赖这些编号）
+KIND_CODES = {AGENT: 1, ITEM: 2, REWARD: 3, CONSERVATION: 4, MISSION_START: 5,
+              MISSION_COMPLETE: 6, MISSION_END: 7, LEVEL: 8, RULE: 9}
+CODE_KINDS = {code: kind for kind, code in KIND_CODES.items()}
+
+# 各类记录的载荷（S 为字符串编号）
+_AGENT = struct.Struct("<dII")             # timestamp, raw_npc(S), npc_type(S)
+_ITEM = struct.Struct("<dIddd")            # timestamp, raw_key(S), x, y, z
+_REWARD = struct.Struct("<dIIqid")         # timestamp, type(S), name(S), amount, cycle(-1 为空), wall
+_CONSERVATION = struct.Struct("<dIIdddd")  # spawn_time, agent(S), type(S), x, y, z（NaN 为无位置）, wall
+_MISSION = struct.Struct("<dIb")           # timestamp, level(S), success（-1 为空）
+_RULE = struct.Struct("<dI")               # timestamp, event(S)，其后是 fields 的 JSON
+
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
+    """kind（多日志时加 source）与记录字段，JSONL 导出与无界面 jsonl 输出共用"""
+    head = {"kind": event.kind} if event.source is None else {"kind": event.kind, "source": event.source}
+    return {**head, **event.record.to_dict()}
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+# === 文本格式 ===
+class JsonlWriter:
+    """每个事件一行 JSON"""
+
+    def __init__(self, path: str, compress: bool = False):
+        self.file = _open_text(path, compress)
+
+    def write(self, event: Event):
+        self.file.write(json.dumps(event_to_dict(event), ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+CSV_COLUMNS = ("kind", "source", "timestamp", "type", "name", "label", "amount", "cycle",
+               "x", "y", "z", "level", "success", "fields")
+
+
+def _position(position: Optional[tuple]) -> dict:
+    return dict(zip("xyz", position)) if position else {}
+
+
+# 各类事件 → 有值的列；label 为中文名，保育动物的 timestamp 为生成时间
+_CSV_FIELDS = {
+    AGENT: lambda r: {"timestamp": r.timestamp, "type": r.npc_type, "name": r.raw_npc,
+                      "label": get_chinese_enemy_name(r.npc_type)},
+    ITEM: lambda r: {"timestamp": r.timestamp, "name": r.raw_key, "label": r.chinese_name, **_position(r.position)},
+    REWARD: lambda r: {"timestamp": r.timestamp, "type": r.type, "name": r.name, "amount": r.amount, "cycle": r.cycle},
+    CONSERVATION: lambda r: {"timestamp": r.spawn_time, "type": r.type, "name": r.agent,
+                             "label": get_chinese_conservation_name(r.type), **_position(r.position)},
+    RULE: lambda r: {"timestamp": r.timestamp, "type": r.event, "fields": json.dumps(r.fields, ensure_ascii=False)},
+}
+
+
+def _csv_mission(r) -> dict:
+    return {"timestamp": r.timestamp, "level": r.level,
+            "success": None if r.success is None else int(r.success)}
+
+
+class CsvWriter:
+    """固定列的 CSV，每类事件只填自己有的列（空值写为空串）"""
+
+    def __init__(self, path: str, compress: bool = False):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = _open_text(path, compress, newline="")
+        self.writer = csv.writer(self.file)
+        if new:
+            self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, event: Event):
+        fields = _CSV_FIELDS.get(event.kind, _csv_mission)(event.record)
+        fields["kind"] = event.kind
+        fields["source"] = event.source
+        self.writer.writerow(["" if (value := fields.get(column)) is None else value for column in CSV_COLUMNS])
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def _open_text(path: str, compress: bool, newline: Optional[str] = None):
+    if compress:
+        # 追加到已有的 .gz 会新增一个 gzip 成员，gzip 工具与 gzip.open 都按一个文件读取
+        return gzip.open(path, "at", encoding="utf-8", newline=newline)
+    return open(path, "a", encoding="utf-8", newline=newline, buffering=WRITE_BUFFER)
+
+
+# === 二进制格式 ===
+class BinaryWriter:
+    """二进制事件文件的写入端；追加到已有文件时先读回字符串表，并截掉中断时写了一半的尾部"""
+
+    def __init__(self, path: str, compress: bool = False):
+        if compress:
+            raise ValueError("二进制事件文件不支持 gzip（读取时需要 mmap）")
+        self.strings: Dict[str, int] = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with EventReader(path) as reader:
+                strings, end = reader.scan()
+            self.strings = {text: n for n, text in enumerate(strings)}
+            self.file = open(path, "r+b", buffering=WRITE_BUFFER)
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.file = open(path, "wb", buffering=WRITE_BUFFER)
+            self.file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+
+    def _id(self, text: Optional[str]) -> int:
+        """字符串编号；首次出现时先写一条字符串定义"""
+        if text is None:
+            return NONE
+        n = self.strings.get(text)
+        if n is None:
+            data = text.encode("utf-8")
+            if len(data) > 0xFFFF:
+                raise ValueError(f"字符串过长，无法写入二进制事件文件: {text[:40]}...")
+            n = self.strings[text] = len(self.strings)
+            self.file.write(_HEADER.pack(len(data), STRING) + data)
+        return n
+
+    def write(self, event: Event):
+        kind, r = event.kind, event.record
+        _id = self._id
+        if kind == AGENT:
+            payload = _AGENT.pack(r.timestamp, _id(r.raw_npc), _id(r.npc_type))
+        elif kind == ITEM:
+            payload = _ITEM.pack(r.timestamp, _id(r.raw_key), *r.position)
+        elif kind == REWARD:
+            payload = _REWARD.pack(r.timestamp, _id(r.type), _id(r.name), r.amount,
+                                   -1 if r.cycle is None else r.cycle, NAN if r.wall is None else r.wall)
+        elif kind == CONSERVATION:
+            payload = _CONSERVATION.pack(NAN if r.spawn_time is None else r.spawn_time, _id(r.agent), _id(r.type),
+                                         *(r.position or (NAN, NAN, NAN)), NAN if r.wall is None else r.wall)
+        elif kind == RULE:
+            payload = _RULE.pack(r.timestamp, _id(r.event)) + json.dumps(r.fields, ensure_ascii=False).encode("utf-8")
+        else:
+            payload = _MISSION.pack(r.timestamp, _id(r.level), -1 if r.success is None else int(r.success))
+        code = KIND_CODES[kind]
+        if event.source is not None:
+            payload = _SOURCE.pack(_id(event.source)) + payload
+            code |= HAS_SOURCE
+        if len(payload) > 0xFFFF:
+            raise ValueError(f"事件过大，无法写入二进制事件文件: {kind}")
+        self.file.write(_HEADER.pack(len(payload), code) + payload)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class EventReader:
+    """mmap 读取二进制事件文件，按写入顺序产出 Event（记录类型与监控时相同）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size < _FILE_HEADER.size or _FILE_HEADER.unpack_from(self._mm)[0] != MAGIC:
+            self.close()
+            raise ValueError(f"不是二进制事件文件: {path}")
+        version = _FILE_HEADER.unpack_from(self._mm)[1]
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"不支持的二进制事件文件版本 {version}: {path}")
+        self.strings: List[str] = []  # 迭代或 scan() 后为完整的字符串表
+
+    def _records(self) -> Iterator[tuple]:
+        """(类型码, 载荷起点, 载荷终点)，跳过并收集字符串定义；尾部不完整的记录忽略"""
+        mm = self._mm
+        size = len(mm)
+        unpack_header = _HEADER.unpack_from
+        header_size = _HEADER.size
+        strings = self.strings
+        strings.clear()
+        append = strings.append
+        pos = _FILE_HEADER.size
+        while pos + header_size <= size:
+            length, code = unpack_header(mm, pos)
+            start = pos + header_size
+            end = start + length
+            if end > size:
+                break
+            if code == STRING:
+                append(sys.intern(str(mm[start:end], "utf-8")))
+            else:
+                yield code, start, end
+            pos = end
+        self._end = pos
+
+    def scan(self) -> tuple:
+        """只读记录头：返回 (字符串表, 最后一条完整记录的结束偏移)"""
+        for _ in self._records():
+            pass
+        return self.strings, self._end
+
+    def counts(self) -> Counter:
+        """各类事件的条数（不解码载荷）"""
+        counts = Counter()
+        for code, _, _ in self._records():
+            counts[CODE_KINDS[code & ~HAS_SOURCE]] += 1
+        return counts
+
+    def __iter__(self) -> Iterator[Event]:
+        return self.events()
+
+    def events(self, kinds: Optional[Iterable[str]] = None) -> Iterator[Event]:
+        """按写入顺序产出事件；kinds 只解码这些类型，其余记录只读记录头就跳过"""
+        wanted = {KIND_CODES[kind] for kind in kinds} if kinds is not None else set(CODE_KINDS)
+        mm = self._mm
+        size = len(mm)
+        unpack_header = _HEADER.unpack_from
+        header_size = _HEADER.size
+        strings = self.strings
+        strings.clear()
+        pos = _FILE_HEADER.size
+        # 与 _records 相同的遍历，内联以省掉每条记录一次生成器切换
+        while pos + header_size <= size:
+            length, code = unpack_header(mm, pos)
+            start = pos + header_size
+            pos = end = start + length
+            if end > size:
+                pos = start - header_size
+                break
+            if code == STRING:
+                strings.append(sys.intern(str(mm[start:end], "utf-8")))
+                continue
+            source = None
+            if code & HAS_SOURCE:
+                code &= ~HAS_SOURCE
+                if code not in wanted:
+                    continue
+                source = strings[_SOURCE.unpack_from(mm, start)[0]]
+                start += _SOURCE.size
+            elif code not in wanted:
+                continue
+            if code == 1:
+                ts, raw_npc, npc_type = _AGENT.unpack_from(mm, start)
+                record = AgentRecord(strings[raw_npc], strings[npc_type], ts)
+            elif code == 2:
+                ts, raw_key, x, y, z = _ITEM.unpack_from(mm, start)
+                record = DropRecord(strings[raw_key], (x, y, z), ts)
+            elif code == 3:
+                ts, type_, name, amount, cycle, wall = _REWARD.unpack_from(mm, start)
+                record = RewardRecord(strings[type_], strings[name], amount, ts,
+                                      None if cycle < 0 else cycle, _none_if_nan(wall))
+            elif code == 4:
+                spawn_time, agent, type_, x, y, z, wall = _CONSERVATION.unpack_from(mm, start)
+                record = ConservationRecord(None if agent == NONE else strings[agent], strings[type_],
+                                            _none_if_nan(spawn_time), None if math.isnan(x) else (x, y, z),
+                                            _none_if_nan(wall))
+            elif code == 9:
+                ts, event = _RULE.unpack_from(mm, start)
+                record = RuleEvent(strings[event], json.loads(str(mm[start + _RULE.size:end], "utf-8")), ts)
+            else:
+                ts, level, success = _MISSION.unpack_from(mm, start)
+                record = MissionRecord(None if level == NONE else strings[level],
+                                       None if success < 0 else bool(success), ts)
+            yield Event(CODE_KINDS[code], record, 1, source)
+        self._end = pos
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# === 导出器 ===
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "wfev": BinaryWriter}
+_EXTENSIONS = {".jsonl": "jsonl", ".json": "jsonl", ".csv": "csv", ".wfev": "wfev", ".bin": "wfev"}
+
+
+def guess_format(path: str) -> tuple:
+    """由扩展名推断 (格式, 是否 gzip)，如 session.csv.gz → ("csv", True)"""
+    root, ext = os.path.splitext(path)
+    compress = ext.lower() == ".gz"
+    if compress:
+        root, ext = os.path.splitext(root)
+    fmt = _EXTENSIONS.get(ext.lower())
+    if fmt is None:
+        raise ValueError(f"无法由扩展名判断导出格式: {path}（可用 {', '.join(sorted(_EXTENSIONS))}，可加 .gz）")
+    return fmt, compress
+
+
+class EventExporter:
+    """事件总线订阅者：逐条写入导出文件，定期刷盘
+
+    exporter = EventExporter("session.wfev")
+    exporter.attach(monitor)   # LogMonitor 或 LogMultiplexer
+    ...
+    exporter.close()
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None, compress: Optional[bool] = None):
+        guessed, gz = guess_format(path) if format is None or compress is None else (format, compress)
+        self.path = path
+        self.format = format or guessed
+        if self.format not in WRITERS:
+            raise ValueError(f"未知的导出格式: {self.format}")
+        self.writer = WRITERS[self.format](path, gz if compress is None else compress)
+        self.written = Counter()
+        self._next_flush = time.monotonic() + FLUSH_INTERVAL
+
+    def attach(self, target, kinds=None):
+        """订阅 target（LogMonitor / LogMultiplexer）的事件，在解析线程内同步写入"""
+        return target.subscribe(self.write, kinds=kinds, mode=SYNC, name=f"export:{self.path}")
+
+    def write(self, event: Event):
+        self.writer.write(event)
+        self.written[event.kind] += 1
+        if time.monotonic() >= self._next_flush:
+            self.writer.flush()
+            self._next_flush = time.monotonic() + FLUSH_INTERVAL
+
+    def close(self):
+        self.writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.export", description="查看或转换二进制事件文件")
+    parser.add_argument("path", help="二进制事件文件（.wfev）")
+    parser.add_argument("--jsonl", action="store_true", help="以 JSON Lines 输出全部事件")
+    args = parser.parse_args(argv)
+
+    with EventReader(args.path) as reader:
+        if args.jsonl:
+            for event in reader:
+                print(json.dumps(event_to_dict(event), ensure_ascii=False))
+            return
+        counts = reader.counts()
+        print(f"{args.path}: {os.path.getsize(args.path):,} 字节, {sum(counts.values()):,} 个事件, "
+              f"{len(reader.strings):,} 个字符串")
+        for kind in EVENT_KINDS:
+            if counts[kind]:
+                print(f"  {kind}: {counts[kind]:,}")
+
+
+if __name__ == "__main__":
+    main()
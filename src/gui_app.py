@@ -2,14 +2,126 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from datetime import datetime
+import bisect
+import queue
 import threading
-from .log_parser import LogMonitor
-from .utils import get_chinese_enemy_name, get_chinese_conservation_name
+import time
+from collections import defaultdict
+from typing import Optional
+from .checkpoint import DEFAULT_CHECKPOINT_PATH
+from .config import configured_rules_path, load_config
+from .instrumentation import Instrumentation, CALLBACK_TO_RENDER
+from .log_parser import LogMonitor, TRAILING_DIGITS, MAX_ITEMS, MAX_REWARDS, MAX_CONSERVATION
+from .records import ConservationRecord
+from .ringbuffer import RingBuffer
+from .spatial import GridIndex
+from .utils import get_chinese_drop_name, get_chinese_enemy_name, get_chinese_conservation_name
+
+FRAME_INTERVAL_MS = 100  # 界面刷新间隔（毫秒）
+RATES_INTERVAL_MS = 1000  # 收益速率刷新间隔（毫秒）
+HOT_SPOTS_INTERVAL_MS = 5000  # 掉落聚集处的最短重算间隔（毫秒）
+STOP_TIMEOUT = 5.0  # 关闭窗口时等待解析线程保存断点的最长时间（秒）
+
+# 奖励类型图标
+REWARD_TYPE_ICONS = {
+    'survival_cycle': '⏱️',
+    'item': '📦',
+    'extra': '⭐',
+    'credits': '💰',
+    'affinity': '⚡',
+    'extract': '🚪'
+}
+
+
+class _LineLogView:
+    """有上限的行日志视图：只插入新行、删除最旧行，不整体重绘
+
+    选中区域和滚动位置由 Tk 随插入/删除自动维护，无需保存后再搜索恢复。
+    """
+
+    def __init__(self, widget, limit: int, placeholder: str, newest_first: bool = False):
+        self.widget = widget
+        self.limit = limit
+        self.placeholder = placeholder
+        self.newest_first = newest_first
+        self.header = 0  # 顶部固定行数
+        self.count = 0   # 当前显示的条目数
+        widget.insert(tk.END, placeholder + "\n")
+
+    def set_header(self, lines):
+        """替换顶部固定行（如任务状态）"""
+        self.widget.delete("1.0", f"{self.header + 1}.0")
+        self.widget.insert("1.0", "".join(lines))
+        self.header = len(lines)
+
+    def add(self, lines):
+        """追加若干条目（按时间先后），超出上限的最旧条目被删除"""
+        lines = lines[-self.limit:]
+        if not lines:
+            return
+        w, h = self.widget, self.header
+        if not self.count:
+            w.delete(f"{h + 1}.0", f"{h + 2}.0")  # 去掉占位提示
+        if self.newest_first:
+            w.insert(f"{h + 1}.0", "".join(reversed(lines)))
+        else:
+            w.insert(tk.END, "".join(lines))
+        self.count += len(lines)
+        overflow = self.count - self.limit
+        if overflow > 0:
+            if self.newest_first:
+                w.delete(f"{h + self.limit + 1}.0", f"{h + self.count + 1}.0")
+            else:
+                w.delete(f"{h + 1}.0", f"{h + overflow + 1}.0")
+            self.count = self.limit
+
+    def reset(self):
+        """清空条目，保留顶部固定行"""
+        h = self.header
+        self.widget.delete(f"{h + 1}.0", tk.END)
+        self.widget.insert(tk.END, self.placeholder + "\n")
+        self.count = 0
+
+
+class _CounterView:
+    """按键排序的计数视图：新键按序插入一行，已有键只原地改写计数"""
+
+    def __init__(self, widget, placeholder: str, label):
+        self.widget = widget
+        self.placeholder = placeholder
+        self.label = label  # 键 → 显示名
+        self.keys = []      # 已显示的键（有序）
+        widget.insert(tk.END, placeholder + "\n")
+
+    def update(self, counts, changed):
+        w = self.widget
+        for key in sorted(changed):
+            tag = f"count:{key}"
+            value = str(counts[key])
+            ranges = w.tag_ranges(tag)
+            if ranges:
+                w.delete(ranges[0], ranges[1])
+                w.insert(ranges[0], value, tag)
+                continue
+            if not self.keys:
+                w.delete("1.0", "2.0")  # 去掉占位提示
+            index = bisect.bisect(self.keys, key)
+            self.keys.insert(index, key)
+            w.insert(f"{index + 1}.0", f"• {self.label(key)}: ", (), value, tag, "\n", ())
+
+    def reset(self):
+        for key in self.keys:
+            self.widget.tag_delete(f"count:{key}")
+        self.widget.delete("1.0", tk.END)
+        self.widget.insert(tk.END, self.placeholder + "\n")
+        self.keys = []
 
 
 class WarframeMonitorGUI:
-    def __init__(self, root, debug=False):
+    def __init__(self, root, debug=False, instrument=False, store=None):
         self.root = root
+        self.instrumentation = Instrumentation() if instrument else None
+        self.store = store  # SessionStore，None 表示不持久化
         self.root.title("Warframe 实时日志监控")
         self.root.geometry("550x450")
         self.root.iconbitmap(self._get_icon_path())  # 可选图标
@@ -21,6 +133,10 @@ class WarframeMonitorGUI:
         self.level_var = tk.StringVar(value="📍 未进入地图")
         tk.Label(root, textvariable=self.level_var, font=("Arial", 10), fg="blue").pack(pady=2)
 
+        # 累计汇总（记录只保留最近若干条，汇总按全部历史计算）
+        self.totals_var = tk.StringVar(value="")
+        tk.Label(root, textvariable=self.totals_var, font=("Arial", 9), fg="gray").pack(pady=1)
+
         notebook = ttk.Notebook(root)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
@@ -44,34 +160,89 @@ class WarframeMonitorGUI:
         self.conservation_text = scrolledtext.ScrolledText(conservation_frame, font=("Consolas", 10))
         self.conservation_text.pack(fill=tk.BOTH, expand=True)
 
-        self.conservation_animals = []  # 存储保育动物记录
+        self.conservation_animals = RingBuffer(MAX_CONSERVATION, group_by=("type",))  # 存储保育动物记录
 
         # === 新增：奖励页 ===
         reward_frame = ttk.Frame(notebook)
         notebook.add(reward_frame, text="🎁 奖励")
+        # 收益速率：直接读取解析器预先算好的数字
+        self.rates_var = tk.StringVar(value="")
+        tk.Label(reward_frame, textvariable=self.rates_var, font=("Consolas", 9), justify=tk.LEFT,
+                 anchor=tk.W).pack(fill=tk.X)
         self.reward_text = scrolledtext.ScrolledText(reward_frame, font=("Consolas", 10))
         self.reward_text.pack(fill=tk.BOTH, expand=True)
         self._setup_context_menu(self.reward_text)
-        self.rewards = []  # 存储奖励记录
+        self.rewards = RingBuffer(MAX_REWARDS, group_by=("type", "name"), amount_field="amount")  # 存储奖励记录
         self.mission_success = None  # 任务成功状态
 
+        # === 统计页（仅启用埋点时显示）===
+        if self.instrumentation:
+            stats_frame = ttk.Frame(notebook)
+            notebook.add(stats_frame, text="📊 统计")
+            tk.Button(stats_frame, text="导出 JSON", command=self._dump_stats).pack(anchor=tk.E)
+            self.stats_text = scrolledtext.ScrolledText(stats_frame, font=("Consolas", 9))
+            self.stats_text.pack(fill=tk.BOTH, expand=True)
+            self._stats_frames = 0
+
+        # 界面状态只在 Tk 线程中读写；解析线程通过事件队列投递变化
+        self.enemies = defaultdict(int)
+        self.items = RingBuffer(MAX_ITEMS)
+        self._drops_seen = 0       # 本次任务的掉落总数
+        self._clustered_drops = 0  # 上次计算聚集处时的掉落总数
+        self._hot_spot_job = None  # 后台聚类线程，同一时间最多一个
+        self._mission_serial = 0   # 任务开始时加一，丢弃上一任务迟到的聚类结果
+        self._events = queue.SimpleQueue()
+        self._dirty = set()
+        # 上一帧以来的增量，渲染时只追加/改写这些内容
+        self._changed_enemies = set()
+        self._new_items = []
+        self._new_conservation = []
+        self._new_rewards = []
+        self._enemy_view = _CounterView(self.enemy_text, "暂无敌人生成", get_chinese_enemy_name)
+        self._item_view = _LineLogView(self.item_text, 15, "暂无掉落物品")  # 最近15个
+        self._conservation_view = _LineLogView(
+            self.conservation_text, 10, "暂无保育动物生成", newest_first=True)  # 最近10条
+        self._reward_view = _LineLogView(self.reward_text, 20, "暂无奖励记录", newest_first=True)  # 最近20个
+        self._event_handlers = {
+            "agent": self._on_new_agent,
+            "item": self._on_new_item,
+            "mission_start": self._on_mission_start,
+            "conservation": self._on_conservation_refresh,
+            "reward": self._on_reward_received,
+            "mission_complete": self._on_mission_complete,
+            "level": self._on_level_loaded,
+            "hot_spots": self._on_hot_spots,
+        }
+
 # 启动监控
         self.monitor = LogMonitor(
-            on_new_agent=self._on_new_agent,
-            on_new_item=self._on_new_item,
-            on_mission_start=self._on_mission_start,
-on_conservation_refresh=self._on_conservation_refresh,  # ← 新增
-            on_reward_received=self._on_reward_received,  # ← 新增
-            on_mission_complete=self._on_mission_complete,  # ← 新增
-            on_level_loaded=self._on_level_loaded,  # ← 新增
-            debug=debug
+            on_new_agent=self._post("agent"),
+            on_new_item=self._post("item"),
+            on_mission_start=self._post("mission_start"),
+            on_conservation_refresh=self._post("conservation"),
+            on_reward_received=self._post("reward"),
+            on_mission_complete=self._post("mission_complete"),
+            on_level_loaded=self._post("level"),
+            debug=debug,
+            instrumentation=self.instrumentation,
+            checkpoint_path=DEFAULT_CHECKPOINT_PATH,  # 重启后从上次读到的位置续读
+            rules_path=configured_rules_path(config=load_config()),  # 自定义日志规则，修改后自动生效
         )
-
-        self.enemies = self.monitor.enemies
-        self.items = self.monitor.items
-
-        threading.Thread(target=self.monitor.start_monitoring, daemon=True).start()
-        self._update_ui()
+        if self.store:
+            self.store.attach(self.monitor)
+
+        self._monitor_thread = threading.Thread(target=self.monitor.start_monitoring, daemon=True)
+        self._monitor_thread.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self._render_tick()
+        self._render_rates()
+        self._update_hot_spots()
+
+    def close(self):
+        """关闭窗口：先停止解析线程并等它保存最后一次断点，再销毁窗口"""
+        self.monitor.stop_monitoring()
+        self._monitor_thread.join(STOP_TIMEOUT)
+        self.root.destroy()
 
     def _setup_context_menu(self, text_widget):
         """为文本组件设置右键菜单，支持复制功能"""
@@ -107,7 +278,10 @@ on_conservation_refresh=self._on_conservation_refresh,  # ← 新增
     
     def _clear_text(self, text_widget):
         """清空文本"""
-        text_widget.delete(1.0, tk.END)
+        if text_widget is self.reward_text:
+            self._reward_view.reset()
+        else:
+            text_widget.delete(1.0, tk.END)
 
     def _get_icon_path(self):
         # 打包后也能找到图标
@@ -118,51 +292,157 @@ on_conservation_refresh=self._on_conservation_refresh,  # ← 新增
         else:
             return os.path.join('assets', 'icon.ico')
 
+    def _post(self, kind: str):
+        """生成投递到事件队列的回调（在解析线程中调用，不触碰任何控件）"""
+        put = self._events.put
+        if self.instrumentation:
+            # 附带投递时间，用于统计回调到渲染的延迟
+            return lambda *args: put((kind, args, time.perf_counter()))
+        return lambda *args: put((kind, args))
+
+    def _render_tick(self):
+        """Tk 线程唯一的刷新循环：按固定帧率取出事件，只重绘有变化的页"""
+        handlers = self._event_handlers
+        posted = [] if self.instrumentation else None
+        try:
+            while True:
+                event = self._events.get_nowait()
+                handlers[event[0]](*event[1])
+                if posted is not None:
+                    posted.append(event[2])
+        except queue.Empty:
+            pass
+        if self._dirty:
+            self._update_ui()
+        if posted is not None:
+            self._record_render_latency(posted)
+        self.root.after(FRAME_INTERVAL_MS, self._render_tick)
+
+    def _render_rates(self):
+        """每秒读取一次收益速率；解析线程正持有状态锁（如断点续读的积压）时不等待，下一帧再试"""
+        lock = self.monitor.state_lock
+        if not lock.acquire(blocking=False):
+            self.root.after(FRAME_INTERVAL_MS, self._render_rates)
+            return
+        try:
+            rates = self.monitor.economy.rates(self.monitor.last_timestamp)
+        finally:
+            lock.release()
+        lines = [
+            f"{REWARD_TYPE_ICONS['credits']} {rates['credits_per_hour']:,.0f}/小时  "
+            f"{REWARD_TYPE_ICONS['affinity']} {rates['affinity_per_min']:,.0f}/分钟  "
+            f"本次任务 {rates['mission_seconds'] / 60:.1f} 分钟 {rates['mission_credits']:,} 现金"
+        ]
+        if rates["survival_cycles"]:
+            interval = rates["cycle_interval_avg"]
+            lines.append(f"{REWARD_TYPE_ICONS['survival_cycle']} {rates['survival_cycles']} 轮"
+                         + (f"，平均间隔 {interval:.0f}s" if interval else ""))
+        top_drops = sorted(rates["drops_per_min"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+        if top_drops:
+            lines.append("📦 " + "  ".join(f"{name} {rate:.1f}/分钟" for name, rate in top_drops))
+        self.rates_var.set("\n".join(lines))
+        self.root.after(RATES_INTERVAL_MS, self._render_rates)
+
+    def _update_hot_spots(self):
+        """掉落有变化且上一次聚类已结束时，由后台线程对本次任务的掉落索引聚类，结果经事件队列送回"""
+        job = self._hot_spot_job
+        if self._drops_seen != self._clustered_drops and not (job and job.is_alive()):
+            self._clustered_drops = self._drops_seen
+            self._hot_spot_job = threading.Thread(
+                target=self._compute_hot_spots, args=(self._mission_serial,), daemon=True)
+            self._hot_spot_job.start()
+        self.root.after(HOT_SPOTS_INTERVAL_MS, self._update_hot_spots)
+
+    def _compute_hot_spots(self, serial: int):
+        """后台线程：在 state_lock 内复制 monitor.drop_index（只是数组复制），在副本上聚类，不触碰界面状态"""
+        with self.monitor.state_lock:
+            snapshot = self.monitor.drop_index.snapshot()
+        self._post("hot_spots")(serial, GridIndex.from_snapshot(snapshot).clusters()[:3])
+
+    def _on_hot_spots(self, serial: int, clusters: list):
+        """物品页顶部显示本次任务掉落最集中的几处"""
+        if serial != self._mission_serial:
+            return  # 任务已重新开始
+        lines = []
+        for cluster in clusters:
+            x, y, z = cluster["center"]
+            names = "、".join(dict.fromkeys(get_chinese_drop_name(key) for key, _ in cluster["keys"]))
+            lines.append(f"🔥 ({x:.0f}, {y:.0f}, {z:.0f}) {cluster['size']} 个: {names}\n")
+        if lines:
+            lines.append("-" * 30 + "\n")
+        self._item_view.set_header(lines)
+
+    def _record_render_latency(self, posted):
+        """记录本帧事件的回调→渲染延迟，并每秒刷新一次统计页"""
+        now = time.perf_counter()
+        for stamp in posted:
+            self.instrumentation.observe(CALLBACK_TO_RENDER, now - stamp)
+        self._stats_frames += 1
+        if self._stats_frames * FRAME_INTERVAL_MS >= 1000:
+            self._stats_frames = 0
+            self.stats_text.delete("1.0", tk.END)
+            self.stats_text.insert(tk.END, self.instrumentation.summary())
+
+    def _dump_stats(self):
+        """导出埋点数据到当前目录"""
+        path = f"instrumentation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        self.instrumentation.dump_json(path)
+        self.status_var.set(f"📊 统计已导出: {path}")
+
     def _on_mission_start(self):
         self.status_var.set(f"🚀 任务中 (开始于 {datetime.now().strftime('%H:%M:%S')})")
+        self.enemies.clear()
+        self.items.reset()
+        self._drops_seen = self._clustered_drops = 0
+        self._mission_serial += 1
+        self._item_view.set_header([])
+        self._changed_enemies.clear()
+        self._new_items.clear()
+        self._enemy_view.reset()
+        self._item_view.reset()
 
     def _on_new_agent(self,  raw_npc: str):
-        chinese_name = get_chinese_enemy_name(raw_npc)
-        # 更新 UI（你可能需要重构 enemy_text 的数据结构）
-        self._update_ui()
-
-
-    def _on_conservation_refresh(self, animal_type: str, position: tuple):
-        """当保育动物刷新时调用"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        record = {
-            "type": animal_type,
-            "position": position,
-            "time": timestamp
-        }
+        npc_type = TRAILING_DIGITS.sub('', raw_npc)
+        self.enemies[npc_type] += 1
+        self._changed_enemies.add(npc_type)
+        self._dirty.add("enemy")
+
+    def _on_conservation_refresh(self, animal_type: str, position: Optional[tuple]):
+        """当保育动物刷新时调用（每只一次，位置取自遭遇，可能为 None）"""
+        record = ConservationRecord(None, animal_type, None, position, time.time())
         self.conservation_animals.append(record)
+        self._new_conservation.append(record)
 
         # 👉 弹出桌面提示（可选）
         # self.root.bell()  # 发出提示音
-        # self.status_var.set(f"🐾 {animal_type} 已刷新！{timestamp}")
+        # self.status_var.set(f"🐾 {animal_type} 已刷新！{record.time}")
 
         # 自动切换到保育页（可选，提升体验）
         # 注意：需通过 notebook widget 切换，但此处暂不持有引用
         # 如果需要自动切换，请保存 notebook 引用（见下方说明）
 
-        # 触发 UI 更新
-        self._update_ui()
+        self._dirty.add("conservation")
 
     def _on_new_item(self, item_data):
-        self._update_ui()
+        self.items.append(item_data)
+        self._drops_seen += 1
+        self._new_items.append(item_data)
+        self._dirty.add("item")
 
     def _on_reward_received(self, reward_data):
         """当收到奖励时调用"""
         self.rewards.append(reward_data)
-        self._update_ui()
+        self._new_rewards.append(reward_data)
+        self._dirty.add("reward")
 
     def _on_mission_complete(self, success):
         """当任务完成时调用"""
         self.mission_success = success
         status = "成功" if success else "失败"
         self.status_var.set(f"任务{status}！")
-        self._update_ui()
+        # 奖励页顶部显示任务状态
+        header = "✅ 任务成功" if success else "❌ 任务失败"
+        self._reward_view.set_header([f"{header}\n", "=" * 30 + "\n"])
 
     def _on_level_loaded(self, level_name):
         """当地图加载时调用"""
@@ -172,123 +452,61 @@ on_conservation_refresh=self._on_conservation_refresh,  # ← 新增
             display_name = level_name[:47] + "..."
         
         self.level_var.set(f"📍 {display_name}")
-        self._update_ui()
 
     def _update_ui(self):
-# 保存当前选中的文本
-        try:
-            enemy_selected = self.enemy_text.get(tk.SEL_FIRST, tk.SEL_LAST)
-            item_selected = self.item_text.get(tk.SEL_FIRST, tk.SEL_LAST)
-            conservation_selected = self.conservation_text.get(tk.SEL_FIRST, tk.SEL_LAST)
-            reward_selected = self.reward_text.get(tk.SEL_FIRST, tk.SEL_LAST)
-        except tk.TclError:
-            enemy_selected = item_selected = conservation_selected = reward_selected = None
-        
-        # 敌人（显示中文）
-        self.enemy_text.delete(1.0, tk.END)
-        if self.enemies:
-            for typ in sorted(self.enemies):
-                chinese_name = get_chinese_enemy_name(typ)
-                self.enemy_text.insert(tk.END, f"• {chinese_name}: {self.enemies[typ]}\n")
-        else:
-            self.enemy_text.insert(tk.END, "暂无敌人生成\n")
+        """重绘被标记为脏的页"""
+        dirty, self._dirty = self._dirty, set()
+        if "reward" in dirty or "conservation" in dirty:
+            self._render_totals()
+        if "enemy" in dirty:
+            self._render_enemies()
+        if "item" in dirty:
+            self._render_items()
+        if "conservation" in dirty:
+            self._render_conservation()
+        if "reward" in dirty:
+            self._render_rewards()
+
+    def _render_totals(self):
+        # 累计奖励与保育数量
+        amounts = self.rewards.amounts["type"]
+        self.totals_var.set(
+            f"累计 {REWARD_TYPE_ICONS['credits']} {amounts['credits']:,}  "
+            f"{REWARD_TYPE_ICONS['affinity']} {amounts['affinity']:,}  "
+            f"🎁 {self.rewards.total} 项奖励  🐾 {self.conservation_animals.total} 只"
+        )
+
+    def _render_enemies(self):
+        # 敌人（显示中文），只改写计数变化的行
+        changed, self._changed_enemies = self._changed_enemies, set()
+        self._enemy_view.update(self.enemies, changed)
 
+    def _render_items(self):
         # 掉落物（显示中文）
-        self.item_text.delete(1.0, tk.END)
-        if self.items:
-            for item in list(self.items)[-15:]:  # 最近15个
-                name = item['chinese_name']
-                pos = item['position']
-                self.item_text.insert(tk.END, f"• {name} @ {pos}\n")
-        else:
-            self.item_text.insert(tk.END, "暂无掉落物品\n")
-        # === 保育动物 ===
-        self.conservation_text.delete(1.0, tk.END)
-        if self.conservation_animals:
-            for rec in reversed(self.conservation_animals[-10:]):  # 显示最近10条
-                chinese_name = get_chinese_conservation_name(rec['type'])
-                self.conservation_text.insert(
-                    tk.END,
-                    f"• {chinese_name}  "
-                    f"[{rec['time']}]\n"
-                )
-        else:
-            self.conservation_text.insert(tk.END, "暂无保育动物生成\n")
+        items, self._new_items = self._new_items, []
+        self._item_view.add([f"• {item.chinese_name} @ {item.position}\n" for item in items])
 
+    def _render_conservation(self):
+        # === 保育动物 ===
+        records, self._new_conservation = self._new_conservation, []
+        self._conservation_view.add([
+            f"• {get_chinese_conservation_name(rec.type)}  [{rec.time}]"
+            + (f" @ ({rec.position[0]:.0f}, {rec.position[1]:.0f}, {rec.position[2]:.0f})" if rec.position else "")
+            + "\n" for rec in records
+        ])
+
+    def _render_rewards(self):
         # === 奖励显示 ===
-        self.reward_text.delete(1.0, tk.END)
-        
-        # 显示任务状态
-        if self.mission_success is not None:
-            status = "✅ 任务成功" if self.mission_success else "❌ 任务失败"
-            self.reward_text.insert(tk.END, f"{status}\n")
-            self.reward_text.insert(tk.END, "=" * 30 + "\n")
-        
-        # 显示奖励列表
-        if self.rewards:
-            for reward in reversed(self.rewards[-20:]):  # 显示最近20个奖励
-                reward_type = reward['type']
-                name = reward['name']
-                amount = reward.get('amount', 1)
-                time = reward['time']
-                
-                # 根据类型显示不同图标
-                type_icons = {
-                    'survival_cycle': '⏱️',
-                    'item': '📦',
-                    'extra': '⭐',
-                    'credits': '💰',
-                    'affinity': '⚡',
-                    'extract': '🚪'
-                }
-                icon = type_icons.get(reward_type, '🎁')
-                
-                if amount > 1:
-                    self.reward_text.insert(tk.END, f"{icon} {name} x{amount} [{time}]\n")
-                else:
-                    self.reward_text.insert(tk.END, f"{icon} {name} [{time}]\n")
-        else:
-            self.reward_text.insert(tk.END, "暂无奖励记录\n")
-
-        # 恢复选中的文本（如果内容匹配）
-        if enemy_selected:
-            try:
-                content = self.enemy_text.get(1.0, tk.END)
-                if enemy_selected in content:
-                    start = content.index(enemy_selected)
-                    end = start + len(enemy_selected)
-                    self.enemy_text.tag_add(tk.SEL, f"1.0 + {start} chars", f"1.0 + {end} chars")
-            except:
-                pass
-        
-        if item_selected:
-            try:
-                content = self.item_text.get(1.0, tk.END)
-                if item_selected in content:
-                    start = content.index(item_selected)
-                    end = start + len(item_selected)
-                    self.item_text.tag_add(tk.SEL, f"1.0 + {start} chars", f"1.0 + {end} chars")
-            except:
-                pass
-        
-        if conservation_selected:
-            try:
-                content = self.conservation_text.get(1.0, tk.END)
-                if conservation_selected in content:
-                    start = content.index(conservation_selected)
-                    end = start + len(conservation_selected)
-                    self.conservation_text.tag_add(tk.SEL, f"1.0 + {start} chars", f"1.0 + {end} chars")
-            except:
-                pass
-        
-        if reward_selected:
-            try:
-                content = self.reward_text.get(1.0, tk.END)
-                if reward_selected in content:
-                    start = content.index(reward_selected)
-                    end = start + len(reward_selected)
-                    self.reward_text.tag_add(tk.SEL, f"1.0 + {start} chars", f"1.0 + {end} chars")
-            except:
-                pass
-
-        self.root.after(200, self._update_ui)
\ No newline at end of file
+        rewards, self._new_rewards = self._new_rewards, []
+        lines = []
+        for reward in rewards:
+            name = reward.name
+            amount = reward.amount
+            reward_time = reward.time
+            # 根据类型显示不同图标
+            icon = REWARD_TYPE_ICONS.get(reward.type, '🎁')
+            if amount > 1:
+                lines.append(f"{icon} {name} x{amount} [{reward_time}]\n")
+            else:
+                lines.append(f"{icon} {name} [{reward_time}]\n")
+        self._reward_view.add(lines)
@@ -0,0 +1,110 @@
+# src/ingest.py
+"""离线导入已写完的 EE.log，重建敌人/掉落/奖励记录
+
+用法：python -m src.ingest <EE.log 路径> [更多路径...] [--workers N] [--rules FILE] [--store DB] [--analytics FILE] [--heatmap FILE] [--export FILE]
+"""
+import argparse
+import os
+from collections import Counter
+
+from .log_parser import LogMonitor
+
+
+def summarize(monitor: LogMonitor) -> str:
+    """生成导入结果摘要"""
+    lines = [
+        f"当前地图: {monitor.current_level or '未知'}",
+        f"敌人（最后一次任务）: {monitor.enemy_total}",
+        f"掉落（最后一次任务）: {monitor.items.total}",
+        f"保育动物: {monitor.conservation_animals.total}",
+        f"奖励记录: {monitor.rewards.total}",
+    ]
+    for reward_type, amount in sorted(monitor.rewards.amounts['type'].items()):
+        lines.append(f"  {reward_type}: {amount}")
+    economy = monitor.economy.rates(monitor.last_timestamp)
+    lines.append(f"最后一次任务: {economy['mission_seconds'] / 60:.1f} 分钟, "
+                 f"现金 {economy['mission_credits_per_hour']:,.0f}/小时, 生存轮次 {economy['survival_cycles']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线解析 Warframe EE.log")
+    parser.add_argument("paths", nargs="+", help="日志文件路径")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="并行解析进程数（0 表示使用全部核心，默认 1 为单线程）")
+    parser.add_argument("--debug", action="store_true", help="打印解析调试信息")
+    parser.add_argument("--rules", metavar="FILE", help="日志规则文件（见 src.rules），event 规则的事件数计入摘要")
+    parser.add_argument("--store", metavar="DB", help="把解析结果写入 SQLite 会话库")
+    parser.add_argument("--analytics", metavar="FILE", help="把结算的任务追加到列式任务表（见 src.analytics）")
+    parser.add_argument("--heatmap", metavar="FILE", help="把掉落位置累计到热力图（见 src.spatial）")
+    parser.add_argument("--export", metavar="FILE",
+                        help="把事件追加导出到文件：.jsonl / .csv（可加 .gz）/ .wfev（二进制，见 src.export）")
+    args = parser.parse_args(argv)
+
+    missions = []
+    rule_events = Counter()
+    monitor = LogMonitor(
+        on_mission_start=lambda: missions.append(1),
+        on_rule_event=lambda record: rule_events.update((record.event,)),
+        debug=args.debug,
+        rules_path=args.rules,
+    )
+    store = None
+    if args.store:
+        from .store import SessionStore
+
+        store = SessionStore(args.store)
+        store.attach(monitor)
+    recorder = None
+    if args.analytics:
+        from .analytics import MissionRecorder, MissionTable
+
+        recorder = MissionRecorder(MissionTable.load(args.analytics) if os.path.exists(args.analytics) else None)
+        recorder.attach(monitor)
+    heatmap = None
+    if args.heatmap:
+        from .spatial import Heatmap
+
+        heatmap = Heatmap.load(args.heatmap) if os.path.exists(args.heatmap) else Heatmap()
+        heatmap.attach(monitor)
+    exporter = None
+    if args.export:
+        from .export import EventExporter
+
+        try:
+            exporter = EventExporter(args.export)
+        except ValueError as e:
+            parser.error(str(e))
+        exporter.attach(monitor)
+    if args.workers != 1:
+        from .parallel import parse_files_parallel
+
+        stats = parse_files_parallel(monitor, args.paths, workers=args.workers or None)
+        print(f"[Ingest] {len(args.paths)} 个文件 / {stats['chunks']} 块 / {stats['workers']} 进程: "
+              f"{stats['lines']:,} 行 / {stats['bytes'] / 1e6:.1f} MB, "
+              f"耗时 {stats['seconds']:.2f}s, {stats['lines_per_sec']:,.0f} 行/秒")
+    else:
+        for path in args.paths:
+            stats = monitor.ingest_file(path)
+            print(f"[Ingest] {path}: {stats['lines']:,} 行 / {stats['bytes'] / 1e6:.1f} MB, "
+                  f"耗时 {stats['seconds']:.2f}s, {stats['lines_per_sec']:,.0f} 行/秒")
+    print(f"任务数: {len(missions)}")
+    print(summarize(monitor))
+    for event, count in rule_events.most_common():
+        print(f"  规则事件 {event}: {count}")
+    if recorder:
+        recorder.table.save(args.analytics)
+        print(f"任务表共 {len(recorder.table):,} 次任务: {args.analytics}")
+    if heatmap:
+        heatmap.save(args.heatmap)
+        print(f"热力图共 {len(heatmap.levels)} 张地图: {args.heatmap}")
+    if exporter:
+        exporter.close()
+        print(f"已导出 {sum(exporter.written.values()):,} 个事件: {args.export}")
+    if store:
+        store.close()
+        print(f"已写入 {store.written:,} 个事件（{store.batches} 个事务）: {args.store}")
+
+
+if __name__ == "__main__":
+    main()
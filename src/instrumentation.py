@@ -0,0 +1,194 @@
+# src/instrumentation.py
+"""可选的性能埋点：延迟直方图、逐正则命中/耗时、回调耗时
+
+未启用时 LogMonitor 与 GUI 使用原始正则和回调，没有任何额外开销；
+启用时通过 attach() 把正则、回调与 process_line 替换为计时包装。
+"""
+import json
+import re
+import time
+from typing import Any, Dict, Optional
+
+# 延迟直方图名称
+READ_TO_PARSE = "read_to_parse"          # 尾随器读到数据 → 开始解析该行
+PARSE_TO_CALLBACK = "parse_to_callback"  # 开始解析 → 回调触发
+CALLBACK_TO_RENDER = "callback_to_render"  # 回调投递事件 → 界面渲染完成
+
+
+class LatencyHistogram:
+    """以 2 的幂（微秒）分桶的直方图，记录次数、总和与最大值"""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * 40
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        micros = int(seconds * 1_000_000)
+        self.buckets[min(micros.bit_length(), 39)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """按桶上界估计分位数（秒）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min((1 << index) / 1_000_000, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class PatternStats:
+    """单个正则的调用次数、命中次数与累计耗时"""
+
+    __slots__ = ("calls", "matches", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.matches = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"calls": self.calls, "matches": self.matches, "total_ms": self.seconds * 1000}
+
+
+class TimedPattern:
+    """包装已编译正则，统计 search/match/findall 的命中与耗时"""
+
+    __slots__ = ("pattern", "stats")
+
+    def __init__(self, pattern: re.Pattern, stats: PatternStats):
+        self.pattern = pattern
+        self.stats = stats
+
+    def _timed(self, method, line):
+        start = time.perf_counter()
+        result = method(line)
+        stats = self.stats
+        stats.seconds += time.perf_counter() - start
+        stats.calls += 1
+        if result:
+            stats.matches += 1
+        return result
+
+    def search(self, line):
+        return self._timed(self.pattern.search, line)
+
+    def match(self, line):
+        return self._timed(self.pattern.match, line)
+
+    def findall(self, line):
+        return self._timed(self.pattern.findall, line)
+
+
+class Instrumentation:
+    """收集 LogMonitor / GUI 的埋点数据，可导出为 JSON"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {
+            name: LatencyHistogram() for name in (READ_TO_PARSE, PARSE_TO_CALLBACK, CALLBACK_TO_RENDER)
+        }
+        self.patterns: Dict[str, PatternStats] = {}
+        self.callbacks: Dict[str, LatencyHistogram] = {}
+        self.started = time.time()
+        self.lines = 0
+        self._read_at: Optional[float] = None
+        self._line_started = 0.0
+
+    def observe(self, name: str, seconds: float):
+        self.histograms[name].observe(seconds)
+
+    def mark_read(self):
+        """尾随器读到一批新数据时调用"""
+        self._read_at = time.perf_counter()
+
+    def attach(self, monitor):
+        """把 monitor 的正则、回调与 process_line 替换为计时包装"""
+        stats = self.patterns.setdefault("TIMESTAMP_PATTERN", PatternStats())
+        monitor._timestamp_pattern = TimedPattern(monitor._timestamp_pattern, stats)
+        self.wrap_patterns(monitor)
+
+        for name in [n for n in vars(monitor) if n.startswith("on_") and callable(getattr(monitor, n))]:
+            setattr(monitor, name, self._wrap_callback(name, getattr(monitor, name)))
+        monitor.process_line = self._wrap_process_line(monitor.process_line)
+
+    def wrap_patterns(self, monitor):
+        """把 monitor 当前规则的预筛与各正则替换为计时包装（规则重新加载后再次调用）"""
+        names = {rule.pattern: rule.name for rule in monitor.scanner.rules}
+
+        def timed(pattern, name):
+            return TimedPattern(pattern, self.patterns.setdefault(name, PatternStats()))
+
+        monitor._prefilter = timed(monitor._prefilter, "_PREFILTER")
+        monitor._patterns = {pattern: timed(pattern, names[pattern]) for pattern in monitor._patterns}
+        monitor._buckets = monitor._build_buckets()
+
+    def _wrap_process_line(self, process_line):
+        def wrapper(line):
+            start = time.perf_counter()
+            if self._read_at is not None:
+                self.histograms[READ_TO_PARSE].observe(start - self._read_at)
+            self._line_started = start
+            self.lines += 1
+            return process_line(line)
+        return wrapper
+
+    def _wrap_callback(self, name: str, callback):
+        hist = self.callbacks.setdefault(name, LatencyHistogram())
+        parse_hist = self.histograms[PARSE_TO_CALLBACK]
+
+        def wrapper(*args):
+            start = time.perf_counter()
+            parse_hist.observe(start - self._line_started)
+            try:
+                return callback(*args)
+            finally:
+                hist.observe(time.perf_counter() - start)
+        return wrapper
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uptime_sec": time.time() - self.started,
+            "lines": self.lines,
+            "latency": {name: h.to_dict() for name, h in self.histograms.items()},
+            "patterns": {name: s.to_dict() for name, s in sorted(self.patterns.items())},
+            "callbacks": {name: h.to_dict() for name, h in sorted(self.callbacks.items()) if h.count},
+        }
+
+    def dump_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self) -> str:
+        """统计页使用的简要文本"""
+        data = self.to_dict()
+        lines = [f"已解析 {data['lines']:,} 行，运行 {data['uptime_sec']:.0f} 秒", "", "【延迟】"]
+        for name, h in data["latency"].items():
+            lines.append(f"  {name:<20} n={h['count']:<8} p50={h['p50_ms']:.3f}ms "
+                         f"p95={h['p95_ms']:.3f}ms max={h['max_ms']:.3f}ms")
+        lines += ["", "【正则】"]
+        for name, s in sorted(data["patterns"].items(), key=lambda kv: -kv[1]["total_ms"]):
+            lines.append(f"  {name:<32} 调用={s['calls']:<9} 命中={s['matches']:<7} 耗时={s['total_ms']:.1f}ms")
+        lines += ["", "【回调】"]
+        for name, h in data["callbacks"].items():
+            lines.append(f"  {name:<26} n={h['count']:<7} 平均={h['mean_ms']:.3f}ms max={h['max_ms']:.3f}ms")
+        return "\n".join(lines) + "\n"
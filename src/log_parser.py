@@ -1,12 +1,26 @@
 # src/log_parser.py
+import mmap
 import os
 import re
+import sys
+import threading
 import time
 from collections import defaultdict
 from datetime import datetime
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, TYPE_CHECKING
 
-from .utils import get_chinese_drop_name
+from .checkpoint import CHECKPOINT_INTERVAL, Checkpoint
+from .conservation import ConservationCorrelator
+from .economy import EconomyTracker
+from .spatial import GridIndex
+from .records import ConservationRecord, DropRecord, RewardRecord, RuleEvent
+from .ringbuffer import RingBuffer
+from .rules import Rule, RuleFile, Scanner, load_rules, normalize_specs
+from .tailer import LogTailer, decode_lines, split_lines
+
+if TYPE_CHECKING:
+    from .bus import EventBus, Subscription
+    from .instrumentation import Instrumentation
 
 # === 日志路径自动探测 ===
 def _detect_log_path() -> str:
@@ -15,7 +29,7 @@ def _detect_log_path() -> str:
         os.path.expandvars(r"%LOCALAPPDATA%\Warframe\EE.log"),
         r"C:\Program Files (x86)\Steam\steamapps\common\Warframe\Warframe.log",
         os.path.expanduser("~/Library/Application Support/Warframe/EE.log"),  # macOS
-        "/home/$USER/.local/share/Warframe/EE.log",  # Linux
+        os.path.expandvars("/home/$USER/.local/share/Warframe/EE.log"),  # Linux
     ]
     for path in candidates:
         if os.path.exists(path):
@@ -23,16 +37,32 @@ def _detect_log_path() -> str:
     # 默认返回平台版路径（即使不存在，后续会报错）
     return os.path.expandvars(r"%LOCALAPPDATA%\Warframe\EE.log")
 
-LOG_PATH = _detect_log_path()
+_log_path: Optional[str] = None
+
+
+def get_log_path() -> str:
+    """自动探测的日志路径，首次调用时才探测文件系统"""
+    global _log_path
+    if _log_path is None:
+        _log_path = _detect_log_path()
+    return _log_path
+
+
+def __getattr__(name: str):
+    # 兼容旧代码读取 log_parser.LOG_PATH，导入模块时不再探测路径
+    if name == "LOG_PATH":
+        return get_log_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # === 正则表达式 ===
 AGENT_PATTERN = re.compile(r'AI \[Info\]: OnAgentCreated /Npc/(\w+)\d+ Live \d+ Spawned \d+ Ticking \d+')
+# 物品名取 lua: 之后第一个词（可带 Teleporting 前缀或 /Lotus/... 路径），位置取 -> 之后的 Vector(...)
 TELEPORT_PATTERN = re.compile(
-    r'Script \[Info\]: TeleportAndFade\.lua:.*? ([\w]+) .*? -> Vector$$(.*?)$$'
+    r'Script \[Info\]: TeleportAndFade\.lua:(?: Teleporting)?.*? (?:\S*/)?(\w+)\b.*?->\s*Vector\(([^)]*)\)'
 )
 # === 新增：保育动物相关正则 ===
 CONSERVATION_ENCOUNTER_PATTERN = re.compile(
-    r'AI \[Info\]: ENCMGR: Encounter /Lotus/Types/Gameplay/Conservation/([^/]+)/[^/]+Encounter started at [^ ]+ at pos $\(([^)]+)\)'
+    r'AI \[Info\]: ENCMGR: Encounter /Lotus/Types/Gameplay/Conservation/([^/]+)/[^/]+Encounter started at [^ ]+ at pos \(([^)]+)\)'
 )
 CONSERVATION_AGENT_PATTERN = re.compile(
     r'AI \[Info\]: OnAgentCreated /(Npc/Common(?:Female|Male)?(\w+)Agent\d+)'
@@ -68,6 +98,57 @@ PLAYER_DEATH = re.compile(r'PlayerScript\.lua: Player died')
 PLAYER_REVIVE = re.compile(r'PlayerScript\.lua: Player revived')
 
 
+TIMESTAMP_PATTERN = re.compile(r'^(\d+\.\d+)')
+TIMESTAMP_BYTES = re.compile(rb'^(\d+\.\d+)')  # float() 可直接解析 bytes
+TRAILING_DIGITS = re.compile(r'\d+$')
+
+# === 分桶分发表 ===
+# 每条规则：(必含字面量, 正则, LogMonitor 处理方法名, 是否在进图判定前执行)
+# 字面量必须是正则匹配时一定出现的子串，这样预筛只会多放行、不会漏掉。
+# 同一行命中多条规则时按表中顺序执行（与旧版逐条 search 的顺序一致）。
+DISPATCH_TABLE = (
+    ('Level loaded: ', LEVEL_LOADED, '_handle_level_loaded', True),
+    ('Mission: ', MISSION_INFO, '_handle_mission_info', True),
+    ('Loading level ', NODE_LOADED, '_handle_node_loaded', True),
+    ('OnLevelLoaded: ', PLANET_INFO, '_handle_planet_info', True),
+    ('OnAgentCreated /', AGENT_PATTERN, '_handle_agent', False),
+    ('TeleportAndFade.lua:', TELEPORT_PATTERN, '_handle_teleport', False),
+    ('ENCMGR: Encounter ', CONSERVATION_ENCOUNTER_PATTERN, '_handle_conservation_encounter', False),
+    ('OnAgentCreated /', CONSERVATION_AGENT_PATTERN, '_handle_conservation_agent', False),
+    ('SurvivalMission.lua: ', SURVIVAL_REWARD_CYCLE, '_handle_survival_cycle', False),
+    ('EndOfMatch.lua: ', MISSION_SUCCESS, '_handle_mission_success', False),
+    ('SyndicateXP ', SYNDICATE_XP_BASE, '_handle_syndicate_xp_base', False),
+    ('SyndicateXP ', SYNDICATE_XP_FINAL, '_handle_syndicate_xp_final', False),
+    ('EndOfMatch.lua: ', MISSION_FAILED, '_handle_mission_failed', False),
+    ('GiveInventoryItem.lua: ', REWARD_ITEM, '_handle_reward_item', False),
+    ('LotusGameRules.lua: ', EXTRA_REWARD, '_handle_extra_reward', False),
+    ('CreditsReward.lua: ', CREDITS_REWARD, '_handle_credits', False),
+    ('Affinity.lua: ', AFFINITY_REWARD, '_handle_affinity', False),
+    ('EndlessMission.lua: ', ENDLESS_EXTRACT_REWARD, '_handle_extract_reward', False),
+)
+
+# 内置规则：规则文件的默认规则集（python -m src.rules --dump 可导出为规则文件）
+_PATTERN_NAMES = {value: name for name, value in list(globals().items()) if isinstance(value, re.Pattern)}
+DEFAULT_RULES = tuple(
+    {"name": _PATTERN_NAMES[pattern], "literal": lit, "pattern": pattern.pattern, "handler": name, "pre_gate": pre}
+    for lit, pattern, name, pre in DISPATCH_TABLE
+)
+# 内置扫描器直接使用上面已编译的正则，不经过规则编译与缓存；字面量与规则文件一样经 normalize_specs 规整
+# 所有字面量合成一个预筛正则：噪声行只需一次 C 层扫描
+_DEFAULT_PATTERNS = {pattern.pattern: pattern for _, pattern, _, _ in DISPATCH_TABLE}
+DEFAULT_SCANNER = Scanner([Rule(spec["name"], spec["literal"], _DEFAULT_PATTERNS[spec["pattern"]], spec["handler"],
+                                pre_gate=spec["pre_gate"])
+                           for spec in normalize_specs(DEFAULT_RULES)])
+RULES_CHECK_INTERVAL = 1.0  # 规则文件修改检测间隔（秒）
+
+
+# 各类记录的默认保留上限（环形缓冲，超出后挤掉最旧的）
+MAX_ITEMS = 1000
+MAX_REWARDS = 2000
+MAX_CONSERVATION = 500
+
+INGEST_WINDOW = 8 * 1024 * 1024  # 离线导入时每次解码的窗口大小
+
 # 进图检测：除了时间戳跳跃，也可通过首次大量 AI 日志判断
 MISSION_START_THRESHOLD = 3  # 5 秒内出现 ≥3 个敌人视为新任务
 
@@ -79,7 +160,7 @@ class LogMonitor:
             on_new_item: Optional[Callable[[Dict[str, Any]], None]] = None,
             on_mission_start: Optional[Callable[[], None]] = None,
             on_mission_end: Optional[Callable[[], None]] = None,
-            on_conservation_refresh: Optional[Callable[[str, tuple], None]] = None,  # ← 新增
+            on_conservation_refresh: Optional[Callable[[str, Optional[tuple]], None]] = None,  # 保育动物生成（类型, 遭遇位置）
             on_reward_cycle: Optional[Callable[[int], None]] = None,          # 生存轮次
             on_mission_success: Optional[Callable[[], None]] = None,          # 任务成功
             on_syndicate_xp: Optional[Callable[[int, int], None]] = None,     # 集团声望 (base, final)
@@ -91,20 +172,40 @@ class LogMonitor:
 on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 新增：奖励接收
             on_mission_complete: Optional[Callable[[bool], None]] = None,  # ← 新增：任务完成 (成功/失败)
             on_level_loaded: Optional[Callable[[str], None]] = None,  # ← 新增：地图加载
+            on_rule_event: Optional[Callable[[RuleEvent], None]] = None,  # 规则文件中 event 规则产生的事件
             debug: bool = False,  # ← 新增：是否打印原始日志
+            log_path: Optional[str] = None,  # 日志路径，默认使用自动探测的路径
+            instrumentation: Optional["Instrumentation"] = None,  # 性能埋点，None 表示关闭
+            max_items: int = MAX_ITEMS,  # 各记录最多保留的条数，累计汇总不受影响
+            max_rewards: int = MAX_REWARDS,
+            max_conservation: int = MAX_CONSERVATION,
+            checkpoint_path: Optional[str] = None,  # 断点文件，None 表示每次从文件末尾开始
+            checkpoint_interval: float = CHECKPOINT_INTERVAL,
+            rules_path: Optional[str] = None,  # 规则文件，None 表示只用内置规则；修改后自动重新加载
+            parse_bytes: bool = True,  # 尾随/导入时在 bytes 上预筛与匹配，只解码命中的分组
     ):
         # ... 其他初始化 ...
         self.debug = debug
+        self.parse_bytes = parse_bytes
+        self.log_path = log_path or get_log_path()
         self.on_new_agent = on_new_agent or (lambda x: None)
         self.on_new_item = on_new_item or (lambda x: None)
         self.on_mission_start = on_mission_start or (lambda: None)
         self.on_mission_end = on_mission_end or (lambda: None)
         self.on_conservation_refresh = on_conservation_refresh or (lambda animal_type, pos: None)
 
+        # 解析线程处理每批行时持有；其他线程一次读取多项状态（快照、速率、汇总）时持有，
+        # 读到的状态恰好反映已发布的事件（回调中可重入）
+        self.state_lock = threading.RLock()
         self.enemies = defaultdict(int)
-        self.items = []
+        self.enemy_total = 0  # 本次任务敌人总数，与 enemies 同步累加
+        self.economy = EconomyTracker(lock=self.state_lock)  # 收益速率，界面直接读取
+        # 本次任务掉落位置的空间索引（半径查询、聚类）；在 state_lock 内读取，断点不保存，续读后从空开始
+        self.drop_index = GridIndex()
+        self.items = RingBuffer(max_items, group_by=('raw_key', 'chinese_name'))  # 本次任务的掉落
         self.mission_active = False
         self.last_timestamp = 0.0
+        self._clock_anchor = None  # 日志时间戳与本机时间的差值，见 _wall_clock
         self._recent_agent_count = 0
         self._recent_agent_time = 0.0
         self._running = True
@@ -120,10 +221,12 @@ on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 
         self.on_reward_received = on_reward_received or (lambda x: None)
         self.on_mission_complete = on_mission_complete or (lambda success: None)
         self.on_level_loaded = on_level_loaded or (lambda level: None)
+        self.on_rule_event = on_rule_event or (lambda record: None)
 
         self.conservation_active = True
-        self.conservation_animals = []  # 存储 {type, agent, pos, time}
-        self.rewards = []  # 存储奖励信息 {type, name, amount, time, cycle}
+        self.conservation_animals = RingBuffer(max_conservation, group_by=('type',))  # 存储 {type, agent, pos, time}
+        self.conservation_correlator = ConservationCorrelator()  # 遭遇位置 → Agent 创建
+        self.rewards = RingBuffer(max_rewards, group_by=('type', 'name'), amount_field='amount')  # 存储奖励信息 {type, name, amount, time, cycle}
         self.current_level = None  # 当前地图信息
 
         # 内部状态
@@ -131,6 +234,24 @@ on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 
         self.syndicate_xp_final = 0
         self.player_state = "unknown"
 
+        # 实例级引用，埋点启用时会被替换为计时包装
+        self._timestamp_pattern = TIMESTAMP_PATTERN
+        self._use_scanner(DEFAULT_SCANNER)
+        self.rules_file = RuleFile(rules_path) if rules_path else None
+        if self.rules_file:
+            self._load_rule_file()
+
+        self._event_bus = None     # 首次访问 event_bus 时创建
+        self._event_stream = None  # 首次调用 events() 时创建
+        self.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_interval = checkpoint_interval
+        # 随断点一起保存的其他组件状态（如 SessionStore 的事件序号）：名称 → 有 snapshot_state/restore_state 的对象
+        self.state_extensions: Dict[str, Any] = {}
+
+        self.instrumentation = instrumentation
+        if instrumentation:
+            instrumentation.attach(self)
+
     def parse_vector(self, s: str) -> Optional[tuple]:
         """解析 Vector(x,y,z) 字符串为浮点元组"""
         try:
@@ -144,7 +265,11 @@ on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 
     def reset_mission(self):
         """重置任务状态，触发开始回调"""
         self.enemies.clear()
-        self.items.clear()
+        self.enemy_total = 0
+        self.items.reset()  # 掉落按任务统计，奖励与保育记录跨任务累计
+        self.conservation_correlator.clear()  # 上一任务的遭遇位置不属于新任务
+        self.drop_index.clear()
+        self.economy.start_mission(self.last_timestamp)
         self.mission_active = True
         self._recent_agent_count = 0
         self.on_mission_start()
@@ -162,54 +287,31 @@ on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 
                 self.reset_mission()
 
     def process_line(self, line: str):
-        """处理单行日志"""
+        """处理单行日志：先用字面量预筛分桶，只对命中的桶执行对应正则"""
         try:
             # 提取时间戳
-            ts_match = re.match(r'^(\d+\.\d+)', line)
+            ts_match = self._timestamp_pattern.match(line)
             if not ts_match:
                 return
             current_ts = float(ts_match.group(1))
 
             # 检测新任务：方式1 - 时间戳大幅跳变（>5000 单位 ≈ 新任务）
-            if self.last_timestamp > 0 and current_ts - self.last_timestamp > 5000:
+            previous_ts = self.last_timestamp
+            self.last_timestamp = current_ts  # 先更新，任务开始回调读到的是新任务的时间
+            if previous_ts > 0 and current_ts - previous_ts > 5000:
                 self.reset_mission()
-            self.last_timestamp = current_ts
 
-# === 地图信息检测 ===
-            level_match = LEVEL_LOADED.search(line)
-            if level_match:
-                level_name = level_match.group(1)
-                self.current_level = level_name
-                self.on_level_loaded(level_name)
-                if self.debug:
-                    print(f"[DEBUG] 地图加载: {level_name}")
-
-            mission_match = MISSION_INFO.search(line)
-            if mission_match:
-                mission_name = mission_match.group(1)
-                if not self.current_level:  # 如果没有地图信息，用任务信息代替
-                    self.current_level = mission_name
-                    self.on_level_loaded(mission_name)
-                if self.debug:
-                    print(f"[DEBUG] 任务信息: {mission_name}")
-
-            node_match = NODE_LOADED.search(line)
-            if node_match:
-                node_name = node_match.group(1)
-                if not self.current_level:
-                    self.current_level = node_name
-                    self.on_level_loaded(node_name)
-                if self.debug:
-                    print(f"[DEBUG] 节点加载: {node_name}")
-
-            planet_match = PLANET_INFO.search(line)
-            if planet_match:
-                planet_name = planet_match.group(1)
-                if not self.current_level:
-                    self.current_level = planet_name
-                    self.on_level_loaded(planet_name)
-                if self.debug:
-                    print(f"[DEBUG] 星球信息: {planet_name}")
+            # 绝大多数日志行是噪声，一次预筛即可排除
+            hits = self._prefilter.findall(line)
+            if hits:
+                pre_gate, post_gate = self._select_handlers(hits)
+                # === 地图信息检测（不受进图判定影响）===
+                for pattern, handler in pre_gate:
+                    match = pattern.search(line)
+                    if match:
+                        handler(match, current_ts)
+            else:
+                post_gate = ()
 
             # 检测新任务：方式2 - 短时间内密集生成敌人（更可靠）
             if not self.mission_active:
@@ -217,213 +319,479 @@ on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 
                 if not self.mission_active:
                     return  # 未进图，不处理后续
 
-            # === 敌人生成 ===
-            agent_match = AGENT_PATTERN.search(line)
-            # 在 log_parser.py 的 process_line 方法中
-            if agent_match:
-                raw_npc = agent_match.group(1)
-                npc_type = re.sub(r'\d+$', '', raw_npc)  # 归一化
-                self.enemies[npc_type] += 1
-
-                # 传递原始 key 给 GUI，由 GUI 决定显示英文还是中文
-                self.on_new_agent(raw_npc)  # 或者传 npc_type
-                # if self.debug:
-                    # print(f"[DEBUG] 敌人: {npc_type} | 原始日志: {line.strip()}")
-
-            # === 掉落物传送 ===
-            tp_match = TELEPORT_PATTERN.search(line)
-            if tp_match:
-                raw_item_key = tp_match.group(1)
-                vec_str = tp_match.group(2)
-                pos = self.parse_vector(vec_str)
-                if pos:
-                    chinese_name = get_chinese_drop_name(raw_item_key)
-                    item_data = {
-                        'raw_key': raw_item_key,
-                        'chinese_name': chinese_name,
-                        'position': pos,
-                        'timestamp': current_ts,
-                    }
-                    self.items.append(item_data)
-                    self.on_new_item(item_data)
-                    # if self.debug:
-                    #     print(f"[DEBUG] 掉落: {chinese_name} ({raw_item_key}) @ {pos} | 原始日志: {line.strip()}")
-            # === 保育动物：遭遇开始（刷新提示）===
-            enc_match = CONSERVATION_ENCOUNTER_PATTERN.search(line)
-            if enc_match:
-                animal_type = enc_match.group(1)  # e.g., "OrokinKubrow"
-                pos_str = enc_match.group(2)
-                try:
-                    pos = tuple(float(x.strip()) for x in pos_str.split(",")[:3])
-                except:
-                    pos = (0.0, 0.0, 0.0)
-
-                # 标记保育任务激活
-                self.conservation_active = True
-
-                # 👉 触发“刷新小动物”回调！
-                self.on_conservation_refresh(animal_type, pos)
-
-                if self.debug:
-                    print(f"[DEBUG] 保育动物刷新: {animal_type} @ {pos}")
-
-            # === 保育动物：Agent 创建（记录个体）===
-            agent_match_cons = CONSERVATION_AGENT_PATTERN.search(line)
-            if agent_match_cons:
-                full_path = agent_match_cons.group(1)  # e.g., "Npc/CommonFemaleOrokinKubrowAgent71"
-                animal_name = agent_match_cons.group(2)  # e.g., "OrokinKubrow"
-
-                self.conservation_animals.append({
-                    "agent": full_path,
-                    "type": animal_name,
-                    "spawn_time": current_ts,
-                    "position": None  # 可从 encounter 获取，此处暂不关联
-                })
-                # 👉 触发“刷新小动物”回调！
-                self.on_conservation_refresh(animal_name, "")
-                if self.debug:
-                    print(f"[DEBUG] 保育动物实体创建: {animal_name} ({full_path})")
-
-            # 生存轮次
-            surv_match = SURVIVAL_REWARD_CYCLE.search(line)
-            if surv_match:
-                cycle = int(surv_match.group(1))
-                self.on_reward_cycle(cycle)
-
-            # 任务成功
-            if MISSION_SUCCESS.search(line):
-                self.on_mission_success()
-
-            # 集团声望
-            if xp_base := SYNDICATE_XP_BASE.search(line):
-                self.syndicate_xp_base = int(xp_base.group(1))
-            if xp_final := SYNDICATE_XP_FINAL.search(line):
-                self.syndicate_xp_final = int(xp_final.group(1))
-                self.on_syndicate_xp(self.syndicate_xp_base, self.syndicate_xp_final)
-
-            # === 任务完成状态 ===
-            if MISSION_SUCCESS.search(line):
-                self.on_mission_complete(True)
-            elif MISSION_FAILED.search(line):
-                self.on_mission_complete(False)
-
-            # === 奖励检测 ===
-            # 生存轮次奖励
-            surv_match = SURVIVAL_REWARD_CYCLE.search(line)
-            if surv_match:
-                cycle = int(surv_match.group(1))
-                reward_data = {
-                    'type': 'survival_cycle',
-                    'name': f'生存轮次 {cycle}',
-                    'amount': 1,
-                    'cycle': cycle,
-                    'timestamp': current_ts,
-                    'time': datetime.now().strftime("%H:%M:%S")
-                }
-                self.rewards.append(reward_data)
-                self.on_reward_received(reward_data)
-
-            # 物品奖励
-            reward_match = REWARD_ITEM.search(line)
-            if reward_match:
-                item_name = reward_match.group(1)
-                reward_data = {
-                    'type': 'item',
-                    'name': item_name,
-                    'amount': 1,
-                    'timestamp': current_ts,
-                    'time': datetime.now().strftime("%H:%M:%S")
-                }
-                self.rewards.append(reward_data)
-                self.on_reward_received(reward_data)
-
-            # 额外奖励
-            extra_match = EXTRA_REWARD.search(line)
-            if extra_match:
-                reward_name = extra_match.group(1)
-                reward_data = {
-                    'type': 'extra',
-                    'name': reward_name,
-                    'amount': 1,
-                    'timestamp': current_ts,
-                    'time': datetime.now().strftime("%H:%M:%S")
-                }
-                self.rewards.append(reward_data)
-                self.on_reward_received(reward_data)
-
-            # 现金奖励
-            credits_match = CREDITS_REWARD.search(line)
-            if credits_match:
-                credits = int(credits_match.group(1))
-                reward_data = {
-                    'type': 'credits',
-                    'name': '现金',
-                    'amount': credits,
-                    'timestamp': current_ts,
-                    'time': datetime.now().strftime("%H:%M:%S")
-                }
-                self.rewards.append(reward_data)
-                self.on_reward_received(reward_data)
-
-            # 经验奖励
-            affinity_match = AFFINITY_REWARD.search(line)
-            if affinity_match:
-                affinity = int(affinity_match.group(1))
-                reward_data = {
-                    'type': 'affinity',
-                    'name': '经验值',
-                    'amount': affinity,
-                    'timestamp': current_ts,
-                    'time': datetime.now().strftime("%H:%M:%S")
-                }
-                self.rewards.append(reward_data)
-                self.on_reward_received(reward_data)
-
-            # 无尽任务撤离奖励
-            extract_match = ENDLESS_EXTRACT_REWARD.search(line)
-            if extract_match:
-                reward_name = extract_match.group(1)
-                reward_data = {
-                    'type': 'extract',
-                    'name': reward_name,
-                    'amount': 1,
-                    'timestamp': current_ts,
-                    'time': datetime.now().strftime("%H:%M:%S")
-                }
-                self.rewards.append(reward_data)
-                self.on_reward_received(reward_data)
-
-
+            for pattern, handler in post_gate:
+                match = pattern.search(line)
+                if match:
+                    handler(match, current_ts)
 
         except Exception as e:
             # 防止单行日志错误导致整个监控崩溃
             print(f"[LogParser] 处理日志行时出错: {e}")
             print(f"  原始行: {line[:100]}...")
 
+    def process_bytes(self, line: bytes):
+        """process_line 的 bytes 版本：时间戳与字面量预筛直接作用于未解码的行，只有命中预筛的行才解码
+
+        纯 ASCII 行上 bytes 与 str 的时间戳、预筛结果相同，命中后解码再走与 process_line 相同的 str 正则；
+        非 ASCII 行（含非法 UTF-8）整行按文本模式解码后交给 process_line，因此结果与文本路径完全一致。
+        """
+        if not line.isascii():
+            self.process_line(line.decode("utf-8", errors="ignore"))
+            return
+        text = None
+        try:
+            ts_match = TIMESTAMP_BYTES.match(line)
+            if not ts_match:
+                return
+            current_ts = float(ts_match.group(1))
+
+            previous_ts = self.last_timestamp
+            self.last_timestamp = current_ts
+            if previous_ts > 0 and current_ts - previous_ts > 5000:
+                self.reset_mission()
+
+            buckets = self._bytes_buckets
+            if buckets is None:
+                buckets = self._bytes_buckets = self._build_bytes_buckets()
+            hits = self._bytes_prefilter.findall(line)
+            if hits:
+                text = line.decode("ascii")
+                if len(hits) == 1:
+                    pre_gate, post_gate = buckets[hits[0]]
+                else:
+                    pre_gate, post_gate = self._select_handlers([hit.decode("ascii") for hit in hits])
+                for pattern, handler in pre_gate:
+                    match = pattern.search(text)
+                    if match:
+                        handler(match, current_ts)
+            else:
+                post_gate = ()
+
+            if not self.mission_active:
+                self.detect_mission_start_by_activity(current_ts)
+                if not self.mission_active:
+                    return
+
+            for pattern, handler in post_gate:
+                match = pattern.search(text)
+                if match:
+                    handler(match, current_ts)
+
+        except Exception as e:
+            print(f"[LogParser] 处理日志行时出错: {e}")
+            print(f"  原始行: {line[:100].decode('ascii')}...")
+
+    def _uses_bytes(self) -> bool:
+        """能否走 bytes 路径：调试模式要打印原始行，process_line 被包装（埋点）或覆盖时也走文本路径"""
+        return (self.parse_bytes and not self.debug and "process_line" not in vars(self)
+                and type(self).process_line is LogMonitor.process_line)
+
+    def apply_matches(self, ts: float, prev_ts: Optional[float], matches: tuple):
+        """回放一行预先匹配好的结果（并行解析用），语义与 process_line 一致
+
+        prev_ts 为该行之前最近一条带时间戳行的时间，None 表示沿用自身记录；
+        matches 为 ((规则下标, 匹配结果), ...)，按规则顺序排列。
+        """
+        try:
+            last = self.last_timestamp if prev_ts is None else prev_ts
+            self.last_timestamp = ts
+            if last > 0 and ts - last > 5000:
+                self.reset_mission()
+
+            handlers = self._handlers
+            for index, match in matches:
+                handler, pre_gate = handlers[index]
+                if pre_gate:
+                    handler(match, ts)
+
+            if not self.mission_active:
+                self.detect_mission_start_by_activity(ts)
+                if not self.mission_active:
+                    return
+
+            for index, match in matches:
+                handler, pre_gate = handlers[index]
+                if not pre_gate:
+                    handler(match, ts)
+
+        except Exception as e:
+            print(f"[LogParser] 回放日志行时出错: {e} (时间戳 {ts})")
+
+    def _use_scanner(self, scanner: Scanner):
+        """切换规则；在解析线程的两行之间调用，之后的行按新规则解析"""
+        # 先绑定处理器：处理方法不存在时抛出 ValueError，现有规则不受影响
+        handlers = tuple(self._rule_handler(rule) for rule in scanner.rules)
+        self.scanner = scanner
+        self._prefilter = scanner.prefilter
+        self._patterns = {rule.pattern: rule.pattern for rule in scanner.rules}
+        # 规则下标 → (处理器, 是否进图前)，供并行解析回放使用
+        self._handlers = tuple(zip(handlers, (rule.pre_gate for rule in scanner.rules)))
+        self._buckets = self._build_buckets()
+        self._bytes_buckets = None  # bytes 路径的分桶，首次使用时构建
+
+    def _rule_handler(self, rule: Rule) -> Callable:
+        if rule.handler:
+            handler = getattr(self, rule.handler, None)
+            if handler is None:
+                raise ValueError(f"规则 {rule.name} 的处理方法不存在: {rule.handler}")
+            return handler
+
+        def handler(match, ts: float):
+            record = RuleEvent(rule.event, rule.extract(match), ts)
+            self.on_rule_event(record)
+            if self.debug:
+                print(f"[DEBUG] 规则事件 {rule.event}: {record.fields}")
+        return handler
+
+    def reload_rules(self) -> bool:
+        """规则文件有修改时重新加载并切换；文件无效时保留现有规则。返回是否切换"""
+        if not self.rules_file or not self.rules_file.changed() or not self._load_rule_file():
+            return False
+        if self.instrumentation:
+            self.instrumentation.wrap_patterns(self)
+        print(f"[LogMonitor] 已重新加载规则: {len(self.scanner)} 条")
+        return True
+
+    def _load_rule_file(self) -> bool:
+        try:
+            self._use_scanner(load_rules(self.rules_file.path, DEFAULT_RULES))
+        except (OSError, ValueError) as e:
+            print(f"[LogMonitor] 规则文件无效，保留现有规则: {e}")
+            return False
+        return True
+
+    def _build_buckets(self) -> Dict[str, tuple]:
+        """按字面量分桶，绑定处理方法：{字面量: (进图前处理器, 进图后处理器)}"""
+        rules = tuple(zip(self.scanner.rules, self._handlers))
+        buckets = {}
+        for literal in self.scanner.literals:
+            entries = [
+                (self._patterns[rule.pattern], handler, pre_gate)
+                for rule, (handler, pre_gate) in rules
+                if rule.literal == literal
+            ]
+            buckets[literal] = (
+                tuple((p, h) for p, h, pre in entries if pre),
+                tuple((p, h) for p, h, pre in entries if not pre),
+            )
+        return buckets
+
+    def _build_bytes_buckets(self) -> Dict[bytes, tuple]:
+        """bytes 字面量 → 与 _buckets 相同的 (进图前处理器, 进图后处理器)"""
+        self._bytes_prefilter = self.scanner.bytes_prefilter
+        return {literal.encode("ascii"): handlers for literal, handlers in self._buckets.items() if literal.isascii()}
+
+    def _select_handlers(self, hits: list) -> tuple:
+        """根据预筛命中的字面量取出处理器；同一行命中多个桶时按注册顺序合并"""
+        if len(hits) == 1:
+            return self._buckets[hits[0]]
+        wanted = set(hits)
+        pre_gate, post_gate = [], []
+        for rule, (handler, pre) in zip(self.scanner.rules, self._handlers):
+            if rule.literal in wanted:
+                (pre_gate if pre else post_gate).append((self._patterns[rule.pattern], handler))
+        return pre_gate, post_gate
+
+    # === 各桶处理器：match 为对应正则的匹配结果，ts 为该行时间戳 ===
+    def _handle_level_loaded(self, match, ts: float):
+        level_name = match.group(1)
+        self.current_level = level_name
+        self.on_level_loaded(level_name)
+        if self.debug:
+            print(f"[DEBUG] 地图加载: {level_name}")
+
+    def _handle_mission_info(self, match, ts: float):
+        mission_name = match.group(1)
+        if not self.current_level:  # 如果没有地图信息，用任务信息代替
+            self.current_level = mission_name
+            self.on_level_loaded(mission_name)
+        if self.debug:
+            print(f"[DEBUG] 任务信息: {mission_name}")
+
+    def _handle_node_loaded(self, match, ts: float):
+        node_name = match.group(1)
+        if not self.current_level:
+            self.current_level = node_name
+            self.on_level_loaded(node_name)
+        if self.debug:
+            print(f"[DEBUG] 节点加载: {node_name}")
+
+    def _handle_planet_info(self, match, ts: float):
+        planet_name = match.group(1)
+        if not self.current_level:
+            self.current_level = planet_name
+            self.on_level_loaded(planet_name)
+        if self.debug:
+            print(f"[DEBUG] 星球信息: {planet_name}")
+
+    def _handle_agent(self, match, ts: float):
+        """敌人生成"""
+        raw_npc = match.group(1)
+        npc_type = TRAILING_DIGITS.sub('', raw_npc)  # 归一化
+        self.enemies[npc_type] += 1
+        self.enemy_total += 1
+        # 传递原始 key 给 GUI，由 GUI 决定显示英文还是中文
+        self.on_new_agent(raw_npc)
+
+    def _handle_teleport(self, match, ts: float):
+        """掉落物传送"""
+        pos = self.parse_vector(match.group(2))
+        if pos:
+            # 中文名在显示时才解析
+            item_data = DropRecord(sys.intern(match.group(1)), pos, ts)
+            self.items.append(item_data)
+            self.economy.add_drop(ts, item_data.raw_key)
+            self.drop_index.add(pos, item_data.raw_key)
+            self.on_new_item(item_data)
+
+    def _handle_conservation_encounter(self, match, ts: float):
+        """保育动物：遭遇开始，只记下位置，等 Agent 创建时合并为一个事件"""
+        animal_type = match.group(1)  # e.g., "OrokinKubrow"
+        pos = self.parse_vector(match.group(2)) or (0.0, 0.0, 0.0)
+
+        # 标记保育任务激活
+        self.conservation_active = True
+        self.conservation_correlator.add_encounter(animal_type, ts, pos)
+
+        if self.debug:
+            print(f"[DEBUG] 保育动物刷新: {animal_type} @ {pos}")
+
+    def _handle_conservation_agent(self, match, ts: float):
+        """保育动物：Agent 创建（记录个体，位置取自同类最近一次遭遇）"""
+        full_path = match.group(1)  # e.g., "Npc/CommonFemaleOrokinKubrowAgent71"
+        animal_name = sys.intern(match.group(2))  # e.g., "OrokinKubrow"
+        pos = self.conservation_correlator.match_agent(animal_name, ts)
+
+        self.conservation_animals.append(ConservationRecord(
+            full_path,
+            animal_name,
+            ts,
+            pos,  # 窗口内没有同类遭遇时为 None
+            self._wall_clock(ts),
+        ))
+        # 👉 触发“刷新小动物”回调！每只动物只触发一次
+        self.on_conservation_refresh(animal_name, pos)
+        if self.debug:
+            print(f"[DEBUG] 保育动物实体创建: {animal_name} ({full_path}) @ {pos}")
+
+    def _handle_survival_cycle(self, match, ts: float):
+        """生存轮次：先通知轮次，再记为奖励（原先同一正则要匹配两次）"""
+        cycle = int(match.group(1))
+        self.on_reward_cycle(cycle)
+        self.economy.add_survival_cycle(ts)
+        self._add_reward('survival_cycle', f'生存轮次 {cycle}', 1, ts, cycle=cycle)
+
+    def _handle_mission_success(self, match, ts: float):
+        self.on_mission_success()
+        self.on_mission_complete(True)
+
+    def _handle_mission_failed(self, match, ts: float):
+        self.on_mission_complete(False)
+
+    def _handle_syndicate_xp_base(self, match, ts: float):
+        self.syndicate_xp_base = int(match.group(1))
+
+    def _handle_syndicate_xp_final(self, match, ts: float):
+        self.syndicate_xp_final = int(match.group(1))
+        self.on_syndicate_xp(self.syndicate_xp_base, self.syndicate_xp_final)
+
+    def _handle_reward_item(self, match, ts: float):
+        self._add_reward('item', match.group(1), 1, ts)
+
+    def _handle_extra_reward(self, match, ts: float):
+        self._add_reward('extra', match.group(1), 1, ts)
+
+    def _handle_credits(self, match, ts: float):
+        amount = int(match.group(1))
+        self.economy.add_credits(ts, amount)
+        self._add_reward('credits', '现金', amount, ts)
+
+    def _handle_affinity(self, match, ts: float):
+        amount = int(match.group(1))
+        self.economy.add_affinity(ts, amount)
+        self._add_reward('affinity', '经验值', amount, ts)
+
+    def _handle_extract_reward(self, match, ts: float):
+        self._add_reward('extract', match.group(1), 1, ts)
+
+    def _add_reward(self, reward_type: str, name: str, amount: int, ts: float, cycle: Optional[int] = None):
+        """记录奖励并触发回调"""
+        reward_data = RewardRecord(reward_type, sys.intern(name), amount, ts, cycle, self._wall_clock(ts))
+        self.rewards.append(reward_data)
+        self.on_reward_received(reward_data)
+
+    def _wall_clock(self, ts: float) -> float:
+        """日志时间戳 → 本机时间（秒）；首次调用时锚定，避免每个事件都取系统时间"""
+        if self._clock_anchor is None:
+            self._clock_anchor = time.time() - ts
+        return self._clock_anchor + ts
+
     def start_monitoring(self):
         """启动日志监控（阻塞式）"""
-        if not os.path.exists(LOG_PATH):
-            raise FileNotFoundError(f"Warframe 日志文件未找到，请确认游戏正在运行。\n路径: {LOG_PATH}")
+        if not os.path.exists(self.log_path):
+            raise FileNotFoundError(f"Warframe 日志文件未找到，请确认游戏正在运行。\n路径: {self.log_path}")
 
-        print(f"[LogMonitor] 开始监控日志: {LOG_PATH}")
+        print(f"[LogMonitor] 开始监控日志: {self.log_path}")
         if self.debug:
             print("[DEBUG] 调试模式已启用：将打印所有日志行")
-        with open(LOG_PATH, "r", encoding="utf-8", errors="ignore") as f:
-            f.seek(0, os.SEEK_END)
-            while self._running:
-                line = f.readline()
-                if line:
-                    # 👇 新增：debug 时打印原始日志 👇
-                    if self.debug:
-                        # 去掉末尾换行，避免 double \n
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] {line.rstrip()}")
-                        stripped_line = line.rstrip()
-                        # if 'Script [Info]' in stripped_line:
-                        #     print(f"[{datetime.now().strftime('%H:%M:%S')}] {stripped_line}")
-                    # 👆 新增结束 👆
-                    self.process_line(line)
-                else:
-                    time.sleep(0.09)
+        start_offset = self._resume_from_checkpoint()
+        use_bytes = self._uses_bytes()
+        process = self.process_bytes if use_bytes else self.process_line
+        tailer = LogTailer(self.log_path, on_rotate=self._on_log_rotated, start_offset=start_offset,
+                           decode=not use_bytes)
+        instrumentation = self.instrumentation
+        checkpoint = self.checkpoint
+        next_save = time.monotonic() + self.checkpoint_interval
+        next_rules_check = time.monotonic() + RULES_CHECK_INTERVAL
+        try:
+            for lines in tailer.follow(lambda: self._running):
+                if instrumentation:
+                    instrumentation.mark_read()
+                # 在批次之间切换规则，不会漏掉或重复解析任何一行
+                if self.rules_file and time.monotonic() >= next_rules_check:
+                    self.reload_rules()
+                    next_rules_check = time.monotonic() + RULES_CHECK_INTERVAL
+                with self.state_lock:
+                    for line in lines:
+                        if self.debug:
+                            print(f"[{datetime.now().strftime('%H:%M:%S')}] {line.rstrip()}")
+                        process(line)
+                # 批次边界上保存，偏移与状态一致
+                if checkpoint and time.monotonic() >= next_save:
+                    self._save_checkpoint(tailer)
+                    next_save = time.monotonic() + self.checkpoint_interval
+        finally:
+            if checkpoint:
+                self._save_checkpoint(tailer)
+            tailer.close()
+
+    @property
+    def event_bus(self) -> "EventBus":
+        """事件总线：首次访问时创建并接管回调，之后可挂任意多个订阅者"""
+        if self._event_bus is None:
+            from .bus import EventBus
+
+            self._event_bus = EventBus()
+            self._event_bus.attach(self)
+        return self._event_bus
+
+    def subscribe(self, handler, **options) -> "Subscription":
+        """订阅事件总线，options 见 EventBus.subscribe（kinds、predicate、mode、maxsize、name）"""
+        return self.event_bus.subscribe(handler, **options)
+
+    def events(self, **options):
+        """异步事件流：async for event in monitor.events()
+
+        尾随与解析在当前事件循环上进行，与 start_monitoring 二选一使用。
+        options 传给 EventStream.subscribe（maxsize、policy）。
+        """
+        if self._event_stream is None:
+            from .events import EventStream
+
+            self._event_stream = EventStream(self)
+        return self._event_stream.subscribe(**options)
+
+    def _resume_from_checkpoint(self) -> Optional[int]:
+        """断点适用于当前日志时恢复状态并返回续读偏移"""
+        if not self.checkpoint:
+            return None
+        data = self.checkpoint.for_log(self.log_path)
+        if not data:
+            return None
+        with self.state_lock:
+            self.restore_state(data["state"])
+            if self.mission_active:
+                self.on_mission_start()  # 让界面/存储知道任务仍在进行
+        print(f"[LogMonitor] 从断点续读: 偏移 {data['offset']:,} / 当前大小 {os.path.getsize(self.log_path):,}")
+        return data["offset"]
+
+    def _save_checkpoint(self, tailer: LogTailer):
+        try:
+            self.checkpoint.save(self, tailer)
+        except OSError as e:
+            print(f"[LogMonitor] 保存断点失败: {e}")
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """可 JSON 序列化的解析状态快照（断点用）"""
+        return {
+            "enemies": dict(self.enemies),
+            "mission_active": self.mission_active,
+            "last_timestamp": self.last_timestamp,
+            "current_level": self.current_level,
+            "clock_anchor": self._clock_anchor,
+            "items": self.items.summary(),
+            "rewards": self.rewards.summary(),
+            "conservation": self.conservation_animals.summary(),
+            "economy": self.economy.summary(),
+            "extensions": {name: ext.snapshot_state() for name, ext in self.state_extensions.items()},
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """从 snapshot_state() 的快照恢复，不触发回调"""
+        self.enemies.clear()
+        self.enemies.update(state["enemies"])
+        self.enemy_total = sum(self.enemies.values())
+        self.mission_active = state["mission_active"]
+        self.last_timestamp = state["last_timestamp"]
+        self.current_level = state["current_level"]
+        self._clock_anchor = state["clock_anchor"]
+        self._recent_agent_count = 0
+        self.items.restore_summary(state["items"])
+        self.rewards.restore_summary(state["rewards"])
+        self.conservation_animals.restore_summary(state["conservation"])
+        if "economy" in state:  # 旧版断点没有收益数据
+            self.economy.restore_summary(state["economy"])
+        for name, ext_state in state.get("extensions", {}).items():
+            if name in self.state_extensions:
+                self.state_extensions[name].restore_state(ext_state)
+
+    def ingest_file(self, path: str) -> Dict[str, Any]:
+        """离线导入整份日志：内存映射后按窗口切行，逐行走 process_bytes（或解码后走 process_line），返回吞吐统计"""
+        start = time.perf_counter()
+        use_bytes = self._uses_bytes()
+        split, process = (split_lines, self.process_bytes) if use_bytes else (decode_lines, self.process_line)
+        line_count = 0
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pos = 0
+                    while pos < size:
+                        # 窗口切在换行处，保证每次解码的都是完整行
+                        end = size if pos + INGEST_WINDOW >= size else mm.rfind(b"\n", pos, pos + INGEST_WINDOW) + 1
+                        if end <= pos:
+                            end = mm.find(b"\n", pos + INGEST_WINDOW)
+                            end = size if end < 0 else end + 1
+                        lines = split(mm[pos:end])
+                        if self.instrumentation:
+                            self.instrumentation.mark_read()
+                        with self.state_lock:
+                            for line in lines:
+                                process(line)
+                        line_count += len(lines)
+                        pos = end
+        elapsed = time.perf_counter() - start
+        return {
+            "path": path,
+            "bytes": size,
+            "lines": line_count,
+            "seconds": elapsed,
+            "lines_per_sec": line_count / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _on_log_rotated(self):
+        """日志被截断或重建（游戏重启），丢弃旧会话的时间基准"""
+        print(f"[LogMonitor] 检测到日志文件被重建，从头读取: {self.log_path}")
+        with self.state_lock:
+            was_active = self.mission_active
+            self.last_timestamp = 0.0
+            self.mission_active = False
+            self.current_level = None
+            self._recent_agent_count = 0
+            self._clock_anchor = None
+            self.conservation_correlator.clear()
+            if was_active:
+                self.on_mission_end()
 
     def stop_monitoring(self):
         """停止监控（线程安全）"""
@@ -431,11 +799,13 @@ on_reward_received: Optional[Callable[[Dict[str, Any]], None]] = None,  # ← 
 
     @property
     def mission_info(self) -> dict:
-        """获取当前任务摘要信息（用于 GUI 显示）"""
-        return {
-            "active": self.mission_active,
-            "enemy_count": sum(self.enemies.values()),
-            "item_count": len(self.items),
-            "enemies": dict(self.enemies),
-            "latest_items": self.items[-10:] if self.items else [],
-        }
\ No newline at end of file
+        """获取当前任务摘要信息（用于 GUI 显示）；持有 state_lock 读取，可在其他线程调用"""
+        with self.state_lock:
+            return {
+                "active": self.mission_active,
+                "enemy_count": self.enemy_total,
+                "item_count": self.items.total,
+                "enemies": dict(self.enemies),
+                "latest_items": self.items[-10:] if self.items else [],
+                "economy": self.economy.rates(self.last_timestamp),
+            }
\ No newline at end of file
@@ -0,0 +1,282 @@
+# src/multiplex.py
+"""多日志监控：一个线程同时尾随 N 份日志（多个账号、归档日志），每份日志有独立的解析状态
+
+所有日志共用一个 inotify 描述符（按目录监听，事件按文件名分派给对应的日志源），由 selectors
+在同一个线程里等待；只读取被写入的日志，空闲时无论多少份日志都只有一个定时唤醒，
+每份日志的 CPU 开销不随数量增长。没有 inotify（Windows/macOS）时退回轮询全部日志 + 指数退避。
+
+事件总线上的事件带 source（日志源名称）；aggregate() 汇总各账号当前的任务与收益速率。
+
+用法：
+    mux = LogMultiplexer()
+    mux.add("/path/a/EE.log", name="main")
+    mux.add("/path/b/EE.log", name="alt")
+    mux.subscribe(lambda event: print(event.source, event.kind))
+    mux.run()   # 阻塞，另一线程调用 stop() 结束
+"""
+import os
+import selectors
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from .log_parser import RULES_CHECK_INTERVAL, LogMonitor
+from .tailer import MAX_INTERVAL, MIN_INTERVAL, LogTailer, _Inotify
+
+if TYPE_CHECKING:
+    from .bus import EventBus, Subscription
+
+
+class LogSource:
+    """一个日志源：名称、独立的 LogMonitor 与尾随器（尾随器不自带 inotify）"""
+
+    def __init__(self, name: str, monitor: LogMonitor, from_end: bool = True):
+        self.name = name
+        self.monitor = monitor
+        start_offset = monitor._resume_from_checkpoint()
+        use_bytes = monitor._uses_bytes()
+        self.process = monitor.process_bytes if use_bytes else monitor.process_line
+        self.tailer = LogTailer(monitor.log_path, from_end=from_end, on_rotate=monitor._on_log_rotated,
+                                use_inotify=False, start_offset=start_offset, decode=not use_bytes)
+        self.watch = None  # (wd, 文件名)
+        self.lines = 0
+        self.next_save = time.monotonic() + monitor.checkpoint_interval
+
+    def read(self) -> int:
+        """读取并解析新增的完整行，返回行数；整批在 state_lock 内解析（与 start_monitoring 相同）"""
+        lines = self.tailer.read_lines()
+        if not lines:
+            return 0
+        monitor = self.monitor
+        if monitor.instrumentation:
+            monitor.instrumentation.mark_read()
+        process = self.process
+        with monitor.state_lock:
+            if monitor.debug:
+                for line in lines:
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] {self.name}: {line.rstrip()}")
+                    process(line)
+            else:
+                for line in lines:
+                    process(line)
+        self.lines += len(lines)
+        return len(lines)
+
+    def save_checkpoint(self):
+        if self.monitor.checkpoint:
+            self.monitor._save_checkpoint(self.tailer)
+        self.next_save = time.monotonic() + self.monitor.checkpoint_interval
+
+    def close(self):
+        self.save_checkpoint()
+        self.tailer.close()
+
+
+class LogMultiplexer:
+    """单线程多日志尾随器
+
+    add()/remove() 在 run() 之前调用，或在事件回调中（与 run() 同一线程）调用。
+    """
+
+    def __init__(self, use_inotify: bool = True, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.sources: Dict[str, LogSource] = {}
+        self._running = False
+        self._event_bus = None
+        self._watched: Dict[tuple, List[LogSource]] = {}  # (wd, 文件名) → 日志源
+        self._dirty = set()    # 待读取的日志源（有 inotify 时）
+        self._touched = set()  # 上次维护后解析过新行的日志源
+        self._unsaved = set()  # 有未保存断点的日志源
+
+        self._inotify = None
+        self._selector = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None  # 不支持时退回轮询
+            else:
+                self._selector = selectors.DefaultSelector()
+                self._selector.register(self._inotify.fd, selectors.EVENT_READ)
+
+    def add(self, log_path: str, name: Optional[str] = None, from_end: bool = True, **options) -> LogMonitor:
+        """添加一份日志，options 传给 LogMonitor（checkpoint_path、rules_path、回调等），返回其 LogMonitor"""
+        return self.add_monitor(LogMonitor(log_path=log_path, **options), name, from_end)
+
+    def add_monitor(self, monitor: LogMonitor, name: Optional[str] = None, from_end: bool = True) -> LogMonitor:
+        """添加已创建的 LogMonitor；name 默认为日志路径"""
+        name = name or monitor.log_path
+        if name in self.sources:
+            raise ValueError(f"日志源重名: {name}")
+        if not os.path.exists(monitor.log_path):
+            raise FileNotFoundError(f"Warframe 日志文件未找到: {monitor.log_path}")
+        source = LogSource(name, monitor, from_end)
+        if self._inotify:
+            path = os.path.abspath(monitor.log_path)
+            source.watch = (self._inotify.add_watch(os.path.dirname(path)), os.path.basename(path))
+            self._watched.setdefault(source.watch, []).append(source)
+        if self._event_bus is not None:
+            self._event_bus.attach(monitor, source=name)
+        self.sources[name] = source
+        self._dirty.add(source)  # 首轮读取已有的积压
+        return monitor
+
+    def remove(self, name: str) -> LogMonitor:
+        """移除日志源：保存断点并关闭文件，返回其 LogMonitor"""
+        source = self.sources.pop(name)
+        if source.watch:
+            self._watched[source.watch].remove(source)
+            if not self._watched[source.watch]:
+                del self._watched[source.watch]
+        for pending in (self._dirty, self._touched, self._unsaved):
+            pending.discard(source)
+        source.close()
+        return source.monitor
+
+    @property
+    def monitors(self) -> Dict[str, LogMonitor]:
+        return {name: source.monitor for name, source in self.sources.items()}
+
+    # === 事件 ===
+    @property
+    def event_bus(self) -> "EventBus":
+        """汇总事件总线：首次访问时创建并接管所有日志源的回调，事件的 source 为日志源名称"""
+        if self._event_bus is None:
+            from .bus import EventBus
+
+            self._event_bus = EventBus()
+            for name, source in self.sources.items():
+                self._event_bus.attach(source.monitor, source=name)
+        return self._event_bus
+
+    def subscribe(self, handler, **options) -> "Subscription":
+        """订阅所有日志源的事件，options 见 EventBus.subscribe；可用 predicate 按 event.source 过滤"""
+        return self.event_bus.subscribe(handler, **options)
+
+    # === 主循环 ===
+    def run(self):
+        """阻塞式监控，直到 stop()：等待写入 → 只读取有动静的日志源 → 定期保存断点、检查规则文件"""
+        self._running = True
+        interval = self.min_interval
+        next_maintenance = time.monotonic() + RULES_CHECK_INTERVAL
+        try:
+            while self._running:
+                count = self.poll()
+                now = time.monotonic()
+                if now >= next_maintenance:
+                    self._maintain(now)
+                    next_maintenance = now + RULES_CHECK_INTERVAL
+                if count:
+                    interval = self.min_interval
+                    continue
+                if self._selector:
+                    self._wait(self.max_interval)
+                else:
+                    time.sleep(interval)
+                    interval = min(interval * 2, self.max_interval)
+        finally:
+            self._running = False
+            for source in self.sources.values():
+                source.save_checkpoint()
+
+    def poll(self) -> int:
+        """读取一轮：有 inotify 时只读被写入的日志源，否则读全部；返回解析的行数"""
+        if self._inotify:
+            ready, self._dirty = self._dirty, set()
+        else:
+            ready = list(self.sources.values())
+        return self._read(ready)
+
+    def _read(self, sources: Iterable[LogSource]) -> int:
+        total = 0
+        for source in sources:
+            count = source.read()
+            if count:
+                total += count
+                self._touched.add(source)
+                self._unsaved.add(source)
+                if source.tailer.has_more and self._inotify:
+                    self._dirty.add(source)  # 单批有上限，积压下一轮继续读
+            elif source.tailer._check_rotation() and self._inotify:
+                self._dirty.add(source)  # 截断/重建后从头读，下一轮继续
+        return total
+
+    def _wait(self, timeout: float):
+        """在 inotify 描述符上等待，把事件按 (目录, 文件名) 分派给日志源"""
+        if not self._selector.select(timeout):
+            return
+        for wd, mask, name in self._inotify.read_events():
+            if mask & _Inotify.IN_Q_OVERFLOW:
+                self._dirty.update(self.sources.values())  # 事件丢失，全部检查一遍
+            else:
+                self._dirty.update(self._watched.get((wd, name), ()))
+
+    def _maintain(self, now: float):
+        """批次之间：解析过新行的日志源检查规则文件，到期的保存断点"""
+        for source in self._touched:
+            if source.monitor.rules_file:
+                source.monitor.reload_rules()
+        self._touched.clear()
+        for source in [s for s in self._unsaved if now >= s.next_save]:
+            source.save_checkpoint()
+            self._unsaved.discard(source)
+
+    def stop(self):
+        """停止监控（线程安全）"""
+        self._running = False
+
+    def close(self):
+        """关闭所有日志源与 inotify"""
+        for name in list(self.sources):
+            self.remove(name)
+        if self._selector:
+            self._selector.close()
+            self._selector = None
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+        if self._event_bus:
+            self._event_bus.close()
+
+    # === 汇总视图 ===
+    def aggregate(self) -> Dict[str, Any]:
+        """各账号合计：进行中的任务数、本次任务的敌人/掉落、累计奖励、收益速率之和，以及各日志源摘要
+
+        每个日志源在其 state_lock 内读取，可在其他线程调用；速率按各日志自己的时间戳计算后相加。
+        """
+        enemies, drops, rewards, drops_per_min = Counter(), Counter(), Counter(), Counter()
+        credits_per_hour = affinity_per_min = 0.0
+        sources = {}
+        for name, source in list(self.sources.items()):
+            monitor = source.monitor
+            with monitor.state_lock:
+                rates = monitor.economy.rates(monitor.last_timestamp)
+                enemies.update(dict(monitor.enemies))
+                drops.update(dict(monitor.items.counts["raw_key"]))
+                rewards.update(dict(monitor.rewards.amounts["type"]))
+                sources[name] = {
+                    "log_path": monitor.log_path,
+                    "active": monitor.mission_active,
+                    "level": monitor.current_level,
+                    "enemy_count": monitor.enemy_total,
+                    "item_count": monitor.items.total,
+                    "credits_per_hour": rates["credits_per_hour"],
+                    "lines": source.lines,
+                }
+            drops_per_min.update(rates["drops_per_min"])
+            credits_per_hour += rates["credits_per_hour"]
+            affinity_per_min += rates["affinity_per_min"]
+        return {
+            "sources": sources,
+            "active_missions": sum(1 for info in sources.values() if info["active"]),
+            "enemies": dict(enemies),
+            "drops": dict(drops),
+            "rewards": dict(rewards),
+            "credits_per_hour": credits_per_hour,
+            "affinity_per_min": affinity_per_min,
+            "drops_per_min": dict(drops_per_min),
+        }
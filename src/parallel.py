@@ -0,0 +1,209 @@
+# src/parallel.py
+"""多进程并行解析归档日志
+
+子进程只负责耗时的正则匹配，把每个分块压缩成“有意义的行”列表；
+主进程按分块顺序把结果回放进同一个 LogMonitor，因此任务边界判定、
+敌人计数、掉落和奖励与单线程 ingest_file 完全一致。
+
+压缩规则：进图后，任务状态只依赖相邻时间戳之差（>5000 视为新任务），
+所以无命中的噪声行只在以下情况保留——分块首行（前一行在上一个分块里）、
+块内发生跳变的行、分块末行（更新 last_timestamp）。进图前每行都参与
+密度判定，需全部保留：第一个分块按主进程的真实状态精确模拟；其余分块
+假定已进图，若回放时发现主进程仍未进图，则该分块回退为主进程顺序解析。
+"""
+import mmap
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .log_parser import (
+    DEFAULT_SCANNER,
+    MISSION_START_THRESHOLD,
+    TIMESTAMP_BYTES,
+    TIMESTAMP_PATTERN,
+    LogMonitor,
+)
+from .rules import Scanner
+from .tailer import decode_lines, split_lines
+
+CHUNK_BYTES = 16 * 1024 * 1024  # 每个分块的目标大小
+
+
+class _Groups(tuple):
+    """可序列化的匹配结果替身，只提供处理器用到的 group(n)"""
+    __slots__ = ()
+
+    def group(self, index: int):
+        return self[index - 1]
+
+
+def split_file(path: str, chunk_bytes: int = CHUNK_BYTES) -> List[Tuple[str, int, int]]:
+    """按行边界把文件切成若干 (path, start, end) 分块"""
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    chunks = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if end < 0 else end + 1
+            chunks.append((path, start, end))
+            start = end
+    return chunks
+
+
+def _read_chunk(path: str, start: int, end: int) -> List[str]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return decode_lines(mm[start:end])
+
+
+def _match_line(raw: bytes, scanner: Scanner) -> Optional[tuple]:
+    """一行的 (时间戳, ((规则下标, 匹配分组), ...))，没有时间戳时返回 None
+
+    与 LogMonitor.process_bytes 相同：纯 ASCII 行在 bytes 上取时间戳和预筛，只有命中的行才解码。
+    """
+    if raw.isascii():
+        ts_match = TIMESTAMP_BYTES.match(raw)
+        if not ts_match:
+            return None
+        ts = float(ts_match.group(1))
+        hits = scanner.bytes_prefilter.findall(raw)
+        if not hits:
+            return ts, ()
+        line = raw.decode("ascii")
+        wanted = {hit.decode("ascii") for hit in hits}
+    else:
+        line = raw.decode("utf-8", errors="ignore")
+        ts_match = TIMESTAMP_PATTERN.match(line)
+        if not ts_match:
+            return None
+        ts = float(ts_match.group(1))
+        wanted = set(scanner.prefilter.findall(line))
+        if not wanted:
+            return ts, ()
+    found = []
+    for index, rule in enumerate(scanner.rules):
+        if rule.literal in wanted:
+            match = rule.pattern.search(line)
+            if match:
+                found.append((index, _Groups(match.groups())))
+    return ts, tuple(found)
+
+
+def scan_chunk(path: str, start: int, end: int, entry_state: Optional[tuple] = None,
+               scanner: Optional[Scanner] = None) -> tuple:
+    """子进程入口：匹配一个分块（bytes 上预筛，只解码命中的行），返回 (行数, [(ts, prev_ts, matches), ...])
+
+    entry_state 为 None 时假定分块开始时已进图；否则为主进程的
+    (mission_active, _recent_agent_count, _recent_agent_time, last_timestamp)。
+    scanner 为主进程的规则（None 表示内置规则），规则下标与主进程一致。
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = split_lines(mm[start:end])
+    scanner = scanner or DEFAULT_SCANNER
+    if entry_state is None:
+        active, recent_count, recent_time, last_ts = True, 0, 0.0, 0.0
+    else:
+        active, recent_count, recent_time, last_ts = entry_state
+
+    entries = []
+    prev = None       # 块内上一条带时间戳行的时间
+    pending = None    # 未输出的最近一行，分块结束时补上
+    for line in lines:
+        result = _match_line(line, scanner)
+        if result is None:
+            continue
+        ts, matches = result
+
+        last = last_ts if prev is None else prev
+        jumped = last > 0 and ts - last > 5000
+        if active:
+            emit = matches or prev is None or jumped
+        else:
+            # 与 LogMonitor.detect_mission_start_by_activity 相同的模拟
+            emit = True
+            if jumped:
+                active = True
+            else:
+                if ts - recent_time < 5.0:
+                    recent_count += 1
+                else:
+                    recent_count = 1
+                    recent_time = ts
+                active = recent_count >= MISSION_START_THRESHOLD
+
+        if emit:
+            entries.append((ts, prev, matches))
+            pending = None
+        else:
+            pending = (ts, prev, ())
+        prev = ts
+
+    if pending:
+        entries.append(pending)
+    return len(lines), entries
+
+
+def parse_files_parallel(
+        monitor: LogMonitor,
+        paths: Sequence[str],
+        workers: Optional[int] = None,
+        chunk_bytes: int = CHUNK_BYTES,
+) -> Dict[str, Any]:
+    """用进程池解析多个日志文件，结果按顺序合并进 monitor，返回吞吐统计"""
+    start_time = time.perf_counter()
+    jobs = [chunk for path in paths for chunk in split_file(path, chunk_bytes)]
+    workers = workers or os.cpu_count() or 1
+    line_count = 0
+    fallbacks = 0
+    # 自定义规则随任务发给子进程（内置规则子进程自带，不必传）
+    scanner = None if monitor.scanner is DEFAULT_SCANNER else monitor.scanner
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        job_iter = iter(enumerate(jobs))
+
+        def submit_next():
+            item = next(job_iter, None)
+            if item is None:
+                return
+            i, (path, start, end) = item
+            entry_state = None
+            if i == 0 and not monitor.mission_active:
+                entry_state = (False, monitor._recent_agent_count,
+                               monitor._recent_agent_time, monitor.last_timestamp)
+            pending.append((path, start, end, entry_state is None,
+                            pool.submit(scan_chunk, path, start, end, entry_state, scanner)))
+
+        # 限制在途分块数量，避免已完成但未回放的结果堆积在内存里
+        for _ in range(workers * 2):
+            submit_next()
+        while pending:
+            path, start, end, assumed_active, future = pending.popleft()
+            count, entries = future.result()
+            submit_next()
+            line_count += count
+            if assumed_active and not monitor.mission_active:
+                # 假设不成立：该分块在主进程内顺序解析
+                fallbacks += 1
+                for line in _read_chunk(path, start, end):
+                    monitor.process_line(line)
+                continue
+            apply = monitor.apply_matches
+            for ts, prev_ts, matches in entries:
+                apply(ts, prev_ts, matches)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "paths": list(paths),
+        "bytes": sum(end - start for _, start, end in jobs),
+        "lines": line_count,
+        "chunks": len(jobs),
+        "fallbacks": fallbacks,
+        "workers": workers,
+        "seconds": elapsed,
+        "lines_per_sec": line_count / elapsed if elapsed > 0 else 0.0,
+    }
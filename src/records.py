@@ -0,0 +1,123 @@
+# src/records.py
+"""解析结果的紧凑记录类型
+
+用 __slots__ 代替每个事件一个 dict；显示用字符串（中文名、时间）在渲染时才计算。
+保留 record['key'] / record.get('key') / 'key' in record 的读法，兼容按字典使用回调参数的旧代码。
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .utils import get_chinese_drop_name
+
+
+class _Record:
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()  # to_dict 输出的字段（含惰性属性）
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS  # 与旧版 dict 的键一致
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _format_wall(wall: Optional[float]) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(wall)) if wall is not None else ""
+
+
+class AgentRecord(_Record):
+    """敌人生成：原始 NPC 名（含数字后缀）与归一化类型"""
+    __slots__ = ("raw_npc", "npc_type", "timestamp")
+    FIELDS = __slots__
+
+    def __init__(self, raw_npc: str, npc_type: str, timestamp: float):
+        self.raw_npc = raw_npc
+        self.npc_type = npc_type
+        self.timestamp = timestamp
+
+
+class DropRecord(_Record):
+    """掉落物传送"""
+    __slots__ = ("raw_key", "position", "timestamp")
+    FIELDS = ("raw_key", "chinese_name", "position", "timestamp")
+
+    def __init__(self, raw_key: str, position: tuple, timestamp: float):
+        self.raw_key = raw_key
+        self.position = position
+        self.timestamp = timestamp
+
+    @property
+    def chinese_name(self) -> str:
+        return get_chinese_drop_name(self.raw_key)
+
+
+class RewardRecord(_Record):
+    """奖励；wall 为对应的本机时间戳，time 在显示时才格式化"""
+    __slots__ = ("type", "name", "amount", "timestamp", "cycle", "wall")
+    FIELDS = ("type", "name", "amount", "cycle", "timestamp", "time")
+
+    def __init__(self, type: str, name: str, amount: int, timestamp: float,
+                 cycle: Optional[int] = None, wall: Optional[float] = None):
+        self.type = type
+        self.name = name
+        self.amount = amount
+        self.timestamp = timestamp
+        self.cycle = cycle
+        self.wall = wall
+
+    @property
+    def time(self) -> str:
+        return _format_wall(self.wall)
+
+
+class ConservationRecord(_Record):
+    """保育动物生成"""
+    __slots__ = ("agent", "type", "spawn_time", "position", "wall")
+    FIELDS = ("agent", "type", "spawn_time", "position", "time")
+
+    def __init__(self, agent: Optional[str], type: str, spawn_time: Optional[float],
+                 position: Optional[tuple], wall: Optional[float] = None):
+        self.agent = agent
+        self.type = type
+        self.spawn_time = spawn_time
+        self.position = position
+        self.wall = wall
+
+    @property
+    def time(self) -> str:
+        return _format_wall(self.wall)
+
+
+class RuleEvent(_Record):
+    """规则文件中 event 规则产生的事件：事件名与按 fields 转换后的字段"""
+    __slots__ = ("event", "fields", "timestamp")
+    FIELDS = __slots__
+
+    def __init__(self, event: str, fields: Dict[str, Any], timestamp: float):
+        self.event = event
+        self.fields = fields
+        self.timestamp = timestamp
+
+
+class MissionRecord(_Record):
+    """任务状态变化：开始 / 结算 / 结束 / 地图加载"""
+    __slots__ = ("level", "success", "timestamp")
+    FIELDS = __slots__
+
+    def __init__(self, level: Optional[str], success: Optional[bool], timestamp: float):
+        self.level = level
+        self.success = success
+        self.timestamp = timestamp
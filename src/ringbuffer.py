@@ -0,0 +1,72 @@
+# src/ringbuffer.py
+from collections import Counter, deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional
+
+
+class RingBuffer(deque):
+    """定长环形缓冲：只保留最近 maxlen 条记录，同时维护全部历史的精确汇总
+
+    旧记录被挤出后，total / counts / amounts 仍按全部历史计算，
+    因此长时间刷图时内存恒定，界面上的累计数字依然准确。
+    """
+
+    def __init__(self, maxlen: int, group_by: Iterable[str] = (), amount_field: Optional[str] = None):
+        super().__init__(maxlen=maxlen)
+        self.group_by = tuple(group_by)
+        self.amount_field = amount_field
+        self.total = 0            # 历史记录总数
+        self.amount_total = 0     # 历史数量总和（amount_field 为空时不统计）
+        self.counts = {field: Counter() for field in self.group_by}   # {字段: {值: 条数}}
+        self.amounts = {field: Counter() for field in self.group_by} if amount_field else {}  # {字段: {值: 数量}}
+
+    def append(self, record: Any):
+        super().append(record)
+        self.total += 1
+        amount = getattr(record, self.amount_field) if self.amount_field else 0
+        self.amount_total += amount
+        for field in self.group_by:
+            key = getattr(record, field)
+            self.counts[field][key] += 1
+            if self.amount_field:
+                self.amounts[field][key] += amount
+
+    @property
+    def evicted(self) -> int:
+        """已被挤出的记录数"""
+        return self.total - len(self)
+
+    def __getitem__(self, index):
+        # 兼容列表式切片，如 buffer[-10:]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return list(islice(self, start, stop))
+        return super().__getitem__(index)
+
+    def reset(self):
+        """清空记录并归零汇总"""
+        self.clear()
+        self.total = 0
+        self.amount_total = 0
+        for counter in (*self.counts.values(), *self.amounts.values()):
+            counter.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总数据的快照（不含记录本身），用于断点保存"""
+        return {
+            "total": self.total,
+            "amount_total": self.amount_total,
+            "counts": {field: dict(counter) for field, counter in self.counts.items()},
+            "amounts": {field: dict(counter) for field, counter in self.amounts.items()},
+        }
+
+    def restore_summary(self, data: Dict[str, Any]):
+        """从 summary() 的快照恢复汇总；记录本身不恢复，视为已被挤出"""
+        self.reset()
+        self.total = data["total"]
+        self.amount_total = data["amount_total"]
+        for target, saved in ((self.counts, data["counts"]), (self.amounts, data["amounts"])):
+            for field, counter in target.items():
+                counter.update(saved.get(field, {}))
@@ -0,0 +1,419 @@
+# src/rules.py
+"""数据驱动的日志规则：规则文件 → 预筛 + 分桶扫描器，编译结果按规则哈希缓存在磁盘
+
+规则文件（JSON；扩展名为 .toml 时按 TOML 读取）：
+
+    {
+      "include_defaults": true,
+      "rules": [
+        {"name": "SORTIE_STAGE", "pattern": "Sortie\\\\.lua: stage (\\\\d+) of (\\\\w+)",
+         "event": "sortie_stage",
+         "fields": {"stage": {"group": 1, "type": "int"}, "mission": {"group": 2}}},
+        {"name": "ACOLYTE_DEFEAT", "disabled": true}
+      ]
+    }
+
+每条规则：
+- pattern：正则；literal：匹配时一定出现的子串，用于预筛（省略时从正则推导）
+- handler：LogMonitor 的内置处理方法（_handle_*）；或 event + fields：按 fields 取分组、
+  转换类型（str/int/float/vector），以 RuleEvent 交给 on_rule_event
+- pre_gate：是否在进图判定前执行（默认 false）
+include_defaults 为 true（默认）时在内置规则上增删：同名规则覆盖内置规则，disabled 删除。
+内置规则可用 python -m src.rules --dump 导出。
+
+纯 ASCII 的日志行可以直接在 bytes 上预筛（Scanner.bytes_prefilter），只解码命中的行。
+
+编译：校验规则、推导并规整字面量（互相包含或首尾重叠时缩短，预筛不会漏报）、
+生成各正则的 SRE 字节码。结果以 规则内容 + Python/SRE 版本 的哈希为键存入
+~/.warframe-better/rules-cache/，再次加载时直接由字节码构造正则，跳过解析与编译。
+字节码用到 CPython 内部接口，只在 BYTECODE_CACHE 为 True 时启用，否则缓存只保存规整后的规则。
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import CONFIG_DIR
+
+try:
+    from re import _compiler, _parser  # Python 3.11+
+except ImportError:
+    import sre_compile as _compiler
+    import sre_parse as _parser
+try:
+    import _sre  # 正则字节码接口（CPython 内部实现，缓存键含 _sre.MAGIC）
+except ImportError:
+    _sre = None
+
+# _compiler._code 与 _sre.compile 的签名只在这些 CPython 版本上核对过；其他解释器/版本退回 re.compile
+BYTECODE_CACHE = (sys.implementation.name == "cpython" and (3, 7) <= sys.version_info[:2] <= (3, 13)
+                  and _sre is not None and hasattr(_compiler, "_code"))
+
+RULES_CACHE_DIR = os.path.join(CONFIG_DIR, "rules-cache")
+CACHE_FORMAT = 1
+MAX_CACHE_FILES = 8     # 缓存目录只保留最近的几份
+MIN_LITERAL = 3         # 推导出的字面量太短时预筛几乎不起作用，要求显式给出
+FIELD_TYPES = ("str", "int", "float", "vector")
+_RULE_KEYS = {"name", "literal", "pattern", "handler", "event", "fields", "pre_gate", "disabled"}
+
+
+def parse_vector(s: str) -> Optional[tuple]:
+    """'x, y, z' → 浮点元组，格式不对时返回 None"""
+    parts = s.split(',')
+    if len(parts) != 3:
+        return None
+    try:
+        return tuple(float(x) for x in parts)
+    except ValueError:
+        return None
+
+
+_CONVERTERS = {"str": sys.intern, "int": int, "float": float, "vector": parse_vector}
+
+
+class Rule:
+    """编译后的一条规则"""
+    __slots__ = ("name", "literal", "pattern", "handler", "event", "fields", "pre_gate")
+
+    def __init__(self, name: str, literal: str, pattern: re.Pattern, handler: Optional[str] = None,
+                 event: Optional[str] = None, fields: tuple = (), pre_gate: bool = False):
+        self.name = name
+        self.literal = literal
+        self.pattern = pattern
+        self.handler = handler
+        self.event = event
+        self.fields = fields  # ((字段名, 分组, 类型), ...)
+        self.pre_gate = pre_gate
+
+    def extract(self, match) -> Dict[str, Any]:
+        """按 fields 取出并转换字段；转换失败的字段为 None"""
+        result = {}
+        for name, group, kind in self.fields:
+            value = match.group(group)
+            if value is not None:
+                try:
+                    value = _CONVERTERS[kind](value)
+                except ValueError:
+                    value = None
+            result[name] = value
+        return result
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, literal={self.literal!r})"
+
+
+class Scanner:
+    """一组规则：预筛正则（所有字面量合成一个）+ 按注册顺序排列的规则"""
+
+    def __init__(self, rules: Sequence[Rule], key: Optional[str] = None):
+        self.rules = tuple(rules)
+        self.key = key  # 规则哈希，内置规则为 None
+        self.literals = tuple(dict.fromkeys(rule.literal for rule in self.rules))
+        # 噪声行只需一次 C 层扫描（字面量已规整为互不包含、首尾不重叠，findall 不会漏报）
+        self.prefilter = re.compile('|'.join(re.escape(lit) for lit in self.literals) or r'(?!)')
+        self._bytes_prefilter = None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @property
+    def bytes_prefilter(self) -> re.Pattern:
+        """预筛的 bytes 版本，只用于纯 ASCII 行（见 LogMonitor.process_bytes），首次使用时编译
+
+        ASCII 行上它的命中与 str 版本完全相同；非 ASCII 字面量不会出现在 ASCII 行中，不参与预筛。
+        """
+        if self._bytes_prefilter is None:
+            literals = [lit.encode("ascii") for lit in self.literals if lit.isascii()]
+            self._bytes_prefilter = re.compile(b'|'.join(re.escape(lit) for lit in literals) or rb'(?!)')
+        return self._bytes_prefilter
+
+
+# === 字面量推导与规整 ===
+def derive_literal(parsed) -> str:
+    """正则匹配时一定出现的最长连续字面量（只看顶层顺序部分，分组内容展开）"""
+    best, run = "", []
+
+    def walk(items):
+        nonlocal best
+        for op, av in items:
+            if op == _parser.LITERAL:
+                run.append(chr(av))
+                continue
+            if op == _parser.SUBPATTERN:
+                _, add_flags, del_flags, sub = av
+                if not add_flags and not del_flags:
+                    walk(sub)
+                    continue
+            elif op in (_parser.AT, _parser.ASSERT, _parser.ASSERT_NOT):
+                continue  # 零宽，不打断连续的字面量
+            if len(run) > len(best):
+                best = "".join(run)
+            run.clear()
+
+    if parsed.state.flags & re.IGNORECASE:
+        return ""
+    walk(parsed)
+    return max(best, "".join(run), key=len)
+
+
+def normalize_literals(literals: Iterable[str]) -> Dict[str, str]:
+    """原字面量 → 预筛用字面量：被其他字面量包含的长字面量改用短的那个，
+    与其他字面量首尾重叠的缩短到不重叠为止"""
+    mapping = {lit: lit for lit in literals}
+    changed = True
+    while changed:
+        changed = False
+        current = sorted(set(mapping.values()), key=len)
+        for a in current:
+            for b in current:
+                if a == b:
+                    continue
+                if b in a:
+                    target = b
+                else:
+                    overlap = next((k for k in range(min(len(a), len(b)) - 1, 0, -1) if a.endswith(b[:k])), 0)
+                    if not overlap:
+                        continue
+                    target = a[:-overlap]
+                for lit, mapped in mapping.items():
+                    if mapped == a:
+                        mapping[lit] = target
+                changed = True
+                break
+            if changed:
+                break
+    return mapping
+
+
+def normalize_specs(specs: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """规整各规则的 literal（见 normalize_literals），返回新的规则列表；内置规则与规则文件共用"""
+    mapping = normalize_literals(spec["literal"] for spec in specs)
+    return [dict(spec, literal=mapping[spec["literal"]]) for spec in specs]
+
+
+# === 正则字节码 ===
+def _compile_code(source: str) -> Tuple[Any, Optional[list]]:
+    """解析并生成字节码：返回 (解析树, [flags, code, groups, groupindex])；未启用字节码缓存时后者为 None"""
+    parsed = _parser.parse(source, 0)
+    if not BYTECODE_CACHE:
+        return parsed, None
+    code = _compiler._code(parsed, 0)
+    return parsed, [parsed.state.flags, code, parsed.state.groups, dict(parsed.state.groupdict)]
+
+
+def _from_code(source: str, flags: int, code: list, groups: int, groupindex: dict) -> re.Pattern:
+    """由缓存的字节码直接构造正则（与 re._compiler.compile 的最后一步相同）"""
+    indexgroup = [None] * groups
+    for name, index in groupindex.items():
+        indexgroup[index] = name
+    return _sre.compile(source, flags, code, groups - 1, groupindex, tuple(indexgroup))
+
+
+# === 编译 ===
+def _check_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """校验一条规则并补全默认值"""
+    name = spec.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"规则缺少 name: {spec}")
+    unknown = set(spec) - _RULE_KEYS
+    if unknown:
+        raise ValueError(f"规则 {name} 含未知的键: {', '.join(sorted(unknown))}")
+    if not isinstance(spec.get("pattern"), str):
+        raise ValueError(f"规则 {name} 缺少 pattern")
+    if bool(spec.get("handler")) == bool(spec.get("event")):
+        raise ValueError(f"规则 {name} 需要 handler 或 event 二者之一")
+    handler = spec.get("handler")
+    if handler and not handler.startswith("_handle_"):
+        raise ValueError(f"规则 {name} 的 handler 必须是 LogMonitor 的 _handle_* 方法: {handler}")
+    fields = []
+    for field, options in (spec.get("fields") or {}).items():
+        if isinstance(options, int):
+            options = {"group": options}
+        kind = options.get("type", "str")
+        if kind not in FIELD_TYPES:
+            raise ValueError(f"规则 {name} 的字段 {field} 类型未知: {kind}（可选 {', '.join(FIELD_TYPES)}）")
+        group = options.get("group", 1)
+        if not isinstance(group, int) or group < 1:
+            raise ValueError(f"规则 {name} 的字段 {field} 分组须为从 1 开始的整数: {group}")
+        fields.append([field, group, kind])
+    return {
+        "name": name,
+        "literal": spec.get("literal") or None,
+        "pattern": spec["pattern"],
+        "handler": handler or None,
+        "event": spec.get("event") or None,
+        "fields": fields,
+        "pre_gate": bool(spec.get("pre_gate", False)),
+    }
+
+
+def rules_hash(specs: Sequence[Dict[str, Any]]) -> str:
+    """规则内容 + 解释器版本的哈希；字节码随 Python 版本变化，一并计入"""
+    payload = json.dumps([CACHE_FORMAT, sys.version, _sre.MAGIC if BYTECODE_CACHE else None, list(specs)],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _compile_specs(specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """规则 → 可缓存的编译结果（规整后的规则与各正则字节码）"""
+    compiled, codes = [], {}
+    for spec in specs:
+        source = spec["pattern"]
+        try:
+            parsed, code = _compile_code(source)
+            pattern = re.compile(source)
+        except re.error as e:
+            raise ValueError(f"规则 {spec['name']} 的正则无效: {e}") from None
+        if code is not None:
+            codes[source] = code
+        if pattern.groups < max((group for _, group, _ in spec["fields"]), default=0):
+            raise ValueError(f"规则 {spec['name']} 的字段引用了不存在的分组")
+        literal = spec["literal"]
+        if literal is None:
+            literal = derive_literal(parsed)
+            if len(literal) < MIN_LITERAL:
+                raise ValueError(f"规则 {spec['name']} 无法推导出足够长的字面量，请显式指定 literal")
+        compiled.append(dict(spec, literal=literal))
+    return {"rules": normalize_specs(compiled), "codes": codes}
+
+
+def _build(data: Dict[str, Any], key: str) -> Scanner:
+    codes = data["codes"]
+    patterns = {}
+    rules = []
+    for spec in data["rules"]:
+        source = spec["pattern"]
+        pattern = patterns.get(source)
+        if pattern is None:
+            code = codes.get(source)
+            pattern = patterns[source] = _from_code(source, *code) if code and BYTECODE_CACHE else re.compile(source)
+        rules.append(Rule(spec["name"], spec["literal"], pattern, spec["handler"], spec["event"],
+                          tuple(tuple(field) for field in spec["fields"]), spec["pre_gate"]))
+    return Scanner(rules, key)
+
+
+def _read_cache(path: str, key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get("key") == key else None
+
+
+def _write_cache(cache_dir: str, path: str, key: str, data: Dict[str, Any]):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, **data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        entries = sorted((e for e in os.scandir(cache_dir) if e.name.endswith(".json")),
+                         key=lambda e: e.stat().st_mtime, reverse=True)
+        for entry in entries[MAX_CACHE_FILES:]:
+            os.remove(entry.path)
+    except OSError as e:
+        print(f"[Rules] 写入编译缓存失败: {e}")
+
+
+def compile_rules(specs: Sequence[Dict[str, Any]], cache_dir: Optional[str] = RULES_CACHE_DIR) -> Scanner:
+    """编译规则；cache_dir 为 None 时不读写磁盘缓存。规则无效时抛出 ValueError"""
+    checked = [_check_spec(spec) for spec in specs]
+    key = rules_hash(checked)
+    path = os.path.join(cache_dir, key[:32] + ".json") if cache_dir else None
+    data = _read_cache(path, key) if path else None
+    if data is not None:
+        try:
+            return _build(data, key)
+        except (RuntimeError, TypeError, ValueError, KeyError):
+            pass  # 缓存损坏或与当前解释器不符，重新编译
+    data = _compile_specs(checked)
+    scanner = _build(data, key)
+    if path:
+        _write_cache(cache_dir, path, key, data)
+    return scanner
+
+
+# === 规则文件 ===
+def read_rule_file(path: str) -> Dict[str, Any]:
+    if path.endswith(".toml"):
+        import tomllib  # Python 3.11+
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_rules(defaults: Sequence[Dict[str, Any]], document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """规则文件与内置规则合并：同名覆盖（保持内置顺序），disabled 删除，新规则追加在后"""
+    merged = {spec["name"]: spec for spec in defaults} if document.get("include_defaults", True) else {}
+    for spec in document.get("rules", []):
+        name = spec.get("name")
+        if spec.get("disabled"):
+            merged.pop(name, None)
+        else:
+            merged[name] = spec
+    return list(merged.values())
+
+
+def load_rules(path: str, defaults: Sequence[Dict[str, Any]] = (),
+               cache_dir: Optional[str] = RULES_CACHE_DIR) -> Scanner:
+    """读取规则文件并编译；文件格式或规则无效时抛出 ValueError，文件不可读时抛出 OSError"""
+    try:
+        document = read_rule_file(path)
+    except ValueError as e:  # json.JSONDecodeError 与 tomllib.TOMLDecodeError 都是 ValueError
+        raise ValueError(f"规则文件格式错误: {path} ({e})") from None
+    if not isinstance(document, dict):
+        raise ValueError(f"规则文件格式错误: {path}")
+    return compile_rules(merge_rules(defaults, document), cache_dir)
+
+
+class RuleFile:
+    """规则文件的修改检测：按 (mtime, 大小) 判断，变化时重新加载"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp = self._stat()
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed(self) -> bool:
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return stamp is not None  # 文件被删除时保留现有规则
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="日志规则：导出内置规则、检查规则文件")
+    parser.add_argument("path", nargs="?", help="要检查的规则文件")
+    parser.add_argument("--dump", action="store_true", help="以 JSON 输出内置规则（可作为规则文件的起点）")
+    args = parser.parse_args(argv)
+
+    from .log_parser import DEFAULT_RULES
+
+    if args.dump:
+        json.dump({"include_defaults": False, "rules": list(DEFAULT_RULES)}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    if not args.path:
+        parser.error("需要规则文件路径或 --dump")
+    scanner = load_rules(args.path, DEFAULT_RULES)
+    print(f"{len(scanner)} 条规则，{len(scanner.literals)} 个预筛字面量，哈希 {scanner.key[:12]}")
+    for rule in scanner.rules:
+        target = rule.handler or f"event={rule.event}"
+        print(f"  {rule.name:<32} {rule.literal!r:<28} {target}{'（进图前）' if rule.pre_gate else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+# src/server.py
+"""本机 HTTP / WebSocket 事件服务（仅标准库），供第二屏悬浮窗、直播组件等使用
+
+- GET /snapshot：LogMonitor.mission_info 的 JSON；只在状态变化后重建，支持 ETag / 304
+- GET /events：WebSocket，连上先收到一份快照，之后每帧（默认 100ms）最多一条合并后的增量；
+  断线重连时带上 ?since=<已收到的版本>，历史中仍有之后的全部事件就只补发增量，否则重新发快照
+
+服务在独立线程的事件循环中运行；解析线程只做一次计数和入队，
+序列化、合并与发送都不在解析线程中进行。发送缓冲积压过多的慢客户端会被断开。
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+from collections import Counter, deque
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .bus import AGENT, CONSERVATION, ITEM, REWARD, RULE, SYNC
+from .config import SERVER_PORT
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = SERVER_PORT
+FRAME_INTERVAL = 0.1                 # 增量合并周期（秒）
+MAX_CLIENT_BUFFER = 1024 * 1024      # 单个客户端未发送数据上限，超过即断开
+MAX_HISTORY_EVENTS = 100_000         # 保留的最近事件数（增量与 since= 续传都从这里取）
+MAX_FRAME_SIZE = 64 * 1024           # 客户端帧载荷上限（客户端只发 ping / close），超过以 1009 关闭
+START_TIMEOUT = 10.0                 # start() 等待服务线程开始监听的最长时间（秒）
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def websocket_accept(key: str) -> str:
+    """Sec-WebSocket-Accept 的计算（RFC 6455）"""
+    return base64.b64encode(hashlib.sha1(key.encode() + _WS_GUID).digest()).decode()
+
+
+class FrameTooLarge(ValueError):
+    """客户端帧载荷超过上限"""
+
+
+def encode_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """服务端发出的帧（不加掩码）"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int = MAX_FRAME_SIZE) -> tuple:
+    """读取一帧，返回 (opcode, 载荷)；客户端帧带掩码，载荷超过 max_size 时抛出 FrameTooLarge"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if length > max_size:
+        raise FrameTooLarge(length)
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+def _json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class EventServer:
+    """挂在 LogMonitor 事件总线上的本机服务"""
+
+    def __init__(self, monitor, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 frame_interval: float = FRAME_INTERVAL):
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self.frame_interval = frame_interval
+        self.version = 0            # 状态版本，每个事件 +1
+        self.frames_sent = 0
+        self.clients_dropped = 0
+        self._history = deque(maxlen=MAX_HISTORY_EVENTS)  # [(版本, 事件)]，没有客户端时也记录
+        self._clients: Dict[asyncio.StreamWriter, int] = {}  # 客户端 → 已包含的状态版本
+        self._snapshot: Optional[bytes] = None
+        self._snapshot_version = -1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None  # 服务线程启动失败的异常（如端口被占用），由 start() 抛出
+        self.subscription = monitor.subscribe(self._on_event, mode=SYNC, name="EventServer")
+
+    # === 解析线程 ===
+    def _on_event(self, event):
+        # 只有解析线程写入；deque 的 append 与 copy 都在一次 C 调用内完成，服务线程先取副本再遍历
+        self.version = version = self.version + 1
+        self._history.append((version, event))
+
+    def _events_since(self, version: int) -> list:
+        """历史中版本大于 version 的事件 [(版本, 事件)]"""
+        events = []
+        for item in reversed(self._history.copy()):
+            if item[0] <= version:
+                break
+            events.append(item)
+        events.reverse()
+        return events
+
+    def _can_resume(self, version: int) -> bool:
+        """历史中仍有 version 之后的全部事件"""
+        history = self._history.copy()
+        return version <= self.version and (not history or history[0][0] <= version + 1)
+
+    # === 快照 ===
+    def snapshot(self) -> bytes:
+        """当前状态的 JSON；版本未变时直接复用缓存"""
+        if self._snapshot is None or self.version != self._snapshot_version:
+            monitor = self.monitor
+            # 解析线程处理一批行时持有 state_lock：锁内读到的状态与版本一致，
+            # 不大于该版本的事件都已反映在快照中，之后的都没有
+            with monitor.state_lock:
+                info = monitor.mission_info
+                version = self.version
+                info["level"] = monitor.current_level
+                info["reward_totals"] = dict(monitor.rewards.amounts["type"])
+            info["latest_items"] = [record.to_dict() for record in info["latest_items"]]
+            self._snapshot = _json({"type": "snapshot", "version": version, **info})
+            self._snapshot_version = version
+        return self._snapshot
+
+    @staticmethod
+    def _build_delta(events: list, version: int) -> bytes:
+        """把 [(版本, 事件)] 合并成一条增量消息"""
+        enemies = Counter()
+        items, rewards, conservation, mission, custom = [], [], [], [], []
+        for _, event in events:
+            kind = event.kind
+            if kind == AGENT:
+                enemies[event.record.npc_type] += 1
+            elif kind == ITEM:
+                items.append(event.record.to_dict())
+            elif kind == REWARD:
+                rewards.append(event.record.to_dict())
+            elif kind == CONSERVATION:
+                conservation.append(event.record.to_dict())
+            elif kind == RULE:
+                custom.append(event.record.to_dict())
+            else:
+                mission.append({"kind": kind, **event.record.to_dict()})
+        delta = {"type": "delta", "version": version}
+        for key, value in (("enemies", enemies), ("items", items), ("rewards", rewards),
+                           ("conservation", conservation), ("mission", mission), ("rules", custom)):
+            if value:
+                delta[key] = value
+        return _json(delta)
+
+    # === 服务线程 ===
+    def start(self):
+        """在后台线程启动服务，监听成功后返回；监听失败时抛出服务线程中的异常（如端口被占用的 OSError）"""
+        self._thread = threading.Thread(target=self._run, name="EventServer", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(START_TIMEOUT):
+            self.subscription.unsubscribe()
+            raise TimeoutError(f"事件服务 {START_TIMEOUT:.0f} 秒内未能开始监听")
+        if self._error is not None:
+            self.subscription.unsubscribe()
+            raise self._error
+        print(f"[EventServer] http://{self.host}:{self.port}/snapshot  ws://{self.host}:{self.port}/events")
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2.0)
+        self.subscription.unsubscribe()
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]  # port=0 时取实际端口
+            self._loop = loop
+            loop.create_task(self._broadcast_loop())
+        except Exception as e:
+            self._error = e
+            loop.close()
+            return
+        finally:
+            self._ready.set()  # 成功与否都唤醒 start()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    async def _broadcast_loop(self):
+        while True:
+            await asyncio.sleep(self.frame_interval)
+            if not self._clients:
+                continue
+            events = self._events_since(min(self._clients.values()))
+            if not events:
+                continue
+            first, last = events[0][0], events[-1][0]
+            shared = None
+            for writer, since in list(self._clients.items()):
+                if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                    self._drop(writer)
+                    continue
+                if since >= last:
+                    continue
+                if since < first - 1:
+                    # 落后超过保留的历史：重新发快照
+                    writer.write(encode_frame(self.snapshot()))
+                    self._clients[writer] = self._snapshot_version
+                    continue
+                if since == first - 1:
+                    if shared is None:
+                        shared = encode_frame(self._build_delta(events, last))  # 只编码一次，所有客户端共用
+                        self.frames_sent += 1
+                    writer.write(shared)
+                else:
+                    # 刚连上的客户端：快照已包含部分事件，只补发之后的
+                    writer.write(encode_frame(self._build_delta([e for e in events if e[0] > since], last)))
+                self._clients[writer] = last
+
+    def _drop(self, writer):
+        self._clients.pop(writer, None)
+        self.clients_dropped += 1
+        writer.transport.abort()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            method, target = "", ""
+        url = urlsplit(target)
+        path, query = url.path, parse_qs(url.query)
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if method == "GET" and path == "/events" and headers.get("upgrade", "").lower() == "websocket":
+            await self._serve_websocket(reader, writer, headers, query.get("since", [None])[0])
+        elif method == "GET" and path == "/snapshot":
+            body = self.snapshot()
+            etag = f'"{self._snapshot_version}"'
+            if headers.get("if-none-match") == etag:
+                self._respond(writer, "304 Not Modified", b"", etag)
+            else:
+                self._respond(writer, "200 OK", body, etag)
+        else:
+            self._respond(writer, "404 Not Found", b'{"error":"not found"}')
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        if writer not in self._clients:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status: str, body: bytes, etag: Optional[str] = None):
+        headers = [
+            f"HTTP/1.1 {status}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Access-Control-Allow-Origin: *",
+            "Connection: close",
+        ]
+        if etag:
+            headers.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _serve_websocket(self, reader, writer, headers, since: Optional[str] = None):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            self._respond(writer, "400 Bad Request", b'{"error":"missing Sec-WebSocket-Key"}')
+            return
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n"
+        ).encode("latin-1"))
+        if since and since.isdigit() and self._can_resume(int(since)):
+            self._clients[writer] = int(since)  # 续传：下一帧补发之后的增量
+        else:
+            writer.write(encode_frame(self.snapshot()))
+            self._clients[writer] = self._snapshot_version
+        try:
+            # 客户端只会发 ping / close；其余消息忽略
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == 0x8:
+                    writer.write(encode_frame(payload[:2], opcode=0x8))
+                    break
+                if opcode == 0x9:
+                    writer.write(encode_frame(payload, opcode=0xA))
+        except FrameTooLarge:
+            writer.write(encode_frame(struct.pack("!H", 1009), opcode=0x8))  # 1009: 消息过大
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
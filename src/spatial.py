@@ -0,0 +1,246 @@
+# src/spatial.py
+"""掉落位置的空间索引、聚类与热力图
+
+- GridIndex：均匀网格（格子 → 点编号），查询“某点半径 R 内的掉落”只检查附近几个格子，
+  10 万个点时单次查询也在亚毫秒级；clusters() 用网格找邻居做单链聚类
+- Heatmap：按地图累计多次任务的掉落位置（俯视 x/y 平面），可存盘、可输出字符画
+
+用法：
+    python -m src.ingest *.log --heatmap heatmap.json   # 从归档日志累计热力图
+    python -m src.spatial heatmap.json [--level 地图]    # 输出字符画与最热的格子
+"""
+import argparse
+import json
+import math
+import os
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .config import CONFIG_DIR
+
+if TYPE_CHECKING:
+    from .bus import Subscription
+
+GRID_CELL = 10.0        # 索引格子边长（与常用查询半径同量级时最快）
+CLUSTER_RADIUS = 8.0    # 两个掉落相距不超过该值即归为一簇
+HEATMAP_CELL = 25.0     # 热力图格子边长
+HEAT_CHARS = " .:-=+*#%@"
+DEFAULT_HEATMAP_PATH = os.path.join(CONFIG_DIR, "heatmap.json")
+
+
+class GridIndex:
+    """三维点的均匀网格索引；点只增不删，任务开始时整体 clear()"""
+
+    def __init__(self, cell: float = GRID_CELL):
+        self.cell = cell
+        self.xs = array("d")
+        self.ys = array("d")
+        self.zs = array("d")
+        self.keys: List[Optional[str]] = []
+        self._cells: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clear(self):
+        self.xs = array("d")
+        self.ys = array("d")
+        self.zs = array("d")
+        self.keys = []
+        self._cells.clear()
+
+    def add(self, position: tuple, key: Optional[str] = None) -> int:
+        """加入一个点，返回其编号"""
+        x, y, z = position
+        index = len(self.keys)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.zs.append(z)
+        self.keys.append(key)
+        cell = self.cell
+        self._cells[math.floor(x / cell), math.floor(y / cell), math.floor(z / cell)].append(index)
+        return index
+
+    def snapshot(self) -> tuple:
+        """坐标与名称的副本 (xs, ys, zs, keys)：整体复制，持锁时间很短，见 from_snapshot"""
+        return self.xs[:], self.ys[:], self.zs[:], self.keys[:]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: tuple, cell: float = GRID_CELL) -> "GridIndex":
+        """由 snapshot() 的副本重建索引（可在其他线程进行）"""
+        index = cls(cell)
+        xs, ys, zs, keys = snapshot
+        for n in range(len(keys)):
+            index.add((xs[n], ys[n], zs[n]), keys[n])
+        return index
+
+    def point(self, index: int) -> tuple:
+        return self.xs[index], self.ys[index], self.zs[index]
+
+    def within(self, point: tuple, radius: float) -> List[int]:
+        """与 point 距离不超过 radius 的点编号"""
+        x, y, z = point
+        cell, cells = self.cell, self._cells
+        xs, ys, zs = self.xs, self.ys, self.zs
+        r2 = radius * radius
+        result = []
+        for i in range(math.floor((x - radius) / cell), math.floor((x + radius) / cell) + 1):
+            for j in range(math.floor((y - radius) / cell), math.floor((y + radius) / cell) + 1):
+                for k in range(math.floor((z - radius) / cell), math.floor((z + radius) / cell) + 1):
+                    bucket = cells.get((i, j, k))
+                    if bucket:
+                        for n in bucket:
+                            dx, dy, dz = xs[n] - x, ys[n] - y, zs[n] - z
+                            if dx * dx + dy * dy + dz * dz <= r2:
+                                result.append(n)
+        return result
+
+    def clusters(self, radius: float = CLUSTER_RADIUS, min_size: int = 3) -> List[dict]:
+        """单链聚类：相距不超过 radius 的点连成一簇；按大小降序返回 {center, size, keys}
+
+        另建边长 radius/√3 的网格：同一格内的点两两距离必不超过 radius，直接合并；
+        相邻格之间找到一对足够近的点即可合并，已同簇的格子对直接跳过。
+        """
+        parent = list(range(len(self.keys)))
+
+        def find(n):
+            while parent[n] != n:
+                parent[n] = parent[parent[n]]
+                n = parent[n]
+            return n
+
+        xs, ys, zs = self.xs, self.ys, self.zs
+        side = radius / math.sqrt(3)
+        cells: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+        for n in range(len(parent)):
+            cells[math.floor(xs[n] / side), math.floor(ys[n] / side), math.floor(zs[n] / side)].append(n)
+        for members in cells.values():
+            for n in members[1:]:
+                parent[n] = members[0]
+
+        r2 = radius * radius
+        reach = math.ceil(math.sqrt(3))
+        # 只看“正方向”的一半邻格，每对格子检查一次
+        offsets = [(dx, dy, dz) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)
+                   for dz in range(-reach, reach + 1) if (dx, dy, dz) > (0, 0, 0)]
+        for (i, j, k), members in cells.items():
+            for dx, dy, dz in offsets:
+                others = cells.get((i + dx, j + dy, k + dz))
+                if not others:
+                    continue
+                a, b = find(members[0]), find(others[0])
+                if a == b:
+                    continue
+                if any((xs[n] - xs[m]) ** 2 + (ys[n] - ys[m]) ** 2 + (zs[n] - zs[m]) ** 2 <= r2
+                       for n in members for m in others):
+                    parent[b] = a
+        groups = defaultdict(list)
+        for n in range(len(parent)):
+            groups[find(n)].append(n)
+
+        result = []
+        for members in groups.values():
+            if len(members) < min_size:
+                continue
+            size = len(members)
+            result.append({
+                "center": (sum(self.xs[n] for n in members) / size,
+                           sum(self.ys[n] for n in members) / size,
+                           sum(self.zs[n] for n in members) / size),
+                "size": size,
+                "keys": Counter(self.keys[n] for n in members).most_common(3),
+            })
+        result.sort(key=lambda c: c["size"], reverse=True)
+        return result
+
+
+class Heatmap:
+    """按地图累计的二维掉落热力图（x/y 平面）"""
+
+    def __init__(self, cell: float = HEATMAP_CELL):
+        self.cell = cell
+        self.levels: Dict[str, Counter] = defaultdict(Counter)  # 地图 → {(i, j): 次数}
+
+    def add(self, level: Optional[str], position: tuple):
+        cell = self.cell
+        self.levels[level or "未知"][math.floor(position[0] / cell), math.floor(position[1] / cell)] += 1
+
+    def attach(self, monitor) -> "Subscription":
+        """通过事件总线订阅掉落（同步分发），按当前地图累计，返回订阅"""
+        from .bus import ITEM, SYNC  # log_parser 导入本模块，bus 又导入 log_parser
+
+        add = self.add
+
+        def on_item(event):
+            add(monitor.current_level, event.record.position)
+
+        return monitor.subscribe(on_item, kinds=(ITEM,), mode=SYNC, name="Heatmap")
+
+    def hottest(self, level: str, n: int = 5) -> List[Tuple[tuple, int]]:
+        """最热的 n 个格子：[((x 起点, y 起点), 次数)]"""
+        cell = self.cell
+        return [((i * cell, j * cell), count) for (i, j), count in self.levels.get(level, Counter()).most_common(n)]
+
+    def render(self, level: str, width: int = 60, height: int = 24) -> str:
+        """字符画，y 轴向上；多个格子落在同一字符时取和"""
+        grid = self.levels.get(level)
+        if not grid:
+            return "(无数据)"
+        xs = [i for i, _ in grid]
+        ys = [j for _, j in grid]
+        min_x, min_y = min(xs), min(ys)
+        sx = max(1, math.ceil((max(xs) - min_x + 1) / width))
+        sy = max(1, math.ceil((max(ys) - min_y + 1) / height))
+        cols, rows = (max(xs) - min_x) // sx + 1, (max(ys) - min_y) // sy + 1
+        canvas = [[0] * cols for _ in range(rows)]
+        for (i, j), count in grid.items():
+            canvas[rows - 1 - (j - min_y) // sy][(i - min_x) // sx] += count
+        peak = max(max(row) for row in canvas)
+        scale = len(HEAT_CHARS) - 1
+        return "\n".join(
+            "".join(HEAT_CHARS[math.ceil(v * scale / peak)] for v in row) for row in canvas
+        )
+
+    def save(self, path: str = DEFAULT_HEATMAP_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            "cell": self.cell,
+            "levels": {level: [[i, j, count] for (i, j), count in grid.items()]
+                       for level, grid in self.levels.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_HEATMAP_PATH) -> "Heatmap":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        heatmap = cls(data["cell"])
+        for level, cells in data["levels"].items():
+            heatmap.levels[level].update({(i, j): count for i, j, count in cells})
+        return heatmap
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="掉落热力图")
+    parser.add_argument("path", nargs="?", default=DEFAULT_HEATMAP_PATH, help="热力图文件")
+    parser.add_argument("--level", help="只显示该地图（默认全部）")
+    parser.add_argument("--width", type=int, default=60)
+    parser.add_argument("--height", type=int, default=24)
+    args = parser.parse_args(argv)
+
+    heatmap = Heatmap.load(args.path)
+    levels = [args.level] if args.level else sorted(heatmap.levels, key=lambda lv: -sum(heatmap.levels[lv].values()))
+    for level in levels:
+        print(f"{level}（{sum(heatmap.levels.get(level, Counter()).values())} 个掉落）")
+        print(heatmap.render(level, args.width, args.height))
+        for (x, y), count in heatmap.hottest(level):
+            print(f"  ({x:.0f}, {y:.0f}) +{heatmap.cell:.0f}: {count}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# src/store.py
+"""SQLite 会话存储：把任务、敌人数量、掉落、奖励、保育动物持久化到本地
+
+解析线程只把事件放进队列（不碰磁盘），后台写线程按批在一个事务里插入。
+数据库使用 WAL 模式，查询可与写入并发。
+
+每个事件按日志编号，已提交的最大序号与明细在同一事务里写入 progress 表；
+序号随断点保存，断点续读时重放的、已经入库的事件按序号跳过，不会重复写入。
+
+用法：
+    store = SessionStore()
+    store.attach(monitor)      # 包装 monitor 的回调
+    ...
+    store.rate('credits', level='...', since=time.time() - 7 * 86400)   # 每小时现金
+    store.close()
+"""
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .config import CONFIG_DIR
+from .log_parser import TRAILING_DIGITS
+
+DEFAULT_DB_PATH = os.path.join(CONFIG_DIR, "sessions.db")
+
+BATCH_SIZE = 2000      # 每个事务最多写入的事件数
+FLUSH_INTERVAL = 0.5   # 队列空闲时最长等待（秒），之后提交已攒下的事件
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS missions (
+    id INTEGER PRIMARY KEY,
+    level TEXT,
+    started REAL,          -- 本机时间（秒）
+    ended REAL,
+    success INTEGER        -- 1 成功 / 0 失败 / NULL 未结算
+);
+CREATE TABLE IF NOT EXISTS enemies (
+    mission_id INTEGER,
+    npc_type TEXT,
+    count INTEGER,
+    PRIMARY KEY (mission_id, npc_type)
+);
+CREATE TABLE IF NOT EXISTS drops (
+    mission_id INTEGER,
+    raw_key TEXT,
+    x REAL, y REAL, z REAL,
+    timestamp REAL,        -- 日志时间戳
+    wall REAL
+);
+CREATE TABLE IF NOT EXISTS rewards (
+    mission_id INTEGER,
+    type TEXT,
+    name TEXT,
+    amount INTEGER,
+    cycle INTEGER,
+    timestamp REAL,
+    wall REAL
+);
+CREATE TABLE IF NOT EXISTS conservation (
+    mission_id INTEGER,
+    type TEXT,
+    agent TEXT,
+    timestamp REAL,
+    wall REAL
+);
+CREATE TABLE IF NOT EXISTS progress (
+    log_path TEXT PRIMARY KEY,
+    seq INTEGER            -- 该日志已提交的最大事件序号
+);
+CREATE INDEX IF NOT EXISTS idx_missions_level ON missions (level, started);
+CREATE INDEX IF NOT EXISTS idx_missions_started ON missions (started);
+CREATE INDEX IF NOT EXISTS idx_drops_mission ON drops (mission_id);
+CREATE INDEX IF NOT EXISTS idx_drops_wall ON drops (wall);
+CREATE INDEX IF NOT EXISTS idx_rewards_type ON rewards (type, wall);
+CREATE INDEX IF NOT EXISTS idx_rewards_mission ON rewards (mission_id, type);
+CREATE INDEX IF NOT EXISTS idx_conservation_type ON conservation (type, wall);
+CREATE INDEX IF NOT EXISTS idx_conservation_mission ON conservation (mission_id);
+"""
+
+# 写线程按此顺序应用一批事件：先建任务行，再改任务，再插入明细
+_STATEMENTS = (
+    ("mission", "INSERT INTO missions (id, level, started) VALUES (?, ?, ?)"),
+    ("level", "UPDATE missions SET level = ? WHERE id = ?"),
+    ("end", "UPDATE missions SET ended = ?, success = COALESCE(?, success) WHERE id = ?"),
+    ("enemy", "INSERT INTO enemies (mission_id, npc_type, count) VALUES (?, ?, ?) "
+              "ON CONFLICT (mission_id, npc_type) DO UPDATE SET count = count + excluded.count"),
+    ("drop", "INSERT INTO drops VALUES (?, ?, ?, ?, ?, ?, ?)"),
+    ("reward", "INSERT INTO rewards VALUES (?, ?, ?, ?, ?, ?, ?)"),
+    ("conservation", "INSERT INTO conservation VALUES (?, ?, ?, ?, ?)"),
+)
+
+_STOP = object()
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """打开数据库并确保表结构存在"""
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class SessionStore:
+    """LogMonitor 的持久化存储（写后台批量提交）"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._write_conn = connect(path)
+        # 任务编号在内存中分配，解析线程不必等数据库返回自增 id
+        self._next_mission = (self._write_conn.execute("SELECT MAX(id) FROM missions").fetchone()[0] or 0) + 1
+        self._mission_id: Optional[int] = None  # 当前任务编号，任务结算后仍用于归属撤离奖励
+        self._mission_ended = True
+        self._monitor = None
+        self._log_path: Optional[str] = None
+        self._seq = 0             # 最近一个事件的序号
+        self._replay_until = 0    # 序号不超过它的事件已经入库（断点续读时的重放）
+        self._resume_start = False
+        self._read_conn = sqlite3.connect(path, check_same_thread=False) if path != ":memory:" else self._write_conn
+        self._read_lock = threading.Lock()
+        # ":memory:" 时读写共用一个连接（另开连接是另一个空库），写线程提交时也持有读锁
+        self._write_lock = self._read_lock if self._read_conn is self._write_conn else contextlib.nullcontext()
+        self.written = 0   # 已提交的事件数
+        self.batches = 0   # 已提交的事务数
+        self._writer = threading.Thread(target=self._write_loop, name="SessionStore", daemon=True)
+        self._writer.start()
+
+    # === 解析线程一侧：只入队 ===
+    def attach(self, monitor):
+        """包装 monitor 的回调，把事件转交给写线程；事件序号随 monitor 的断点保存"""
+        put = self._put
+        wall = monitor._wall_clock
+        self._monitor = monitor
+        self._log_path = os.path.abspath(monitor.log_path)
+        rows = self.query("SELECT seq FROM progress WHERE log_path = ?", (self._log_path,))
+        self._seq = self._replay_until = rows[0][0] if rows else 0
+        monitor.state_extensions["store"] = self
+
+        def on_mission_start(callback=monitor.on_mission_start):
+            if self._resume_start:
+                self._resume_start = False  # 断点恢复时补发的开始：任务已在库中，沿用其编号
+            else:
+                self._start_mission(monitor.current_level, wall(monitor.last_timestamp))
+            callback()
+
+        def on_mission_complete(success, callback=monitor.on_mission_complete):
+            if not self._mission_ended:
+                put("end", (wall(monitor.last_timestamp), int(success), self._mission_id))
+                self._mission_ended = True
+            callback(success)
+
+        def on_mission_end(callback=monitor.on_mission_end):
+            self._end_mission(wall(monitor.last_timestamp))
+            callback()
+
+        def on_level_loaded(level, callback=monitor.on_level_loaded):
+            # 结算后加载的是下一张地图，等新任务开始时再记录
+            if not self._mission_ended:
+                put("level", (level, self._mission_id))
+            callback(level)
+
+        def on_new_agent(raw_npc, callback=monitor.on_new_agent):
+            put("enemy", (self._mission_id, raw_npc))
+            callback(raw_npc)
+
+        def on_new_item(record, callback=monitor.on_new_item):
+            x, y, z = record.position
+            put("drop", (self._mission_id, record.raw_key, x, y, z,
+                         record.timestamp, wall(record.timestamp)))
+            callback(record)
+
+        def on_reward_received(record, callback=monitor.on_reward_received):
+            put("reward", (self._mission_id, record.type, record.name, record.amount,
+                           record.cycle, record.timestamp, record.wall))
+            callback(record)
+
+        def on_conservation_refresh(animal_type, position, callback=monitor.on_conservation_refresh):
+            record = monitor.conservation_animals[-1]  # 回调前记录已追加
+            put("conservation", (self._mission_id, record.type, record.agent,
+                                 record.spawn_time, record.wall))
+            callback(animal_type, position)
+
+        monitor.on_mission_start = on_mission_start
+        monitor.on_mission_complete = on_mission_complete
+        monitor.on_mission_end = on_mission_end
+        monitor.on_level_loaded = on_level_loaded
+        monitor.on_new_agent = on_new_agent
+        monitor.on_new_item = on_new_item
+        monitor.on_reward_received = on_reward_received
+        monitor.on_conservation_refresh = on_conservation_refresh
+        if monitor.mission_active:
+            self._start_mission(monitor.current_level, time.time())
+
+    def _start_mission(self, level: Optional[str], started: float):
+        self._end_mission(started)
+        self._mission_id = self._next_mission
+        self._mission_ended = False
+        self._next_mission += 1
+        self._put("mission", (self._mission_id, level, started))
+
+    def _end_mission(self, ended: float):
+        # 未结算就开始新任务（或日志重建）时补上结束时间，结果保持 NULL
+        if not self._mission_ended:
+            self._put("end", (ended, None, self._mission_id))
+            self._mission_ended = True
+
+    def _put(self, name: str, params: tuple):
+        """编号后入队；已经入库的重放事件只推进序号与任务状态，不再写入"""
+        self._seq += 1
+        if self._seq > self._replay_until:
+            self._queue.put((name, params, self._seq))
+
+    # === 断点（LogMonitor.state_extensions，在解析线程中调用）===
+    def snapshot_state(self) -> Dict[str, Any]:
+        return {
+            "seq": self._seq,
+            "mission_id": self._mission_id,
+            "mission_ended": self._mission_ended,
+            "next_mission": self._next_mission,
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """回到断点时的序号与任务编号，之后重放的事件与首次解析时编号相同"""
+        self._seq = state["seq"]
+        self._mission_id = state["mission_id"]
+        self._mission_ended = state["mission_ended"]
+        self._next_mission = state["next_mission"]
+        # 断点中任务仍在进行时 LogMonitor 会补发一次开始回调
+        self._resume_start = self._monitor.mission_active
+
+    # === 写线程 ===
+    def _write_loop(self):
+        get, get_nowait = self._queue.get, self._queue.get_nowait
+        while True:
+            try:
+                event = get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [event]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(get_nowait())
+            except queue.Empty:
+                pass
+            stop = self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: list) -> bool:
+        """把一批事件写入一个事务；返回是否收到停止信号"""
+        rows: Dict[str, list] = {name: [] for name, _ in _STATEMENTS}
+        enemy_counts = Counter()
+        waiters, stop, seq = [], False, None
+        for event in batch:
+            if event is _STOP:
+                stop = True
+            elif isinstance(event, threading.Event):
+                waiters.append(event)
+            elif event[0] == "enemy":
+                mission_id, raw_npc = event[1]
+                enemy_counts[mission_id, TRAILING_DIGITS.sub('', raw_npc)] += 1  # 刷怪风暴先在内存中合并计数
+                seq = event[2]
+            else:
+                rows[event[0]].append(event[1])
+                seq = event[2]
+        rows["enemy"] = [(mission_id, npc_type, n) for (mission_id, npc_type), n in enemy_counts.items()]
+
+        conn = self._write_conn
+        try:
+            with self._write_lock, conn:
+                for name, sql in _STATEMENTS:
+                    if rows[name]:
+                        conn.executemany(sql, rows[name])
+                if seq is not None:
+                    conn.execute("INSERT INTO progress VALUES (?, ?) "
+                                 "ON CONFLICT (log_path) DO UPDATE SET seq = excluded.seq", (self._log_path, seq))
+            self.written += len(batch) - len(waiters) - stop
+            self.batches += 1
+        except sqlite3.Error as e:
+            print(f"[SessionStore] 写入失败，丢弃 {len(batch)} 个事件: {e}")
+        for waiter in waiters:
+            waiter.set()
+        return stop
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待此前入队的事件全部提交"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """提交剩余事件并关闭数据库"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        if self._read_conn is not self._write_conn:
+            self._read_conn.close()
+        self._write_conn.close()
+
+    # === 查询 ===
+    def query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._read_lock:
+            self._read_conn.row_factory = sqlite3.Row
+            return self._read_conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _mission_filter(level: Optional[str], since: Optional[float], until: Optional[float]):
+        clauses, params = [], []
+        if level is not None:
+            clauses.append("m.level = ?")
+            params.append(level)
+        if since is not None:
+            clauses.append("m.started >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("m.started < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def missions(self, level: Optional[str] = None, since: Optional[float] = None,
+                 until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """按开始时间排序的任务列表"""
+        where, params = self._mission_filter(level, since, until)
+        rows = self.query(f"SELECT * FROM missions m{where} ORDER BY m.started", tuple(params))
+        return [dict(row) for row in rows]
+
+    def reward_totals(self, level: Optional[str] = None, since: Optional[float] = None,
+                      until: Optional[float] = None) -> Dict[str, int]:
+        """各奖励类型的数量总和"""
+        where, params = self._mission_filter(level, since, until)
+        rows = self.query(
+            f"SELECT r.type, SUM(r.amount) FROM rewards r JOIN missions m ON m.id = r.mission_id{where} "
+            "GROUP BY r.type", tuple(params))
+        return {row[0]: row[1] for row in rows}
+
+    def enemy_counts(self, level: Optional[str] = None, since: Optional[float] = None,
+                     until: Optional[float] = None) -> Dict[str, int]:
+        """各敌人类型（去掉数字后缀）的生成总数"""
+        where, params = self._mission_filter(level, since, until)
+        rows = self.query(
+            f"SELECT e.npc_type, SUM(e.count) FROM enemies e JOIN missions m ON m.id = e.mission_id{where} "
+            "GROUP BY e.npc_type ORDER BY 2 DESC", tuple(params))
+        return {row[0]: row[1] for row in rows}
+
+    def drop_counts(self, level: Optional[str] = None, since: Optional[float] = None,
+                    until: Optional[float] = None) -> Dict[str, int]:
+        """各掉落物的次数"""
+        where, params = self._mission_filter(level, since, until)
+        rows = self.query(
+            f"SELECT d.raw_key, COUNT(*) FROM drops d JOIN missions m ON m.id = d.mission_id{where} "
+            "GROUP BY d.raw_key ORDER BY 2 DESC", tuple(params))
+        return {row[0]: row[1] for row in rows}
+
+    def conservation_counts(self, level: Optional[str] = None, since: Optional[float] = None,
+                            until: Optional[float] = None) -> Dict[str, int]:
+        """各保育动物的生成次数"""
+        where, params = self._mission_filter(level, since, until)
+        rows = self.query(
+            f"SELECT c.type, COUNT(*) FROM conservation c JOIN missions m ON m.id = c.mission_id{where} "
+            "GROUP BY c.type ORDER BY 2 DESC", tuple(params))
+        return {row[0]: row[1] for row in rows}
+
+    def mission_hours(self, level: Optional[str] = None, since: Optional[float] = None,
+                      until: Optional[float] = None) -> float:
+        """任务总时长（小时）；未结束的任务以最后一条奖励时间为准"""
+        where, params = self._mission_filter(level, since, until)
+        row = self.query(
+            "SELECT SUM(COALESCE(m.ended, (SELECT MAX(r.wall) FROM rewards r WHERE r.mission_id = m.id), "
+            f"m.started) - m.started) FROM missions m{where}", tuple(params))[0]
+        return (row[0] or 0.0) / 3600
+
+    def rate(self, reward_type: str, level: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None) -> float:
+        """某类奖励的每小时收益，如 rate('credits', level=节点, since=一周前)"""
+        hours = self.mission_hours(level, since, until)
+        if hours <= 0:
+            return 0.0
+        return self.reward_totals(level, since, until).get(reward_type, 0) / hours
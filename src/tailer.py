@@ -0,0 +1,295 @@
+# src/tailer.py
+import os
+import select
+import struct
+import sys
+import time
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+
+BLOCK_SIZE = 64 * 1024      # 单次读取块大小
+MAX_BLOCKS = 4              # 单次 read_lines 最多读取的块数，积压分批读完
+MIN_INTERVAL = 0.005        # 空闲退避起点（秒）
+MAX_INTERVAL = 0.09         # 空闲退避上限，不超过旧版固定轮询间隔
+
+
+def decode_lines(data: bytes) -> List[str]:
+    """把以换行结尾的字节块解码并切成行（不含换行符），换行规则与文本模式一致"""
+    # 换行符不会出现在 UTF-8 多字节序列中，按完整行解码不会截断字符
+    text = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+    if text.endswith("\n"):
+        text = text[:-1]
+    return text.split("\n")
+
+
+def split_lines(data: bytes) -> List[bytes]:
+    """decode_lines 的不解码版本：按相同的换行规则切成 bytes 行"""
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    return data.split(b"\n")
+
+
+class _Inotify:
+    """Linux inotify 的最小 ctypes 封装：监听日志所在目录，有写入/重建时唤醒"""
+
+    IN_MODIFY = 0x002
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")  # struct inotify_event 的定长部分：wd, mask, cookie, len
+
+    def __init__(self, directory: Optional[str] = None):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        if directory is not None:
+            try:
+                self.add_watch(directory)
+            except OSError:
+                os.close(self.fd)
+                raise
+
+    def add_watch(self, directory: str) -> int:
+        """监听一个目录，返回 watch 描述符（同一目录重复添加返回同一个）"""
+        import ctypes
+
+        mask = self.IN_MODIFY | self.IN_CREATE | self.IN_MOVED_TO | self.IN_DELETE
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch 失败: {directory}")
+        return wd
+
+    def read_events(self) -> List[tuple]:
+        """读出所有待处理事件：[(wd, mask, 文件名)]；队列溢出时 wd 为 -1、mask 含 IN_Q_OVERFLOW"""
+        events = []
+        size = self._EVENT.size
+        try:
+            while True:
+                data = os.read(self.fd, 64 * 1024)
+                if not data:
+                    break
+                pos = 0
+                while pos < len(data):
+                    wd, mask, _, length = self._EVENT.unpack_from(data, pos)
+                    pos += size
+                    events.append((wd, mask, os.fsdecode(data[pos:pos + length].rstrip(b"\0"))))
+                    pos += length
+        except BlockingIOError:
+            pass
+        return events
+
+    def wait(self, timeout: float) -> bool:
+        """等待事件，返回是否被事件唤醒（并清空事件队列）"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        self.drain()
+        return True
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogTailer:
+    """按块读取追加内容的日志尾随器
+
+    - 大块读取，缓存末尾不完整的行；每批最多 max_blocks 块，积压由 follow() 分批读完
+    - 空闲时指数退避；Linux 下优先用 inotify 即时唤醒
+    - 文件被截断（大小变小）时从头读；重建（inode 变化）时先读完旧文件再打开新文件
+    """
+
+    def __init__(
+            self,
+            path: str,
+            from_end: bool = True,
+            block_size: int = BLOCK_SIZE,
+            min_interval: float = MIN_INTERVAL,
+            max_interval: float = MAX_INTERVAL,
+            on_rotate: Optional[Callable[[], None]] = None,
+            use_inotify: bool = True,
+            start_offset: Optional[int] = None,  # 从指定字节偏移续读（断点恢复），优先于 from_end
+            decode: bool = True,  # False 时产出未解码的 bytes 行（见 LogMonitor.process_bytes）
+            max_blocks: int = MAX_BLOCKS,
+    ):
+        self.path = path
+        self._split = decode_lines if decode else split_lines
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.has_more = False  # 上次 read_lines 没有读完（到达块数上限或旧文件的剩余行待切换）
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.on_rotate = on_rotate or (lambda: None)
+
+        self._file = None
+        self._identity = None  # (st_dev, st_ino)
+        self._buffer = b""
+        self._drained = None   # 重建前从旧文件读出的剩余行
+        self._reopen = False   # 剩余行产出后再切换到新文件
+        self._interval = min_interval
+        self._open(seek_end=from_end and start_offset is None)
+        if start_offset is not None:
+            self._file.seek(start_offset)
+
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(os.path.dirname(os.path.abspath(path)))
+            except (OSError, AttributeError):
+                self._inotify = None  # 不支持时退回退避轮询
+
+    @property
+    def offset(self) -> int:
+        """已完整消费的字节偏移（不含缓存中的半行）"""
+        return self._file.tell() - len(self._buffer)
+
+    @property
+    def identity(self) -> tuple:
+        """当前打开文件的 (st_dev, st_ino)"""
+        return self._identity
+
+    @property
+    def size(self) -> int:
+        """当前打开文件的大小"""
+        return os.fstat(self._file.fileno()).st_size
+
+    def _open(self, seek_end: bool = False):
+        if self._file:
+            self._file.close()
+        self._file = open(self.path, "rb")
+        st = os.fstat(self._file.fileno())
+        self._identity = (st.st_dev, st.st_ino)
+        self._buffer = b""
+        if seek_end:
+            self._file.seek(0, os.SEEK_END)
+
+    def _check_rotation(self) -> bool:
+        """检查截断/重建：截断时从头读；重建时先读完旧文件（含缓存的半行），下次 read_lines 产出后再切换"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False  # 游戏可能正在重建日志，稍后再查
+        if (st.st_dev, st.st_ino) != self._identity:
+            rest = self._buffer + self._file.read()
+            self._buffer = b""
+            if rest:
+                # 旧文件不会再写入，末尾的半行按完整行处理
+                self._drained = self._split(rest if rest.endswith((b"\n", b"\r")) else rest + b"\n")
+                self._reopen = self.has_more = True
+                return True
+            self._open()
+        elif st.st_size < self._file.tell():
+            self._file.seek(0)
+            self._buffer = b""
+        else:
+            return False
+        self.on_rotate()
+        return True
+
+    def read_lines(self) -> list:
+        """读取新增的完整行（不含换行符；decode=False 时为 bytes），无新内容时返回空列表
+
+        每次最多读 max_blocks 块（一行都不完整时继续读到行尾），还有积压时 has_more 为 True。
+        """
+        if self._drained is not None:
+            lines, self._drained = self._drained, None
+            return lines
+        if self._reopen:
+            self._reopen = False
+            self._open()
+            self.on_rotate()
+        chunks = []
+        newline = False
+        self.has_more = False
+        while True:
+            data = self._file.read(self.block_size)
+            if not data:
+                break
+            chunks.append(data)
+            if len(data) < self.block_size:
+                break
+            newline = newline or b"\n" in data
+            if newline and len(chunks) >= self.max_blocks:
+                self.has_more = True
+                break
+        if not chunks:
+            return []
+        data = self._buffer + b"".join(chunks)
+        cut = data.rfind(b"\n") + 1
+        self._buffer = data[cut:]
+        if not cut:
+            return []
+        return self._split(data[:cut])
+
+    def wait(self):
+        """空闲等待：inotify 事件唤醒或指数退避"""
+        if self._inotify:
+            if self._inotify.wait(self.max_interval):
+                self._interval = self.min_interval
+                return
+        else:
+            time.sleep(self._interval)
+        self._interval = min(self._interval * 2, self.max_interval)
+
+    def follow(self, running: Callable[[], bool] = lambda: True) -> Iterator[List[str]]:
+        """持续产出新增行批次，直到 running() 返回 False"""
+        while running():
+            lines = self.read_lines()
+            if lines:
+                self._interval = self.min_interval
+                yield lines
+            elif not self._check_rotation():
+                self.wait()
+
+    async def wait_async(self):
+        """wait() 的 asyncio 版本：inotify 描述符注册到事件循环，不占用线程"""
+        import asyncio  # 仅事件流使用，避免拖慢普通启动
+
+        if self._inotify:
+            loop = asyncio.get_running_loop()
+            ready = loop.create_future()
+            fd = self._inotify.fd
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+            try:
+                await asyncio.wait_for(ready, self.max_interval)
+                self._inotify.drain()
+                self._interval = self.min_interval
+                return
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                loop.remove_reader(fd)
+        else:
+            await asyncio.sleep(self._interval)
+        self._interval = min(self._interval * 2, self.max_interval)
+
+    async def follow_async(self, running: Callable[[], bool] = lambda: True) -> AsyncIterator[List[str]]:
+        """follow() 的 asyncio 版本"""
+        while running():
+            lines = self.read_lines()
+            if lines:
+                self._interval = self.min_interval
+                yield lines
+            elif not self._check_rotation():
+                await self.wait_async()
+
+    def close(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -1,11 +1,7 @@
 # src/utils.py
-# src/utils.py
 import re
-from typing import Dict
-
-# src/utils.py
-import re
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional
 
 # === 掉落物中文映射（已有）===
 DROP_NAME_MAP = {
@@ -160,62 +156,125 @@ CONSERVATION_NAME_MAP: Dict[str, str] = {
 }
 
 
+# === 名称解析 ===
+# 启动时把映射表展开成“后缀归一化索引”，常见键只需一次 dict 查询；
+# 未见过的键走一次原始规则后由有界缓存记住。
+NAME_CACHE_SIZE = 4096
+
+ENEMY_SUFFIXES = ["Agent", "Spaceman", "Biped", "Quad"]
+CONSERVATION_SUFFIXES = ["Pup", "Alpha"]
+
+# 掉落物模糊匹配规则，按优先级排列
+DROP_KEYWORD_RULES = [
+    ("AyatanSculpture", "Ayatan 雕像"),
+    ("ModPickup", "Mod"),
+    ("EnergyIncrease", "能量球"),
+    ("HealthIncrease", "生命球"),
+    ("Credits", "现金"),
+    ("Ammo", "弹药"),
+] + [
+    (keyword, "资源") for keyword in
+    ["Alloy", "Ferrite", "Nano", "Polymer", "Salvage", "Orokin", "Fieldron", "Detonite", "Mutagen", "Neural", "Argon"]
+]
+
+_TRAILING_DIGITS = re.compile(r'\d+$')
+
+
+def _strip_suffixes(key: str, name_map: Dict[str, str], suffixes) -> Optional[str]:
+    """精确匹配，失败后依次去掉常见后缀再匹配（原始规则）"""
+    if key in name_map:
+        return name_map[key]
+    base_name = key
+    for suffix in suffixes:
+        if base_name.endswith(suffix):
+            base_name = base_name[:-len(suffix)]
+            if base_name in name_map:
+                return name_map[base_name]
+    return None
+
+
+def _build_suffix_index(name_map: Dict[str, str], suffixes) -> Dict[str, str]:
+    """枚举“基础名 + 按剥离顺序倒序拼接的后缀子集”，用原始规则求值建索引
+
+    原始规则能解析的键一定是这种形式，因此索引是完整的。
+    """
+    index = {}
+    for base in name_map:
+        forms = [base]
+        for suffix in reversed(suffixes):
+            forms += [form + suffix for form in forms]
+        for form in forms:
+            name = _strip_suffixes(form, name_map, suffixes)
+            if name is not None:
+                index[form] = name
+    return index
+
+
+def _build_drop_scanner():
+    # 前瞻匹配可在每个位置报告关键字（含重叠），同一位置按优先级取第一个
+    keywords = [keyword for keyword, _ in DROP_KEYWORD_RULES]
+    scanner = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))")
+    return scanner, {keyword: i for i, keyword in enumerate(keywords)}
+
+
+_ENEMY_INDEX: Dict[str, str] = {}
+_CONSERVATION_INDEX: Dict[str, str] = {}
+_DROP_SCANNER, _DROP_PRIORITY = _build_drop_scanner()
+
+
+def rebuild_name_indexes():
+    """映射表被修改后调用，重建索引并清空缓存"""
+    global _DROP_SCANNER, _DROP_PRIORITY
+    _ENEMY_INDEX.clear()
+    _ENEMY_INDEX.update(_build_suffix_index(ENEMY_NAME_MAP, ENEMY_SUFFIXES))
+    _CONSERVATION_INDEX.clear()
+    _CONSERVATION_INDEX.update(_build_suffix_index(CONSERVATION_NAME_MAP, CONSERVATION_SUFFIXES))
+    _DROP_SCANNER, _DROP_PRIORITY = _build_drop_scanner()
+    for cached in (get_chinese_drop_name, _lookup_enemy, _lookup_conservation):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
 def get_chinese_drop_name(key: str) -> str:
     """将掉落物关键字转为中文名"""
     if key in DROP_NAME_MAP:
         return DROP_NAME_MAP[key]
-    if "AyatanSculpture" in key:
-        return "Ayatan 雕像"
-    if "ModPickup" in key:
-        return "Mod"
-    if "EnergyIncrease" in key:
-        return "能量球"
-    if "HealthIncrease" in key:
-        return "生命球"
-    if "Credits" in key:
-        return "现金"
-    if "Ammo" in key:
-        return "弹药"
-    if any(r in key for r in
-           ["Alloy", "Ferrite", "Nano", "Polymer", "Salvage", "Orokin", "Fieldron", "Detonite", "Mutagen", "Neural",
-            "Argon"]):
-        return "资源"
+    best = min((_DROP_PRIORITY[m.group(1)] for m in _DROP_SCANNER.finditer(key)), default=None)
+    if best is not None:
+        return DROP_KEYWORD_RULES[best][1]
     return f"未知物品 ({key})"
 
 
 def get_chinese_enemy_name(raw_key: str) -> str:
     """将敌人原始类型名（含数字后缀）转为中文名"""
-    # 移除末尾数字（如 ArachnoidCoolantAgent1 → ArachnoidCoolantAgent）
-    clean_key = re.sub(r'\d+$', '', raw_key)
-
-    # 尝试精确匹配
-    if clean_key in ENEMY_NAME_MAP:
-        return ENEMY_NAME_MAP[clean_key]
+    # 已归一化的类型名（GUI 每次刷新都会传入）直接命中索引
+    name = _ENEMY_INDEX.get(raw_key)
+    if name is not None:
+        return name
+    return _lookup_enemy(raw_key)
 
-    # 模糊匹配：移除常见后缀如 "Agent", "Spaceman"
-    base_name = clean_key
-    for suffix in ["Agent", "Spaceman", "Biped", "Quad"]:
-        if base_name.endswith(suffix):
-            base_name = base_name[:-len(suffix)]
-            if base_name in ENEMY_NAME_MAP:
-                return ENEMY_NAME_MAP[base_name]
 
-# 最终兜底
-    return f"未知敌人 ({raw_key})"
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _lookup_enemy(raw_key: str) -> str:
+    # 移除末尾数字（如 ArachnoidCoolantAgent1 → ArachnoidCoolantAgent）
+    clean_key = _TRAILING_DIGITS.sub('', raw_key)
+    name = _ENEMY_INDEX.get(clean_key)
+    # 最终兜底
+    return name if name is not None else f"未知敌人 ({raw_key})"
 
 
 def get_chinese_conservation_name(key: str) -> str:
     """将保育动物类型名转为中文名"""
-    if key in CONSERVATION_NAME_MAP:
-        return CONSERVATION_NAME_MAP[key]
-    
-    # 模糊匹配：移除常见后缀
-    base_name = key
-    for suffix in ["Pup", "Alpha"]:
-        if base_name.endswith(suffix):
-            base_name = base_name[:-len(suffix)]
-            if base_name in CONSERVATION_NAME_MAP:
-                return CONSERVATION_NAME_MAP[base_name]
-    
+    name = _CONSERVATION_INDEX.get(key)
+    if name is not None:
+        return name
+    return _lookup_conservation(key)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _lookup_conservation(key: str) -> str:
     # 最终兜底
-    return f"未知动物 ({key})"
\ No newline at end of file
+    return f"未知动物 ({key})"
+
+
+rebuild_name_indexes()